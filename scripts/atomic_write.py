@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原子写入 - 先写入同目录下的临时文件并 fsync，再 rename 覆盖目标文件并 fsync 所在目录，
+写入中途崩溃或被 Ctrl-C 中断时目标文件保持旧内容。批量模式把 fsync 推迟到整批结束时统一执行
+"""
+
+import os
+import stat
+from contextlib import contextmanager
+
+import json_codec
+
+# 批量模式中待 fsync 的 (文件集合, 目录集合)，None 表示不在批量模式
+_pending = None
+
+
+def _fsync_path(path, flags=os.O_RDONLY):
+    """fsync 一个已存在的文件或目录；不支持对目录 fsync 的平台（Windows）上忽略"""
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, content, encoding='utf-8'):
+    """原子地写入文件内容（str 或 bytes），保留已有文件的权限"""
+    if isinstance(content, str):
+        content = content.encode(encoding)
+    directory = os.path.dirname(os.path.abspath(path))
+    # 临时文件名带进程号，多个进程同时写同一文件时不会互相覆盖临时文件
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+            f.flush()
+            if _pending is None:
+                os.fsync(f.fileno())
+        try:
+            os.chmod(temp_file, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(temp_file, path)
+    except BaseException:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        raise
+
+    if _pending is None:
+        _fsync_path(directory)
+    else:
+        _pending[0].add(os.path.abspath(path))
+        _pending[1].add(directory)
+
+
+def atomic_write_json(path, data):
+    """原子地写入 JSON 文件，格式与 json.dump(indent=2, ensure_ascii=False) 相同"""
+    atomic_write(path, json_codec.dumps(data, indent=2))
+
+
+@contextmanager
+def bulk_writes():
+    """批量模式：块内的 atomic_write 只 rename 不 fsync，退出时统一 fsync 写过的文件和目录；
+    嵌套使用时由最外层统一执行。崩溃时块内已写入的文件可能只有部分落盘，适合迁移、导入等可重做的批量操作"""
+    global _pending
+    if _pending is not None:
+        yield
+        return
+    _pending = (set(), set())
+    try:
+        yield
+    finally:
+        files, directories = _pending
+        _pending = None
+        for path in sorted(files):
+            _fsync_path(path)
+        for directory in sorted(directories):
+            _fsync_path(directory)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码基准 - 在真实的进度数据上比较 json_codec 的标准库实现和 orjson 加速实现，
+测量解码进度文件、写出规范格式进度文件、页面数据分片（紧凑格式）和 indent=2 格式的耗时，
+并检查两种实现的结果完全相同
+"""
+
+import os
+import sys
+import gzip
+import time
+import platform
+import argparse
+import tempfile
+import shutil
+from datetime import datetime
+
+import json_codec
+from progress_json import dumps_progress
+from project_loader import scan_progress_files, read_progress
+from progress_segments import COLD_SUFFIX
+
+
+def _documents(path):
+    """进度文件或分段项目目录中的 JSON 文档（原始字节）"""
+    if not os.path.isdir(path):
+        with open(path, 'rb') as f:
+            return [f.read()]
+    documents = []
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if name.endswith(COLD_SUFFIX):
+            with gzip.open(file_path, 'rb') as f:
+                documents.append(f.read())
+        elif name.endswith('.json'):
+            with open(file_path, 'rb') as f:
+                documents.append(f.read())
+    return documents
+
+
+def load_dataset(projects_dir):
+    """读取目录中的全部进度数据，返回 (原始文档列表, 项目字典列表)"""
+    documents = []
+    projects = []
+    for path, _ in scan_progress_files(projects_dir):
+        documents.extend(_documents(path))
+        projects.append(read_progress(path)[0])
+    return documents, projects
+
+
+def _operations(documents, projects):
+    """基准测量的操作: 名称 -> 返回结果列表的函数"""
+    return {
+        'decode': lambda: [json_codec.loads(document) for document in documents],
+        'encode_progress': lambda: [dumps_progress(project) for project in projects],
+        'encode_compact': lambda: [json_codec.dumps(project, compact=True) for project in projects],
+        'encode_indent': lambda: [json_codec.dumps(project, indent=2) for project in projects],
+    }
+
+
+def _measure(operation, repeat):
+    """重复执行取最小耗时，返回 (秒数, 最后一次的结果)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = operation()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmark(projects_dir, repeat=5):
+    """依次用标准库和 orjson（如已安装）运行各项操作，返回结果字典"""
+    documents, projects = load_dataset(projects_dir)
+    fast_backend = json_codec.load_fast_backend()
+    backends = [('json', False)]
+    if fast_backend:
+        backends.append(('orjson', fast_backend))
+
+    timings = {}
+    outputs = {}
+    try:
+        for backend_name, module in backends:
+            json_codec.orjson = module
+            for name, operation in _operations(documents, projects).items():
+                seconds, result = _measure(operation, repeat)
+                timings.setdefault(name, {})[backend_name] = round(seconds, 6)
+                outputs.setdefault(name, []).append(result)
+    finally:
+        json_codec.orjson = fast_backend
+
+    results = {}
+    for name, by_backend in timings.items():
+        result = dict(by_backend)
+        if 'orjson' in by_backend:
+            result['speedup'] = round(by_backend['json'] / by_backend['orjson'], 2) if by_backend['orjson'] else None
+            result['identical'] = outputs[name][0] == outputs[name][1]
+        results[name] = result
+
+    return {
+        'projects': len(projects),
+        'entries': sum(len(project.get('progress_entries', [])) for project in projects),
+        'documents': len(documents),
+        'bytes': sum(len(document) for document in documents),
+        'operations': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 编解码基准")
+    parser.add_argument('--projects-dir', default='projects', help='进度数据目录（默认 projects）')
+    parser.add_argument('--synthetic', metavar='SCALE', help='改用 benchmark_pages.py 的预设规模生成合成数据')
+    parser.add_argument('--repeat', type=int, default=5, help='每项操作重复次数，取最小耗时')
+    parser.add_argument('--output', help='结果JSON文件（默认输出到标准输出）')
+
+    args = parser.parse_args()
+
+    workdir = None
+    projects_dir = args.projects_dir
+    if args.synthetic:
+        # 合成数据与页面生成基准共用，只在需要时导入
+        from benchmark_pages import SCALES, SyntheticDataset
+        if args.synthetic not in SCALES:
+            parser.error(f"未知规模: {args.synthetic}")
+        workdir = tempfile.mkdtemp(prefix="bench-json-")
+        projects_dir = os.path.join(workdir, 'projects')
+    elif not os.path.isdir(projects_dir):
+        parser.error(f"目录不存在: {projects_dir}")
+
+    try:
+        if args.synthetic:
+            projects, entries = SCALES[args.synthetic]
+            SyntheticDataset(projects=projects, entries=entries).write(projects_dir)
+        print(f"⏱️ 测量 {projects_dir}（可用的 JSON 库: {json_codec.backend()}）", file=sys.stderr)
+        result = run_benchmark(projects_dir, repeat=args.repeat)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': json_codec.backend(),
+        'dataset': args.synthetic or os.path.abspath(projects_dir),
+        **result
+    }
+    for name, timing in result['operations'].items():
+        summary = ', '.join(f"{key}={value}" for key, value in timing.items())
+        print(f"✅ {name}: {summary}", file=sys.stderr)
+
+    content = json_codec.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content + '\n')
+        print(f"📄 结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
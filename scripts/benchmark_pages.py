@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面生成性能基准 - 用确定性的合成数据集测量 PagesGenerator 各阶段耗时
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import platform
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime, timedelta
+
+import json_codec
+from generate_pages import PagesGenerator
+from progress_json import dumps_progress
+
+# 预设规模: (项目数, 每个项目的条目数)
+SCALES = {
+    'tiny': (10, 10),
+    'small': (100, 50),
+    'medium': (1000, 100),
+    'large': (10000, 100),
+    'huge': (100000, 10)
+}
+
+CJK_WORDS = ['实现', '修复', '优化', '重构', '测试', '文档', '性能', '接口', '模块', '数据',
+             '缓存', '调度', '编译器', '仿真', '指令', '流水线', '内存', '并行', '评估', '实验',
+             '论文', '图表', '分析', '部署', '配置', '同步', '索引', '页面', '时间线', '统计']
+ASCII_WORDS = ['implement', 'fix', 'optimize', 'refactor', 'test', 'docs', 'performance', 'api',
+               'module', 'data', 'cache', 'scheduler', 'compiler', 'simulation', 'pipeline',
+               'memory', 'parallel', 'benchmark', 'experiment', 'paper', 'deploy', 'config',
+               'sync', 'index', 'timeline', 'stats', 'gem5', 'riscv', 'kernel', 'trace']
+# 生成项目ID的乘数（奇数，黄金分割比的 32 位近似）
+ID_MULTIPLIER = 0x9E3779B1
+
+PARENT_PROJECTS = ['体系结构研究', 'Compiler Toolchain', '论文写作', 'Infrastructure', '课程项目',
+                   'Simulation Platform', '开源贡献', 'Side Projects']
+
+
+class SyntheticDataset:
+    """确定性的合成进度数据集，相同参数总是生成完全相同的文件"""
+
+    def __init__(self, projects=100, entries=50, days=365, end_date="2025-09-30",
+                 note_length=60, cjk_ratio=0.5, seed=42):
+        self.projects = projects
+        self.entries = entries
+        self.days = days
+        self.end_date = datetime.strptime(end_date, '%Y-%m-%d')
+        self.note_length = note_length
+        self.cjk_ratio = cjk_ratio
+        self.seed = seed
+
+    def params(self):
+        """数据集参数，写入基准结果"""
+        return {
+            'projects': self.projects,
+            'entries_per_project': self.entries,
+            'days': self.days,
+            'end_date': self.end_date.strftime('%Y-%m-%d'),
+            'note_length': self.note_length,
+            'cjk_ratio': self.cjk_ratio,
+            'seed': self.seed
+        }
+
+    def write(self, projects_dir):
+        """把数据集写入 projects_dir，返回写入的字节数"""
+        os.makedirs(projects_dir, exist_ok=True)
+        rng = random.Random(self.seed)
+        total_bytes = 0
+        for index in range(self.projects):
+            project_id = self.project_id(index)
+            project_data = self._project(rng, index)
+            content = dumps_progress(project_data)
+            with open(os.path.join(projects_dir, f"{project_id}_progress.json"), 'w', encoding='utf-8') as f:
+                f.write(content)
+            total_bytes += len(content.encode('utf-8'))
+        return total_bytes
+
+    def project_id(self, index):
+        """第 index 个项目的ID：模 2^32 的仿射变换（乘数为奇数）是双射，不同序号的ID一定不同，
+        相同参数总是生成相同数量的项目，且ID的前两位分散，分片布局下各目录大小均匀"""
+        return f"{(index * ID_MULTIPLIER + self.seed) & 0xffffffff:08x}"
+
+    def _text(self, rng, length):
+        """生成大约 length 个字符的中文或英文文本"""
+        cjk = rng.random() < self.cjk_ratio
+        words = CJK_WORDS if cjk else ASCII_WORDS
+        separator = '' if cjk else ' '
+        parts = []
+        size = 0
+        while size < length:
+            word = rng.choice(words)
+            parts.append(word)
+            size += len(word) + len(separator)
+        return separator.join(parts)
+
+    def _project(self, rng, index):
+        """生成单个项目的进度数据，条目按时间顺序追加"""
+        offsets = sorted(rng.randrange(self.days * 1440) for _ in range(self.entries))
+        start = self.end_date - timedelta(days=self.days - 1)
+        entries = []
+        for offset in offsets:
+            moment = start + timedelta(minutes=offset)
+            entries.append({
+                'date': moment.strftime('%Y-%m-%d'),
+                'time': moment.strftime('%H:%M'),
+                'description': self._text(rng, rng.randint(8, 40)),
+                'notes': self._text(rng, rng.randint(0, self.note_length * 2)) if self.note_length else '',
+                'tags': []
+            })
+        created = entries[0]['date'] if entries else self.end_date.strftime('%Y-%m-%d')
+        return {
+            'project_name': f"Project-{index:06d} {self._text(rng, 6)}",
+            'parent_project': rng.choice(PARENT_PROJECTS),
+            'development_goal': self._text(rng, 30),
+            'created_date': created,
+            'last_updated': f"{entries[-1]['date']}T{entries[-1]['time']}:00" if entries else created,
+            'progress_entries': entries
+        }
+
+
+def run_benchmark(dataset, workdir, repeat=1, profile=False, streaming=False, parse_cache=False):
+    """生成数据集并多次运行页面生成，返回该规模的结果（各阶段取最小耗时）"""
+    projects_dir = os.path.join(workdir, "projects")
+    pages_dir = os.path.join(workdir, "pages")
+    template_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+    start = time.perf_counter()
+    dataset_bytes = dataset.write(projects_dir)
+    dataset_seconds = time.perf_counter() - start
+
+    runs = []
+    for _ in range(repeat):
+        # 每次都从空输出目录开始，测量完整构建
+        if os.path.exists(pages_dir):
+            shutil.rmtree(pages_dir)
+        generator = PagesGenerator()
+        generator.projects_dir = projects_dir
+        generator.pages_dir = pages_dir
+        generator.template_dir = template_dir
+        generator.profile = profile
+        generator.streaming = streaming
+        # 默认测量冷构建；启用缓存时第一次运行写入缓存，之后的运行为热构建
+        generator.parse_cache_file = os.path.join(workdir, ".cache", "projects.pickle") if parse_cache else None
+        generator.profile_report = os.path.join(workdir, "build-profile.json")
+
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            ok = generator.generate_pages()
+        total = time.perf_counter() - start
+        if not ok:
+            raise RuntimeError("页面生成失败")
+        runs.append((total, generator.stage_timings, len(generator.output.files), generator.stage_stats))
+
+    stages = {name: min(run[1][name] for run in runs) for name in runs[0][1]}
+    result = {
+        'dataset': dict(dataset.params(),
+                        total_entries=dataset.projects * dataset.entries,
+                        bytes=dataset_bytes,
+                        generate_seconds=round(dataset_seconds, 4)),
+        'total_seconds': round(min(run[0] for run in runs), 4),
+        'stages': {name: round(seconds, 4) for name, seconds in stages.items()},
+        'output_files': runs[0][2]
+    }
+    if profile:
+        # 分析模式下附带最后一次运行的CPU时间、写入字节数和内存峰值
+        result['profile'] = runs[-1][3]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面生成性能基准")
+    parser.add_argument('--scales', default='tiny,small', help=f"逗号分隔的预设规模: {', '.join(SCALES)}")
+    parser.add_argument('--projects', type=int, help='自定义项目数（覆盖 --scales）')
+    parser.add_argument('--entries', type=int, default=50, help='自定义规模下每个项目的条目数')
+    parser.add_argument('--days', type=int, default=365, help='条目日期分布的天数')
+    parser.add_argument('--end-date', default='2025-09-30', help='条目日期分布的最后一天')
+    parser.add_argument('--note-length', type=int, default=60, help='附注平均长度（字符）')
+    parser.add_argument('--cjk-ratio', type=float, default=0.5, help='中文文本所占比例')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=1, help='每个规模重复次数，取最小耗时')
+    parser.add_argument('--profile', action='store_true', help='同时记录各阶段CPU时间、写入字节数和内存峰值（会拖慢运行）')
+    parser.add_argument('--streaming', action='store_true', help='使用流式生成模式')
+    parser.add_argument('--parse-cache', action='store_true', help='启用进度文件解析缓存（配合 --repeat 测量热构建）')
+    parser.add_argument('--output', help='结果JSON文件（默认输出到标准输出）')
+    parser.add_argument('--workdir', help='工作目录（默认使用临时目录并在结束后删除）')
+
+    args = parser.parse_args()
+
+    if args.projects:
+        scales = [('custom', args.projects, args.entries)]
+    else:
+        try:
+            scales = [(name, *SCALES[name]) for name in args.scales.split(',')]
+        except KeyError as e:
+            parser.error(f"未知规模: {e}")
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': []
+    }
+
+    for name, projects, entries in scales:
+        dataset = SyntheticDataset(projects=projects, entries=entries, days=args.days, end_date=args.end_date,
+                                   note_length=args.note_length, cjk_ratio=args.cjk_ratio, seed=args.seed)
+        if args.workdir:
+            # 保留上次的输出便于检查，但每次都重新生成数据集
+            workdir = os.path.join(args.workdir, name)
+            if os.path.exists(workdir):
+                shutil.rmtree(workdir)
+        else:
+            workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        try:
+            print(f"⏱️ 运行规模 {name}: {projects} 个项目 × {entries} 条", file=sys.stderr)
+            result = run_benchmark(dataset, workdir, repeat=args.repeat, profile=args.profile, streaming=args.streaming,
+                                   parse_cache=args.parse_cache)
+        finally:
+            if not args.workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+        result['scale'] = name
+        result['streaming'] = args.streaming
+        results['results'].append(result)
+        print(f"✅ {name}: {result['total_seconds']:.3f}s", file=sys.stderr)
+
+    content = json_codec.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content + '\n')
+        print(f"📄 结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
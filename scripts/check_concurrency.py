@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发添加与同步检查 - 多个进程同时添加进度，另一个进程反复同步到中央仓库（本地临时裸仓库），
+结束后核对本地进度文件和中央仓库中的条目，有条目丢失或重复时以非零状态退出。
+分别检查 progress_manager.py（预写日志，检查点阈值调小以便频繁合并）、init_project.py 生成的 progress_update.py，
+以及两者交替写入同一项目（progress_update.py 重写进度文件前须合并 progress_manager.py 的预写日志）
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import importlib.util
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import json_codec
+import progress_wal
+from progress_manager import ProgressManager
+from project_loader import progress_file_path, read_progress
+from standalone_sync import StandaloneProgressSync
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 检查的添加方式: progress_manager.py、init_project.py 生成的 progress_update.py 以及两者交替
+KINDS = ('progress_manager', 'progress_update', 'mixed')
+
+# 中央仓库中的提交不需要真实的作者信息
+GIT_IDENTITY = {
+    'GIT_AUTHOR_NAME': 'check', 'GIT_AUTHOR_EMAIL': 'check@localhost',
+    'GIT_COMMITTER_NAME': 'check', 'GIT_COMMITTER_EMAIL': 'check@localhost',
+}
+
+
+@contextlib.contextmanager
+def _quiet(directory):
+    """切换到项目目录并丢弃输出，结束后恢复工作目录"""
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        os.chdir(cwd)
+
+
+def _load_script(path):
+    """按文件路径加载脚本模块（不执行其 __main__ 部分）"""
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _syncer(central_repo):
+    """同步到本地裸仓库的同步器，不检查网络"""
+    syncer = StandaloneProgressSync()
+    syncer.central_repo_url = central_repo
+    syncer._check_network = lambda: True
+    return syncer
+
+
+def create_central_repo(workdir):
+    """创建带一个初始提交的裸仓库作为中央仓库"""
+    central_repo = os.path.join(workdir, "central.git")
+    seed = os.path.join(workdir, "seed")
+    subprocess.run(["git", "init", "-q", "--bare", central_repo], check=True)
+    subprocess.run(["git", "clone", "-q", central_repo, seed], check=True, capture_output=True)
+    with open(os.path.join(seed, "README.md"), 'w', encoding='utf-8') as f:
+        f.write("# ProgressReport\n")
+    subprocess.run(["git", "add", "README.md"], cwd=seed, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "Initial commit"], cwd=seed, check=True)
+    subprocess.run(["git", "push", "-q", "origin", "HEAD"], cwd=seed, check=True, capture_output=True)
+    shutil.rmtree(seed)
+    return central_repo
+
+
+def create_project(workdir, kind):
+    """初始化一个项目目录，返回 (目录, 项目ID)"""
+    project_dir = os.path.join(workdir, kind)
+    os.makedirs(project_dir)
+    with _quiet(project_dir):
+        if kind == 'progress_manager':
+            ProgressManager().init_project("并发检查", "Checks", "并发添加与同步", 'file')
+        else:
+            _load_script(os.path.join(SCRIPTS_DIR, "init_project.py")).init_project("并发检查", "Checks", "并发添加与同步")
+            # 使用仓库中的同步脚本，而不是初始化时下载的版本
+            shutil.copy(os.path.join(SCRIPTS_DIR, "standalone_sync.py"), "standalone_sync.py")
+        with open(".progress_config.json", 'r', encoding='utf-8') as f:
+            project_id = json_codec.load(f)['project_id']
+    return project_dir, project_id
+
+
+def _add_worker(kind, project_dir, worker, adds, interval, wal_max_bytes):
+    """在一个进程中依次添加 adds 条进度，每条之间间隔 interval 秒，返回添加失败的描述；
+    mixed 方式下交替使用 progress_manager.py 和 progress_update.py"""
+    with _quiet(project_dir):
+        progress_wal.WAL_MAX_BYTES = wal_max_bytes
+        writers = []
+        if kind in ('progress_manager', 'mixed'):
+            writers.append(ProgressManager().add_progress)
+        if kind in ('progress_update', 'mixed'):
+            writers.append(_load_script(os.path.join(project_dir, "progress_update.py")).add_progress)
+        failed = []
+        for index in range(adds):
+            description = f"{kind} {worker}-{index}"
+            if not writers[(worker + index) % len(writers)](description):
+                failed.append(description)
+            time.sleep(interval)
+        return failed
+
+
+def _sync_worker(project_dir, central_repo, stop):
+    """反复同步直到 stop 被设置，返回 (成功次数, 失败次数)"""
+    succeeded = failed = 0
+    with _quiet(project_dir):
+        while not stop.is_set():
+            if _syncer(central_repo).sync_to_central():
+                succeeded += 1
+            else:
+                failed += 1
+    return succeeded, failed
+
+
+def _local_entries(project_dir, project_id):
+    progress_file = os.path.join(project_dir, f"{project_id}_progress.json")
+    return [entry.description for entry in progress_wal.load_progress(progress_file).progress_entries]
+
+
+def _central_entries(workdir, central_repo, project_id):
+    clone = os.path.join(workdir, "verify")
+    if os.path.exists(clone):
+        shutil.rmtree(clone)
+    subprocess.run(["git", "clone", "-q", central_repo, clone], check=True, capture_output=True)
+    data, _ = read_progress(progress_file_path(os.path.join(clone, "projects"), project_id))
+    return [entry.get('description') for entry in data.get('progress_entries', [])]
+
+
+def _compare(expected, actual):
+    """返回 (缺少的条目, 重复的条目)"""
+    actual = Counter(actual)
+    missing = sorted(description for description in expected if description not in actual)
+    duplicated = sorted(description for description, count in actual.items() if count > 1)
+    return missing, duplicated
+
+
+def run_check(workdir, kind, workers=4, adds=30, interval=0.1, wal_max_bytes=1024):
+    """运行一种添加方式的检查，返回结果字典"""
+    central_repo = create_central_repo(workdir)
+    project_dir, project_id = create_project(workdir, kind)
+
+    with Manager() as manager, ProcessPoolExecutor(max_workers=workers + 1) as executor:
+        stop = manager.Event()
+        sync_future = executor.submit(_sync_worker, project_dir, central_repo, stop)
+        add_futures = [executor.submit(_add_worker, kind, project_dir, worker, adds, interval, wal_max_bytes)
+                       for worker in range(workers)]
+        failed_adds = [description for future in add_futures for description in future.result()]
+        stop.set()
+        syncs, failed_syncs = sync_future.result()
+
+    # 添加全部结束后再同步一次，中央仓库应包含所有条目
+    with _quiet(project_dir):
+        final_sync = _syncer(central_repo).sync_to_central()
+
+    expected = [f"{kind} {worker}-{index}" for worker in range(workers) for index in range(adds)]
+    local_missing, local_duplicated = _compare(expected, _local_entries(project_dir, project_id))
+    central_missing, central_duplicated = _compare(expected, _central_entries(workdir, central_repo, project_id))
+    return {
+        'kind': kind,
+        'entries': len(expected),
+        'failed_adds': failed_adds,
+        'syncs': syncs,
+        'failed_syncs': failed_syncs,
+        'final_sync': final_sync,
+        'local_missing': local_missing,
+        'local_duplicated': local_duplicated,
+        'central_missing': central_missing,
+        'central_duplicated': central_duplicated,
+    }
+
+
+def _problems(result):
+    problems = []
+    for key in ('failed_adds', 'local_missing', 'local_duplicated', 'central_missing', 'central_duplicated'):
+        if result[key]:
+            problems.append(f"{key}: {len(result[key])} 条 ({', '.join(result[key][:5])}{' ...' if len(result[key]) > 5 else ''})")
+    if not result['final_sync']:
+        problems.append("最终同步失败")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发添加与同步检查")
+    parser.add_argument('--kinds', default=','.join(KINDS), help=f"逗号分隔的添加方式: {', '.join(KINDS)}")
+    parser.add_argument('--workers', type=int, default=4, help='同时添加进度的进程数')
+    parser.add_argument('--adds', type=int, default=30, help='每个进程添加的条目数')
+    parser.add_argument('--interval', type=float, default=0.1, help='同一进程两次添加之间的间隔（秒），使添加期间能完成多次同步')
+    parser.add_argument('--wal-max-bytes', type=int, default=1024,
+                        help='progress_manager.py 的检查点阈值（字节），调小以便在并发期间频繁合并')
+
+    args = parser.parse_args()
+    kinds = args.kinds.split(',')
+    for kind in kinds:
+        if kind not in KINDS:
+            parser.error(f"未知的添加方式: {kind}")
+
+    os.environ.update(GIT_IDENTITY)
+    failed = False
+    for kind in kinds:
+        workdir = tempfile.mkdtemp(prefix="check-concurrency-")
+        try:
+            print(f"🔄 {kind}: {args.workers} 个进程各添加 {args.adds} 条，同时反复同步...")
+            result = run_check(workdir, kind, args.workers, args.adds, args.interval, args.wal_max_bytes)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        problems = _problems(result)
+        print(f"{'❌' if problems else '✅'} {kind}: {result['entries']} 条，并发同步 {result['syncs']} 次"
+              f"（失败 {result['failed_syncs']} 次），最终同步{'成功' if result['final_sync'] else '失败'}")
+        for problem in problems:
+            print(f"   {problem}")
+        failed = failed or bool(problems)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
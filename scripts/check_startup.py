@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令启动检查 - 每次启动新的解释器运行 progress_manager.py add / show，不预热、不扣除解释器本身的启动时间：
+脚本从没有字节码缓存的副本以 -B 运行，每次都要重新编译（git 拉取更新后第一次调用的情形），
+整个进程的耗时中位数超过预算，或命令导入了用不到的模块时以非零状态退出。
+add 常在 git hook 中调用，部署工作流运行本脚本防止启动变慢
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import platform
+import subprocess
+import contextlib
+from datetime import datetime
+
+import json_codec
+from progress_manager import ProgressManager, STORAGE_FORMATS
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# add/show 整个进程（包括解释器启动）耗时中位数的默认预算（毫秒）
+DEFAULT_BUDGET_MS = 150
+
+# add/show 不应导入的模块：同步、初始化、索引和解析缓存才需要；单文件存储时还不需要分段存储的 gzip
+UNUSED_MODULES = ('requests', 'subprocess', 'uuid', 'sqlite3', 'orjson', 'pickle',
+                  'urllib.request', 'concurrent.futures', 'multiprocessing')
+UNUSED_MODULES_FILE_STORAGE = ('gzip',)
+
+
+def copy_scripts(workdir):
+    """复制脚本目录（不含字节码缓存），配合 -B 运行时每次都从源码编译"""
+    target = os.path.join(workdir, "scripts")
+    shutil.copytree(SCRIPTS_DIR, target, ignore=shutil.ignore_patterns('__pycache__'))
+    return os.path.join(target, "progress_manager.py")
+
+
+def prepare_project(project_dir, storage='file', entries=200):
+    """在 project_dir 中初始化项目并预先添加 entries 条进度"""
+    os.makedirs(project_dir)
+    cwd = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        manager = ProgressManager()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            manager.init_project("启动检查", "Checks", "测量命令启动耗时", storage)
+            for index in range(entries):
+                manager.add_progress(f"历史进度 {index}", "附注")
+    finally:
+        os.chdir(cwd)
+
+
+def _measure(command, cwd, repeat):
+    """启动 repeat 次新进程，返回每次的耗时（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(timings):
+    timings = sorted(timings)
+    return {'min_ms': round(timings[0], 1), 'median_ms': round(timings[len(timings) // 2], 1),
+            'max_ms': round(timings[-1], 1)}
+
+
+def imported_modules(command, cwd):
+    """用 -X importtime 运行一次命令，返回进程导入的全部模块名"""
+    result = subprocess.run([command[0], '-X', 'importtime'] + command[1:], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return {line.rsplit('|', 1)[1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+
+def run_check(workdir, storage='file', entries=200, repeat=10):
+    """测量空解释器和各命令的冷启动耗时并检查导入的模块，返回结果字典"""
+    manager_script = copy_scripts(workdir)
+    project_dir = os.path.join(workdir, storage)
+    prepare_project(project_dir, storage, entries)
+
+    python = [sys.executable, '-B']
+    commands = {
+        'add': python + [manager_script, 'add', "启动检查"],
+        'show': python + [manager_script, 'show'],
+    }
+    # 解释器自身（site 等）导入的模块不计入命令
+    baseline = imported_modules(python + ['-c', 'pass'], project_dir)
+    unused = UNUSED_MODULES + (UNUSED_MODULES_FILE_STORAGE if storage == 'file' else ())
+
+    results = {'interpreter': _summary(_measure(python + ['-c', 'pass'], project_dir, repeat))}
+    for name, command in commands.items():
+        result = _summary(_measure(command, project_dir, repeat))
+        modules = imported_modules(command, project_dir) - baseline
+        result['unused_imports'] = sorted(module for module in modules if module in unused)
+        results[name] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命令启动检查")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'add/show 整个进程耗时中位数的预算（毫秒，默认 {DEFAULT_BUDGET_MS}）')
+    parser.add_argument('--repeat', type=int, default=10, help='每个命令的启动次数，取中位数')
+    parser.add_argument('--entries', type=int, default=200, help='预先添加的进度条数')
+    parser.add_argument('--storage', default=','.join(STORAGE_FORMATS),
+                        help=f"逗号分隔的进度存储格式: {', '.join(STORAGE_FORMATS)}")
+    parser.add_argument('--output', help='结果JSON文件（默认输出到标准输出）')
+
+    args = parser.parse_args()
+    storages = args.storage.split(',')
+    for storage in storages:
+        if storage not in STORAGE_FORMATS:
+            parser.error(f"未知的存储格式: {storage}")
+
+    timings = {}
+    problems = []
+    for storage in storages:
+        workdir = tempfile.mkdtemp(prefix="check-startup-")
+        try:
+            print(f"⏱️ 测量冷启动耗时: {storage} 存储，{args.entries} 条历史进度", file=sys.stderr)
+            timings[storage] = run_check(workdir, storage, args.entries, args.repeat)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        for name, timing in timings[storage].items():
+            failed = []
+            if name != 'interpreter':
+                if timing['median_ms'] > args.budget:
+                    failed.append(f"{storage} {name}: 中位数 {timing['median_ms']} ms 超出 {args.budget:g} ms 预算")
+                if timing['unused_imports']:
+                    failed.append(f"{storage} {name}: 导入了用不到的模块 {', '.join(timing['unused_imports'])}")
+            summary = ', '.join(f"{key}={value}" for key, value in timing.items() if key.endswith('_ms'))
+            print(f"{'❌' if failed else '✅'} {storage} {name}: {summary}", file=sys.stderr)
+            problems.extend(failed)
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'entries': args.entries,
+        'budget_ms': args.budget,
+        'timings': timings,
+        'passed': not problems
+    }
+    content = json_codec.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(content + '\n')
+        print(f"📄 结果已写入 {args.output}", file=sys.stderr)
+    else:
+        print(content)
+
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式条目存储 - 把所有进度条目的时间戳和所属项目存为紧凑的整数列，
+统计类计算（总数、按项目/日期/月份分组计数）直接在整列上完成
+"""
+
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _day_key(day):
+    """把 YYYYMMDD 整数格式化为 YYYY-MM-DD"""
+    return f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}"
+
+
+def _month_key(month):
+    """把 YYYYMM 整数格式化为 YYYY-MM"""
+    return f"{month // 100:04d}-{month % 100:02d}"
+
+
+class EntryStore:
+    """按列保存的条目索引，每次构建生成一次，所有页面和统计共用"""
+
+    def __init__(self):
+        # 每个条目一行: YYYYMMDDHHMM 时间戳、项目序号
+        self.timestamps = array('q')
+        self.projects = array('q')
+        # 每个项目一行: 大项目序号和第一个条目的行号
+        self.project_parents = array('q')
+        self.offsets = array('q')
+        self.parent_names = []
+        self._parent_ids = {}
+
+    @classmethod
+    def from_projects(cls, projects_data):
+        """按 projects_data 的顺序建立存储，项目序号与列表下标一致"""
+        store = cls()
+        for project in projects_data:
+            store.add_project(project)
+        return store
+
+    def add_project(self, project):
+        """追加一个项目及其全部条目，返回项目序号"""
+        project_index = len(self.project_parents)
+        parent = project.get('parent_project', '')
+        parent_index = self._parent_ids.get(parent)
+        if parent_index is None:
+            parent_index = self._parent_ids[parent] = len(self.parent_names)
+            self.parent_names.append(parent)
+
+        entries = project.get('progress_entries') or []
+        self.offsets.append(len(self.timestamps))
+        self.project_parents.append(parent_index)
+        self.timestamps.extend(entry.timestamp for entry in entries)
+        self.projects.extend([project_index] * len(entries))
+        return project_index
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def project_count(self):
+        return len(self.project_parents)
+
+    @property
+    def parent_count(self):
+        """出现过的大项目数（包括没有条目的项目）"""
+        return len(self.parent_names)
+
+    def _column(self, column):
+        """把列包装为 NumPy 数组（共享内存，不复制）"""
+        return np.frombuffer(column, dtype=np.int64)
+
+    def count_by_project(self):
+        """每个项目的条目数，按项目序号排列"""
+        if np is not None and self.projects:
+            return np.bincount(self._column(self.projects), minlength=self.project_count).tolist()
+        # 同一项目的条目连续存放，相邻偏移量之差即为条目数
+        ends = list(self.offsets[1:]) + [len(self.timestamps)]
+        return [end - start for start, end in zip(self.offsets, ends)]
+
+    def _group_count(self, divisor):
+        """按 timestamp // divisor 分组计数，忽略日期无效(时间戳为 0)的条目，返回按键排序的 [(键, 数量)]"""
+        if np is not None and self.timestamps:
+            keys = self._column(self.timestamps) // divisor
+            keys, counts = np.unique(keys[keys > 0], return_counts=True)
+            return list(zip(keys.tolist(), counts.tolist()))
+        counter = Counter(timestamp // divisor for timestamp in self.timestamps if timestamp > 0)
+        return sorted(counter.items())
+
+    def count_by_day(self):
+        """每天的条目数 {YYYY-MM-DD: 条目数}，按日期排序"""
+        return {_day_key(day): count for day, count in self._group_count(10000)}
+
+    def count_by_month(self):
+        """每月的条目数 {YYYY-MM: 条目数}，按月份排序"""
+        return {_month_key(month): count for month, count in self._group_count(1000000)}
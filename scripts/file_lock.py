@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度文件的咨询锁 - 用 fcntl.flock 锁定旁边的 <路径>.lock 文件，保护"读取-追加-写回"不被并发的写入方打断；
+原子写入会替换进度文件本身，因此锁放在单独的文件上。没有 fcntl 的平台（Windows）上不加锁
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+# 等待锁的最长时间（秒），持锁方只在追加和写回期间持有锁，正常情况下远小于此值
+LOCK_TIMEOUT = 10.0
+_POLL_INTERVAL = 0.005
+
+
+def lock_path(path):
+    """进度文件（或分段项目目录）对应的锁文件"""
+    return path.rstrip(os.sep) + LOCK_SUFFIX
+
+
+@contextmanager
+def locked(path, timeout=LOCK_TIMEOUT):
+    """在块内持有 path 的排他锁；同一进程内不可嵌套获取同一把锁"""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"等待文件锁超时: {lock_path(path)}")
+                time.sleep(_POLL_INTERVAL)
+        yield
+    finally:
+        # 关闭文件描述符即释放锁；锁文件保留，删除它会让等待中的进程锁住已删除的文件
+        os.close(fd)
@@ -5,18 +5,62 @@ GitHub Pages生成脚本 - 自动生成进度展示页面
 """
 
 import os
-import json
-import glob
+import sys
+import html
+import hashlib
+import bisect
+import heapq
+import itertools
+import time
+import cProfile
+import tracemalloc
+import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
 import calendar
 
+import json_codec
+from site_output import SiteOutput
+from stream_index import StreamingIndex
+from entry_store import EntryStore
+from project_index import ProjectIndex, DEFAULT_INDEX_FILE
+from parse_cache import ParseCache
+from project_loader import scan_progress_files, decode_files, content_digest, project_id_of, PARALLEL_THRESHOLD
+from projects_manifest import load_manifest
+from progress_model import valid_date
+
 class PagesGenerator:
     def __init__(self):
         self.projects_dir = "projects"
         self.pages_dir = "pages"
         self.template_dir = "templates"
         
+        # 时间线每页条目数
+        self.timeline_page_size = 50
+        
+        # 输出时压缩空白，并生成 .gz/.br 预压缩副本
+        self.minify_output = True
+        self.precompress_output = True
+        
+        # 性能分析：记录每个阶段的耗时、CPU时间、写入字节数和内存峰值
+        self.profile = False
+        self.profile_dir = None
+        self.profile_report = "build-profile.json"
+        
+        # 流式模式：只在内存中保留项目摘要和紧凑索引，渲染时按需重新读取进度文件
+        self.streaming = False
+        self.stream_cache_size = 64
+        
+        # 进度文件解析缓存，设为 None 时每次都重新解析
+        self.parse_cache_file = os.path.join(".cache", "projects.pickle")
+        
+        # 设置后改为从增量更新的 SQLite 索引读取项目（不使用解析缓存）
+        self.index_file = None
+        
+        # 待解析文件达到该数量时用进程池并行解析
+        self.load_workers = None
+        self.parallel_load_threshold = PARALLEL_THRESHOLD
+        
         # 语言配置
         self.languages = {
             'zh': {
@@ -62,7 +106,28 @@ class PagesGenerator:
                 'next': '下一',
                 'week': '周',
                 'month': '月',
-                'year': '年'
+                'year': '年',
+                'language_name': '中文',
+                'html_lang': 'zh-CN',
+                'project_progress': '项目进度',
+                'prev_day': '← 前一天',
+                'next_day': '后一天 →',
+                'prev_week': '← 上一周',
+                'next_week': '下一周 →',
+                'prev_month': '← 上个月',
+                'next_month': '下个月 →',
+                'week_range': '{start} 至 {end}',
+                'month_label': '{year}年{month}月',
+                'weekdays': ['周一', '周二', '周三', '周四', '周五', '周六', '周日'],
+                'no_progress_short': '暂无进度',
+                'no_daily_progress': '📭 暂无进度记录',
+                'no_daily_progress_desc': '这一天还没有任何项目进度记录。',
+                'latest_page': '最新',
+                'newer_page': '← 较新',
+                'older_page': '较早 →',
+                'page_label': '第 {page} 页',
+                'all_pages': '全部分页',
+                'page_range': '{first} ~ {last} · {count} 条'
             },
             'en': {
                 'title': 'Personal Project Progress Management System',
@@ -107,448 +172,443 @@ class PagesGenerator:
                 'next': 'Next',
                 'week': 'Week',
                 'month': 'Month',
-                'year': 'Year'
+                'year': 'Year',
+                'language_name': 'English',
+                'html_lang': 'en',
+                'project_progress': 'Project Progress',
+                'prev_day': '← Previous Day',
+                'next_day': 'Next Day →',
+                'prev_week': '← Previous Week',
+                'next_week': 'Next Week →',
+                'prev_month': '← Previous Month',
+                'next_month': 'Next Month →',
+                'week_range': '{start} to {end}',
+                'month_label': '{year}-{month}',
+                'weekdays': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+                'no_progress_short': 'No progress',
+                'no_daily_progress': '📭 No progress records',
+                'no_daily_progress_desc': 'No project progress was recorded on this day.',
+                'latest_page': 'Latest',
+                'newer_page': '← Newer',
+                'older_page': 'Older →',
+                'page_label': 'Page {page}',
+                'all_pages': 'All Pages',
+                'page_range': '{first} ~ {last} · {count} entries'
             }
         }
         
     def generate_pages(self):
         """生成所有页面"""
+        # 所有页面先写入暂存目录，全部成功后再替换输出目录
+        self.output = SiteOutput(self.pages_dir, minify=self.minify_output, precompress=self.precompress_output)
+        self.page_paths = set()
+        self.stage_timings = {}
+        self.stage_stats = {}
+        success = False
+        if self.profile:
+            self._start_profiling()
         try:
-            # 确保目录存在
-            os.makedirs(self.pages_dir, exist_ok=True)
+            self.output.begin()
             
-            # 读取所有项目进度
-            projects_data = self._load_all_projects()
+            # 生成共享的样式和脚本
+            self._run_stage(self._generate_assets)
+            
+            if self.streaming:
+                # 流式模式：一次扫描得到项目摘要和惰性的日期索引
+                projects_data, date_index = self._run_stage(self._scan_projects)
+            else:
+                # 读取所有项目进度
+                projects_data = self._run_stage(self._load_all_projects)
+                
+                # 建立日/周/月视图共用的日期索引
+                date_index = self._run_stage(self._build_date_index, projects_data)
+            
+            # 建立列式条目存储，统计数字都从这里计算
+            self.entry_store = self._run_stage(self._build_entry_store, projects_data)
             
             # 生成主页
-            self._generate_main_page(projects_data)
+            self._run_stage(self._generate_main_page, projects_data)
             
             # 生成项目页面
-            self._generate_project_pages(projects_data)
+            self._run_stage(self._generate_project_pages, projects_data)
             
             # 生成项目列表页面
-            self._generate_projects_list_page(projects_data)
+            self._run_stage(self._generate_projects_list_page, projects_data)
             
             # 生成时间线页面
-            self._generate_timeline_page(projects_data)
+            self._run_stage(self._generate_timeline_page, projects_data)
+            
+            # 生成日/周/月视图按需加载的数据分片
+            self._run_stage(self._generate_data_shards, date_index)
             
             # 生成日视图页面
-            self._generate_daily_view_page(projects_data)
+            self._run_stage(self._generate_daily_view_page, projects_data, date_index)
             
             # 生成周视图页面
-            self._generate_weekly_view_page(projects_data)
+            self._run_stage(self._generate_weekly_view_page, projects_data, date_index)
             
             # 生成月视图页面
-            self._generate_monthly_view_page(projects_data)
+            self._run_stage(self._generate_monthly_view_page, projects_data, date_index)
+            
+            # 生成站点根目录的语言跳转页
+            self._run_stage(self._generate_language_redirects)
+            
+            # 替换输出目录并记录变更清单
+            manifest = self._run_stage(self.output.commit)
+            print(f"📦 输出更新: {len(manifest['changed'])} 个修改, {len(manifest['added'])} 个新增, "
+                  f"{len(manifest['removed'])} 个删除, 共 {len(manifest['files'])} 个文件")
+            self._print_size_report()
             
             print("✅ 页面生成完成！")
+            success = True
             return True
             
         except Exception as e:
+            self.output.abort()
             print(f"❌ 页面生成失败: {e}")
             return False
+        
+        finally:
+            if self.profile:
+                self._finish_profiling(success)
+    
+    def _run_stage(self, stage, *args):
+        """执行一个生成阶段并记录耗时（秒），分析模式下同时记录CPU时间、写入字节数和内存峰值"""
+        name = stage.__name__.lstrip('_')
+        if not self.profile:
+            start = time.perf_counter()
+            result = stage(*args)
+            self.stage_timings[name] = time.perf_counter() - start
+            return result
+        
+        bytes_before = self.output.bytes_written
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if self.profile_dir else None
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            result = stage(*args)
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - start
+            self.stage_timings[name] = wall
+            self.stage_stats[name] = {
+                'wall_seconds': round(wall, 4),
+                'cpu_seconds': round(time.process_time() - cpu_start, 4),
+                'bytes_written': self.output.bytes_written - bytes_before,
+                'memory_peak_bytes': tracemalloc.get_traced_memory()[1]
+            }
+            if profiler:
+                profile_file = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(profile_file)
+                self.stage_stats[name]['profile_file'] = profile_file
+        return result
+    
+    def _start_profiling(self):
+        """开始记录内存分配和整体耗时"""
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+        tracemalloc.start()
+        self.profile_start = (time.perf_counter(), time.process_time())
+    
+    def _finish_profiling(self, success):
+        """停止记录，打印各阶段统计并写入构建报告"""
+        wall_start, cpu_start = self.profile_start
+        tracemalloc.stop()
+        stages = self.stage_stats
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'success': success,
+            'projects_dir': self.projects_dir,
+            'pages_dir': self.pages_dir,
+            'output_files': len(self.output.files),
+            'total': {
+                'wall_seconds': round(time.perf_counter() - wall_start, 4),
+                'cpu_seconds': round(time.process_time() - cpu_start, 4),
+                'bytes_written': self.output.bytes_written,
+                'memory_peak_bytes': max((stat['memory_peak_bytes'] for stat in stages.values()), default=0)
+            },
+            'stages': stages
+        }
+        
+        print("⏱️ 各阶段统计:")
+        print(f"   {'阶段':<30} {'耗时(s)':>9} {'CPU(s)':>9} {'写入(KB)':>10} {'内存峰值(MB)':>12}")
+        for name, stat in stages.items():
+            print(f"   {name:<32} {stat['wall_seconds']:>9.3f} {stat['cpu_seconds']:>9.3f} "
+                  f"{stat['bytes_written'] / 1024:>10.1f} {stat['memory_peak_bytes'] / 1048576:>12.1f}")
+        
+        try:
+            with open(self.profile_report, 'w', encoding='utf-8') as f:
+                json_codec.dump(report, f, indent=2)
+            print(f"📄 构建报告已写入: {self.profile_report}")
+        except Exception as e:
+            print(f"⚠️ 写入构建报告失败: {e}")
+    
+    def _print_size_report(self):
+        """打印输出体积报告"""
+        report = self.output.size_report()
+        totals = report['totals']
+        summary = f"📉 输出体积: 原始 {totals.get('source', 0) / 1024:.1f} KB → 压缩空白后 {totals.get('output', 0) / 1024:.1f} KB"
+        for ext, name in (('.gz', 'gzip'), ('.br', 'brotli')):
+            if ext in totals:
+                summary += f" → {name} {totals[ext] / 1024:.1f} KB"
+        print(summary)
+        for rel_path, sizes in report['largest']:
+            line = f"   {rel_path}: {sizes['source'] / 1024:.1f} KB → {sizes['output'] / 1024:.1f} KB"
+            for ext, name in (('.gz', 'gzip'), ('.br', 'brotli')):
+                if ext in sizes:
+                    line += f", {name} {sizes[ext] / 1024:.1f} KB"
+            print(line)
     
     def _load_all_projects(self):
-        """加载所有项目数据"""
+        """加载所有项目数据；哪些文件需要重新读取只由解析缓存按文件当前的状态和内容判断"""
         projects_data = []
+        # 项目名称 -> 项目ID（进度文件名前缀），同名项目取第一个文件
+        self.project_ids = {}
         
         if not os.path.exists(self.projects_dir):
             return projects_data
         
-        # 查找所有进度文件
-        progress_files = glob.glob(os.path.join(self.projects_dir, "*_progress.json"))
-        
-        for progress_file in progress_files:
+        if self.index_file:
+            return self._load_projects_from_index(projects_data)
+        
+        # 查找所有进度文件（按文件名排序，结果与目录枚举顺序无关）
+        progress_files = scan_progress_files(self.projects_dir)
+        
+        # 未变化的文件直接使用缓存的解析结果
+        cache = ParseCache(self.parse_cache_file) if self.parse_cache_file else None
+        if cache:
+            cache.load()
+        
+        stats = dict(progress_files)
+        parsed = {}
+        digests = {}
+        for progress_file, stat in progress_files:
+            cached = cache.get(progress_file, stat, content_digest) if cache else None
+            if cached is not None:
+                parsed[progress_file] = cached
+                digests[progress_file] = cache.digest(progress_file)
+        
+        # 其余文件串行或并行解析，出错的文件单独报告
+        pending = [progress_file for progress_file, _ in progress_files if progress_file not in parsed]
+        for progress_file, project_data, digest, error in decode_files(pending, self.load_workers, self.parallel_load_threshold):
+            if error is not None:
+                print(f"⚠️ 读取进度文件失败 {progress_file}: {error}")
+                continue
+            parsed[progress_file] = project_data
+            digests[progress_file] = digest
+            if cache:
+                cache.put(progress_file, stats[progress_file], project_data, digest)
+        self._warn_stale_manifest(digests)
+        
+        for progress_file, _ in progress_files:
+            project_data = parsed.get(progress_file)
+            if project_data is None:
+                continue
+            projects_data.append(project_data)
+            project_id = project_id_of(progress_file)
+            self.project_ids.setdefault(project_data.get('project_name'), project_id)
+        
+        if cache:
             try:
-                with open(progress_file, 'r', encoding='utf-8') as f:
-                    project_data = json.load(f)
-                    projects_data.append(project_data)
+                cache.save(progress_file for progress_file, _ in progress_files)
             except Exception as e:
-                print(f"⚠️ 读取进度文件失败 {progress_file}: {e}")
+                print(f"⚠️ 保存解析缓存失败: {e}")
+            print(f"✅ 读取 {len(projects_data)} 个项目 (缓存命中 {cache.hits}，重新解析 {cache.misses})")
         
         return projects_data
     
-    def _get_language_script(self):
-        """获取语言切换的JavaScript代码"""
-        return """
-        <script>
-        // 语言切换功能
-        let currentLang = localStorage.getItem('language') || 'zh';
-        
-        function switchLanguage(lang) {
-            currentLang = lang;
-            localStorage.setItem('language', lang);
-            updatePageLanguage();
-        }
-        
-        function updatePageLanguage() {
-            const elements = document.querySelectorAll('[data-lang]');
-            elements.forEach(element => {
-                const key = element.getAttribute('data-lang');
-                const translations = {
-                    'zh': {
-                        'title': '个人项目进度管理系统',
-                        'subtitle': '管理你的研究项目进度，追踪开发历程',
-                        'home': '🏠 主页',
-                        'timeline': '📅 时间线',
-                        'projects': '📁 项目列表',
-                        'daily_view': '📅 日视图',
-                        'weekly_view': '📅 周视图',
-                        'monthly_view': '📅 月视图',
-                        'active_projects': '活跃项目',
-                        'total_entries': '总进度条目',
-                        'project_categories': '大项目分类',
-                        'back_to_home': '← 返回主页',
-                        'project_list_title': '📁 项目列表',
-                        'project_list_subtitle': '查看所有项目的详细信息和进度',
-                        'timeline_title': '📅 项目进度时间线',
-                        'timeline_subtitle': '按时间顺序查看所有项目进度',
-                        'daily_view_title': '📅 日视图',
-                        'daily_view_subtitle': '查看指定日期的项目进度',
-                        'weekly_view_title': '📅 周视图',
-                        'weekly_view_subtitle': '查看指定周的项目进度',
-                        'monthly_view_title': '📅 月视图',
-                        'monthly_view_subtitle': '查看指定月的项目进度',
-                        'no_projects': '📭 暂无项目',
-                        'no_projects_desc': '还没有创建任何项目，请先初始化一个项目。',
-                        'no_progress': '暂无进度记录',
-                        'progress_entries': '进度条目',
-                        'created_date': '创建日期',
-                        'parent_project': '隶属大项目',
-                        'development_goal': '开发目标',
-                        'last_updated': '最后更新',
-                        'progress_records': '进度记录',
-                        'date': '日期',
-                        'time': '时间',
-                        'description': '描述',
-                        'notes': '附注',
-                        'today': '今天',
-                        'yesterday': '昨天',
-                        'tomorrow': '明天',
-                        'previous': '上一',
-                        'next': '下一',
-                        'week': '周',
-                        'month': '月',
-                        'year': '年'
-                    },
-                    'en': {
-                        'title': 'Personal Project Progress Management System',
-                        'subtitle': 'Manage your research project progress and track development history',
-                        'home': '🏠 Home',
-                        'timeline': '📅 Timeline',
-                        'projects': '📁 Projects',
-                        'daily_view': '📅 Daily View',
-                        'weekly_view': '📅 Weekly View',
-                        'monthly_view': '📅 Monthly View',
-                        'active_projects': 'Active Projects',
-                        'total_entries': 'Total Progress Entries',
-                        'project_categories': 'Project Categories',
-                        'back_to_home': '← Back to Home',
-                        'project_list_title': '📁 Project List',
-                        'project_list_subtitle': 'View detailed information and progress of all projects',
-                        'timeline_title': '📅 Project Progress Timeline',
-                        'timeline_subtitle': 'View all project progress in chronological order',
-                        'daily_view_title': '📅 Daily View',
-                        'daily_view_subtitle': 'View project progress for a specific date',
-                        'weekly_view_title': '📅 Weekly View',
-                        'weekly_view_subtitle': 'View project progress for a specific week',
-                        'monthly_view_title': '📅 Monthly View',
-                        'monthly_view_subtitle': 'View project progress for a specific month',
-                        'no_projects': '📭 No Projects',
-                        'no_projects_desc': 'No projects have been created yet. Please initialize a project first.',
-                        'no_progress': 'No progress records',
-                        'progress_entries': 'Progress Entries',
-                        'created_date': 'Created Date',
-                        'parent_project': 'Parent Project',
-                        'development_goal': 'Development Goal',
-                        'last_updated': 'Last Updated',
-                        'progress_records': 'Progress Records',
-                        'date': 'Date',
-                        'time': 'Time',
-                        'description': 'Description',
-                        'notes': 'Notes',
-                        'today': 'Today',
-                        'yesterday': 'Yesterday',
-                        'tomorrow': 'Tomorrow',
-                        'previous': 'Previous',
-                        'next': 'Next',
-                        'week': 'Week',
-                        'month': 'Month',
-                        'year': 'Year'
-                    }
-                };
-                
-                if (translations[currentLang] && translations[currentLang][key]) {
-                    element.textContent = translations[currentLang][key];
-                }
-            });
-            
-            // 更新语言切换器状态
-            const buttons = document.querySelectorAll('.language-switcher button');
-            buttons.forEach(button => {
-                button.classList.remove('active');
-                if (button.textContent.includes('中文') && currentLang === 'zh') {
-                    button.classList.add('active');
-                } else if (button.textContent.includes('English') && currentLang === 'en') {
-                    button.classList.add('active');
-                }
-            });
-        }
-        
-        // 页面加载时应用语言设置
-        document.addEventListener('DOMContentLoaded', function() {
-            updatePageLanguage();
-        });
-        </script>
-        """
+    def _warn_stale_manifest(self, digests):
+        """对照同步维护的项目清单与各文件当前内容的哈希，不一致时提示重新生成清单。
+        清单记录的是上次同步时的状态，本地编辑后即可能过期，因此不用它决定读取哪些文件"""
+        manifest = load_manifest(self.projects_dir)
+        if not manifest:
+            return
+        stale = 0
+        for progress_file, digest in digests.items():
+            record = manifest.get(project_id_of(progress_file))
+            if record and record.get('sha256') != digest:
+                stale += 1
+        if stale:
+            print(f"⚠️ 项目清单与 {stale} 个进度文件的内容不一致，可运行 python3 scripts/sync_progress.py manifest 重新生成")
     
-    def _get_language_switcher_css(self):
-        """获取语言切换器的CSS样式"""
-        return """
-        .language-switcher {
-            position: fixed;
-            top: 20px;
-            right: 20px;
-            background: white;
-            border-radius: 25px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            padding: 8px;
-            z-index: 1000;
-        }
-        
-        .language-switcher button {
-            background: none;
-            border: none;
-            padding: 8px 16px;
-            border-radius: 20px;
-            cursor: pointer;
-            font-weight: 500;
-            transition: all 0.3s ease;
-            margin: 0 2px;
-        }
+    def _load_projects_from_index(self, projects_data):
+        """增量更新 SQLite 索引后从索引读取所有项目"""
+        with ProjectIndex(self.index_file) as index:
+            for progress_file, error in index.refresh(self.projects_dir, self.load_workers, self.parallel_load_threshold):
+                print(f"⚠️ 读取进度文件失败 {progress_file}: {error}")
+            for project_id, project_data in index.load_projects():
+                projects_data.append(project_data)
+                self.project_ids.setdefault(project_data.get('project_name'), project_id)
+            print(f"✅ 读取 {len(projects_data)} 个项目 (索引更新 {index.updated}，未变化 {index.unchanged}，移除 {index.removed})")
         
-        .language-switcher button.active {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
+        return projects_data
+    
+    def _scan_projects(self):
+        """流式模式下扫描所有进度文件，只保留项目摘要、日期索引和时间线索引"""
+        self.project_ids = {}
+        self.stream_index = StreamingIndex(self.stream_cache_size)
         
-        .language-switcher button:hover {
-            background: #f0f0f0;
-        }
+        if os.path.exists(self.projects_dir):
+            for progress_file, _ in scan_progress_files(self.projects_dir):
+                try:
+                    summary = self.stream_index.scan(progress_file)
+                    project_id = project_id_of(progress_file)
+                    self.project_ids.setdefault(summary.get('project_name'), project_id)
+                except Exception as e:
+                    print(f"⚠️ 读取进度文件失败 {progress_file}: {e}")
         
-        .language-switcher button.active:hover {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        }
-        """
+        self.stream_index.finish()
+        self._warn_invalid_dates(self.stream_index.invalid_dates)
+        return self.stream_index.summaries, self.stream_index
     
-    def _generate_main_page(self, projects_data):
-        """生成主页"""
+    def _warn_invalid_dates(self, skipped):
+        """提示日期不是 YYYY-MM-DD 的条目数，这些条目不出现在日/周/月视图中"""
+        if skipped:
+            print(f"⚠️ {skipped} 个进度条目的日期不是有效的 YYYY-MM-DD，未计入日/周/月视图")
+    
+    def _latest_entry(self, project):
+        """项目最后追加的进度条目，兼容流式模式的项目摘要"""
+        if 'entry_count' in project:
+            return project['latest_entry']
+        entries = project.get('progress_entries')
+        return entries[-1] if entries else None
+    
+    def _project_id(self, project):
+        """获取项目ID，找不到对应进度文件时返回 unknown"""
+        return self.project_ids.get(project.get('project_name')) or 'unknown'
+    
+    def _generate_assets(self):
+        """生成所有页面共用的样式和脚本文件，文件名带内容哈希以便浏览器长期缓存"""
+        with open(os.path.join(self.template_dir, "site.css"), 'r', encoding='utf-8') as f:
+            site_css = f.read()
+        with open(os.path.join(self.template_dir, "calendar.js"), 'r', encoding='utf-8') as f:
+            calendar_js = f.read()
+        
+        self.assets = {}
+        for key, name, ext, content in (('css', 'site', 'css', site_css),
+                                        ('calendar', 'calendar', 'js', calendar_js)):
+            digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+            self.assets[key] = f"assets/{name}.{digest}.{ext}"
+            self.output.write(self.assets[key], content)
+        
+        print("✅ 静态资源生成完成")
+    
+    def _page_root(self, page_path):
+        """页面所在目录到语言根目录的相对路径"""
+        return '../' * page_path.count('/')
+    
+    def _write_page(self, lang, page_path, html_content):
+        """把页面写入对应语言的目录，返回内容是否变化"""
+        self.page_paths.add(page_path)
+        return self.output.write(f"{lang}/{page_path}", html_content)
+    
+    def _get_stylesheet_link(self, root=""):
+        """获取共享样式表的引用标签（样式表位于站点根目录，各语言共用）"""
+        return f'<link rel="stylesheet" href="{root}../{self.assets["css"]}">'
+    
+    def _get_language_switcher(self, lang, page_path):
+        """获取语言切换器，直接链接到另一语言下的同一页面"""
+        root = self._page_root(page_path)
+        links = []
+        for code, texts in self.languages.items():
+            active = ' class="active"' if code == lang else ''
+            links.append(f'<a href="{root}../{code}/{page_path}"{active} '
+                         f'onclick="localStorage.setItem(\'language\', \'{code}\')">{texts["language_name"]}</a>')
+        return ('<!-- 语言切换器 -->\n    <div class="language-switcher">\n        '
+                + '\n        '.join(links) + '\n    </div>')
+    
+    def _render_page_start(self, lang, page_path, title, body_class, switcher=True):
+        """渲染页面开头（文档头、样式表和语言切换器）"""
+        t = self.languages[lang]
         html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
+<html lang="{t['html_lang']}">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title data-lang="title">个人项目进度管理系统</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            text-align: center;
-            color: white;
-            margin-bottom: 3rem;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5rem;
-            margin-bottom: 1rem;
-        }}
-        
-        .header p {{
-            font-size: 1.2rem;
-            opacity: 0.9;
-        }}
-        
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1.5rem;
-            margin-bottom: 3rem;
-        }}
-        
-        .stat-card {{
-            background: white;
-            padding: 1.5rem;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            text-align: center;
-        }}
-        
-        .stat-number {{
-            font-size: 2rem;
-            font-weight: bold;
-            color: #667eea;
-        }}
-        
-        .stat-label {{
-            color: #666;
-            margin-top: 0.5rem;
-        }}
-        
-        .projects-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 1.5rem;
-        }}
-        
-        .project-card {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-            transition: transform 0.3s ease;
-        }}
-        
-        .project-card:hover {{
-            transform: translateY(-5px);
-        }}
-        
-        .project-header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 1.5rem;
-        }}
-        
-        .project-name {{
-            font-size: 1.3rem;
-            font-weight: bold;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .project-parent {{
-            opacity: 0.9;
-            font-size: 0.9rem;
-        }}
-        
-        .project-body {{
-            padding: 1.5rem;
-        }}
-        
-        .project-goal {{
-            color: #666;
-            margin-bottom: 1rem;
-        }}
-        
-        .project-stats {{
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 1rem;
-        }}
-        
-        .project-stat {{
-            text-align: center;
-        }}
-        
-        .project-stat-number {{
-            font-weight: bold;
-            color: #667eea;
-        }}
-        
-        .project-stat-label {{
-            font-size: 0.8rem;
-            color: #666;
-        }}
-        
-        .latest-progress {{
-            background: #f8f9fa;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-        }}
-        
-        .progress-date {{
-            font-size: 0.8rem;
-            color: #666;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .progress-description {{
-            font-weight: 500;
-        }}
-        
-        .nav {{
-            background: white;
-            padding: 1rem 2rem;
-            margin-bottom: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }}
-        
-        .nav a {{
-            color: #667eea;
-            text-decoration: none;
-            margin-right: 2rem;
-            font-weight: 500;
-        }}
-        
-        .nav a:hover {{
-            text-decoration: underline;
-        }}
-        
-        {self._get_language_switcher_css()}
-    </style>
+    <title>{title}</title>
+    {self._get_stylesheet_link(self._page_root(page_path))}
+</head>
+<body class="{body_class}">
+"""
+        if switcher:
+            html_content += f"""    {self._get_language_switcher(lang, page_path)}
+    
+"""
+        return html_content
+    
+    def _generate_language_redirects(self):
+        """在站点根目录为顶层页面生成跳转页，按上次选择的语言跳到对应目录，保持旧链接可用"""
+        default_lang = next(iter(self.languages))
+        lang_codes = json_codec.dumps(list(self.languages))
+        for page_path in sorted(p for p in self.page_paths if '/' not in p):
+            links = ' | '.join(f'<a href="{code}/{page_path}">{texts["language_name"]}</a>'
+                               for code, texts in self.languages.items())
+            html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{self.languages[default_lang]['title']}</title>
+    <script>
+        (function() {{
+            var lang = localStorage.getItem('language');
+            if ({lang_codes}.indexOf(lang) < 0) {{
+                lang = '{default_lang}';
+            }}
+            location.replace(lang + '/{page_path}' + location.search + location.hash);
+        }})();
+    </script>
+    <noscript><meta http-equiv="refresh" content="0; url={default_lang}/{page_path}"></noscript>
 </head>
 <body>
-    <!-- 语言切换器 -->
-    <div class="language-switcher">
-        <button onclick="switchLanguage('zh')" class="active">中文</button>
-        <button onclick="switchLanguage('en')">English</button>
-    </div>
+    <p>{links}</p>
+</body>
+</html>"""
+            self.output.write(page_path, html_content)
+        
+        print(f"✅ 语言跳转页生成完成 ({len(self.languages)} 种语言)")
+    
+    def _generate_main_page(self, projects_data):
+        """生成主页"""
+        for lang in self.languages:
+            self._write_page(lang, "index.html", self._render_main_html(lang, projects_data))
+        
+        print("✅ 主页生成完成")
     
-    <div class="container">
+    def _render_main_html(self, lang, projects_data):
+        """渲染主页HTML"""
+        t = self.languages[lang]
+        html_content = self._render_page_start(lang, "index.html", t['title'], "page-index")
+        html_content += f"""    <div class="container">
         <div class="header">
-            <h1 data-lang="title">📊 个人项目进度管理系统</h1>
-            <p data-lang="subtitle">管理你的研究项目进度，追踪开发历程</p>
+            <h1>📊 {t['title']}</h1>
+            <p>{t['subtitle']}</p>
         </div>
         
         <div class="nav">
-            <a href="index.html" data-lang="home">🏠 主页</a>
-            <a href="timeline.html" data-lang="timeline">📅 时间线</a>
-            <a href="projects.html" data-lang="projects">📁 项目列表</a>
-            <a href="daily.html" data-lang="daily_view">📅 日视图</a>
-            <a href="weekly.html" data-lang="weekly_view">📅 周视图</a>
-            <a href="monthly.html" data-lang="monthly_view">📅 月视图</a>
+            <a href="index.html">{t['home']}</a>
+            <a href="timeline.html">{t['timeline']}</a>
+            <a href="projects.html">{t['projects']}</a>
+            <a href="daily.html">{t['daily_view']}</a>
+            <a href="weekly.html">{t['weekly_view']}</a>
+            <a href="monthly.html">{t['monthly_view']}</a>
         </div>
         
         <div class="stats">
             <div class="stat-card">
                 <div class="stat-number">{len(projects_data)}</div>
-                <div class="stat-label" data-lang="active_projects">活跃项目</div>
+                <div class="stat-label">{t['active_projects']}</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{sum(len(p.get('progress_entries', [])) for p in projects_data)}</div>
-                <div class="stat-label" data-lang="total_entries">总进度条目</div>
+                <div class="stat-number">{len(self.entry_store)}</div>
+                <div class="stat-label">{t['total_entries']}</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{len(set(p.get('parent_project', '') for p in projects_data))}</div>
-                <div class="stat-label" data-lang="project_categories">大项目分类</div>
+                <div class="stat-number">{self.entry_store.parent_count}</div>
+                <div class="stat-label">{t['project_categories']}</div>
             </div>
         </div>
         
@@ -556,24 +616,10 @@ class PagesGenerator:
 """
         
         # 添加项目卡片
-        for project in projects_data:
-            latest_progress = project.get('progress_entries', [])[-1] if project.get('progress_entries') else None
-            
-            # 从文件名中提取项目ID
-            project_id = None
-            for progress_file in glob.glob(os.path.join(self.projects_dir, "*_progress.json")):
-                try:
-                    with open(progress_file, 'r', encoding='utf-8') as f:
-                        file_data = json.load(f)
-                        if file_data.get('project_name') == project.get('project_name'):
-                            filename = os.path.basename(progress_file)
-                            project_id = filename.replace('_progress.json', '')
-                            break
-                except Exception as e:
-                    print(f"⚠️ 读取进度文件失败 {progress_file}: {e}")
-            
-            if not project_id:
-                project_id = 'unknown'
+        entry_counts = self.entry_store.count_by_project()
+        for project, entry_count in zip(projects_data, entry_counts):
+            latest_progress = self._latest_entry(project)
+            project_id = self._project_id(project)
             
             html_content += f"""
             <div class="project-card" onclick="window.location.href='{project_id}.html'" style="cursor: pointer;">
@@ -585,12 +631,12 @@ class PagesGenerator:
                     <div class="project-goal">{project.get('development_goal', 'No goal set')}</div>
                     <div class="project-stats">
                         <div class="project-stat">
-                            <div class="project-stat-number">{len(project.get('progress_entries', []))}</div>
-                            <div class="project-stat-label">进度条目</div>
+                            <div class="project-stat-number">{entry_count}</div>
+                            <div class="project-stat-label">{t['progress_entries']}</div>
                         </div>
                         <div class="project-stat">
                             <div class="project-stat-number">{project.get('created_date', 'Unknown')}</div>
-                            <div class="project-stat-label">创建日期</div>
+                            <div class="project-stat-label">{t['created_date']}</div>
                         </div>
                     </div>
                     {f'''
@@ -598,7 +644,7 @@ class PagesGenerator:
                         <div class="progress-date">{latest_progress.get('date', '')} {latest_progress.get('time', '')}</div>
                         <div class="progress-description">{latest_progress.get('description', '')}</div>
                     </div>
-                    ''' if latest_progress else '<div class="latest-progress">暂无进度记录</div>'}
+                    ''' if latest_progress else f'<div class="latest-progress">{t["no_progress"]}</div>'}
                 </div>
             </div>
 """
@@ -606,159 +652,49 @@ class PagesGenerator:
         html_content += """
         </div>
     </div>
-    
-    """ + self._get_language_script() + """
 </body>
 </html>"""
         
-        # 保存主页
-        with open(os.path.join(self.pages_dir, "index.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print("✅ 主页生成完成")
+        return html_content
     
     def _generate_project_pages(self, projects_data):
         """生成项目详情页面"""
-        for project in projects_data:
-            project_name = project.get('project_name', 'Unknown')
-            
-            # 从文件名中提取项目ID
-            project_id = None
-            for progress_file in glob.glob(os.path.join(self.projects_dir, "*_progress.json")):
-                try:
-                    with open(progress_file, 'r', encoding='utf-8') as f:
-                        file_data = json.load(f)
-                        if file_data.get('project_name') == project_name:
-                            # 从文件名中提取项目ID
-                            filename = os.path.basename(progress_file)
-                            project_id = filename.replace('_progress.json', '')
-                            break
-                except Exception as e:
-                    print(f"⚠️ 读取进度文件失败 {progress_file}: {e}")
-            
-            if not project_id:
-                project_id = 'unknown'
-            
-            html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{project_name} - 项目进度</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        
-        .container {{
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            background: white;
-            padding: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            margin-bottom: 2rem;
-        }}
-        
-        .project-title {{
-            font-size: 2rem;
-            color: #333;
-            margin-bottom: 1rem;
-        }}
-        
-        .project-meta {{
-            color: #666;
-        }}
-        
-        .progress-timeline {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-        }}
-        
-        .timeline-item {{
-            padding: 1.5rem;
-            border-bottom: 1px solid #eee;
-            position: relative;
-        }}
-        
-        .timeline-item:last-child {{
-            border-bottom: none;
-        }}
-        
-        .timeline-date {{
-            font-weight: bold;
-            color: #667eea;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .timeline-time {{
-            color: #666;
-            font-size: 0.9rem;
-        }}
-        
-        .timeline-description {{
-            margin: 1rem 0;
-            font-weight: 500;
-        }}
-        
-        .timeline-notes {{
-            background: #f8f9fa;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-            color: #666;
-        }}
-        
-        .back-link {{
-            display: inline-block;
-            margin-bottom: 1rem;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-        }}
-        
-        .back-link:hover {{
-            text-decoration: underline;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <a href="index.html" class="back-link">← 返回主页</a>
+        for project_index, project in enumerate(projects_data):
+            project_id = self._project_id(project)
+            if self.streaming:
+                # 摘要不含进度条目，逐个重新读取完整的项目数据
+                project = self.stream_index.load_project(project_index)
+            for lang in self.languages:
+                self._write_page(lang, f"{project_id}.html", self._render_project_html(lang, project_id, project))
+        
+        print(f"✅ 项目页面生成完成 ({len(projects_data)} 个项目)")
+    
+    def _render_project_html(self, lang, project_id, project):
+        """渲染项目详情页面HTML"""
+        t = self.languages[lang]
+        project_name = project.get('project_name', 'Unknown')
+        html_content = self._render_page_start(lang, f"{project_id}.html", f"{project_name} - {t['project_progress']}", "page-project")
+        html_content += f"""    <div class="container">
+        <a href="index.html" class="back-link">{t['back_to_home']}</a>
         
         <div class="header">
             <h1 class="project-title">{project_name}</h1>
             <div class="project-meta">
-                <p><strong>隶属大项目:</strong> {project.get('parent_project', 'Unknown')}</p>
-                <p><strong>开发目标:</strong> {project.get('development_goal', 'No goal set')}</p>
-                <p><strong>创建日期:</strong> {project.get('created_date', 'Unknown')}</p>
-                <p><strong>最后更新:</strong> {project.get('last_updated', 'Unknown')}</p>
+                <p><strong>{t['parent_project']}:</strong> {project.get('parent_project', 'Unknown')}</p>
+                <p><strong>{t['development_goal']}:</strong> {project.get('development_goal', 'No goal set')}</p>
+                <p><strong>{t['created_date']}:</strong> {project.get('created_date', 'Unknown')}</p>
+                <p><strong>{t['last_updated']}:</strong> {project.get('last_updated', 'Unknown')}</p>
             </div>
         </div>
         
         <div class="progress-timeline">
 """
-            
-            # 添加进度条目
-            progress_entries = project.get('progress_entries', [])
-            if progress_entries:
-                for entry in reversed(progress_entries):
-                    html_content += f"""
+        
+        # 添加进度条目
+        progress_entries = project.get('progress_entries', [])
+        if progress_entries:
+            for entry in reversed(progress_entries):
+                html_content += f"""
             <div class="timeline-item">
                 <div class="timeline-date">{entry.get('date', '')}</div>
                 <div class="timeline-time">{entry.get('time', '')}</div>
@@ -766,209 +702,48 @@ class PagesGenerator:
                 {f'<div class="timeline-notes">{entry.get("notes", "")}</div>' if entry.get('notes') else ''}
             </div>
 """
-            else:
-                html_content += """
+        else:
+            html_content += f"""
             <div class="timeline-item">
-                <p>暂无进度记录</p>
+                <p>{t['no_progress']}</p>
             </div>
 """
-            
-            html_content += """
+        
+        html_content += """
         </div>
     </div>
 </body>
 </html>"""
-            
-            # 保存项目页面
-            project_file = os.path.join(self.pages_dir, f"{project_id}.html")
-            with open(project_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
         
-        print(f"✅ 项目页面生成完成 ({len(projects_data)} 个项目)")
+        return html_content
     
     def _generate_projects_list_page(self, projects_data):
         """生成项目列表页面"""
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title data-lang="project_list_title">项目列表 - 个人项目进度管理系统</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            background: white;
-            padding: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            margin-bottom: 2rem;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            color: #333;
-            margin-bottom: 1rem;
-        }}
-        
-        .projects-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-            gap: 1.5rem;
-        }}
-        
-        .project-card {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-            transition: transform 0.3s ease;
-            cursor: pointer;
-        }}
-        
-        .project-card:hover {{
-            transform: translateY(-5px);
-        }}
-        
-        .project-header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 1.5rem;
-        }}
-        
-        .project-name {{
-            font-size: 1.3rem;
-            font-weight: bold;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .project-parent {{
-            opacity: 0.9;
-            font-size: 0.9rem;
-        }}
-        
-        .project-body {{
-            padding: 1.5rem;
-        }}
-        
-        .project-goal {{
-            color: #666;
-            margin-bottom: 1rem;
-            font-style: italic;
-        }}
-        
-        .project-stats {{
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 1rem;
-        }}
-        
-        .project-stat {{
-            text-align: center;
-        }}
-        
-        .project-stat-number {{
-            font-weight: bold;
-            color: #667eea;
-        }}
-        
-        .project-stat-label {{
-            font-size: 0.8rem;
-            color: #666;
-        }}
-        
-        .latest-progress {{
-            background: #f8f9fa;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-        }}
-        
-        .progress-date {{
-            font-size: 0.8rem;
-            color: #666;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .progress-description {{
-            font-weight: 500;
-        }}
-        
-        .back-link {{
-            display: inline-block;
-            margin-bottom: 1rem;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-        }}
-        
-        .back-link:hover {{
-            text-decoration: underline;
-        }}
-        
-        .empty-state {{
-            text-align: center;
-            padding: 3rem;
-            color: #666;
-        }}
-        
-        {self._get_language_switcher_css()}
-    </style>
-</head>
-<body>
-    <!-- 语言切换器 -->
-    <div class="language-switcher">
-        <button onclick="switchLanguage('zh')" class="active">中文</button>
-        <button onclick="switchLanguage('en')">English</button>
-    </div>
+        for lang in self.languages:
+            self._write_page(lang, "projects.html", self._render_projects_list_html(lang, projects_data))
+        
+        print("✅ 项目列表页面生成完成")
     
-    <div class="container">
-        <a href="index.html" class="back-link" data-lang="back_to_home">← 返回主页</a>
+    def _render_projects_list_html(self, lang, projects_data):
+        """渲染项目列表页面HTML"""
+        t = self.languages[lang]
+        html_content = self._render_page_start(lang, "projects.html", f"{t['project_list_title']} - {t['title']}", "page-projects")
+        html_content += f"""    <div class="container">
+        <a href="index.html" class="back-link">{t['back_to_home']}</a>
         
         <div class="header">
-            <h1 data-lang="project_list_title">📁 项目列表</h1>
-            <p data-lang="project_list_subtitle">查看所有项目的详细信息和进度</p>
+            <h1>{t['project_list_title']}</h1>
+            <p>{t['project_list_subtitle']}</p>
         </div>
         
         <div class="projects-grid">
 """
         
         if projects_data:
-            for project in projects_data:
-                latest_progress = project.get('progress_entries', [])[-1] if project.get('progress_entries') else None
-                
-                # 从文件名中提取项目ID
-                project_id = None
-                for progress_file in glob.glob(os.path.join(self.projects_dir, "*_progress.json")):
-                    try:
-                        with open(progress_file, 'r', encoding='utf-8') as f:
-                            file_data = json.load(f)
-                            if file_data.get('project_name') == project.get('project_name'):
-                                filename = os.path.basename(progress_file)
-                                project_id = filename.replace('_progress.json', '')
-                                break
-                    except Exception as e:
-                        print(f"⚠️ 读取进度文件失败 {progress_file}: {e}")
-                
-                if not project_id:
-                    project_id = 'unknown'
+            entry_counts = self.entry_store.count_by_project()
+            for project, entry_count in zip(projects_data, entry_counts):
+                latest_progress = self._latest_entry(project)
+                project_id = self._project_id(project)
                 
                 html_content += f"""
             <div class="project-card" onclick="window.location.href='{project_id}.html'">
@@ -980,12 +755,12 @@ class PagesGenerator:
                     <div class="project-goal">"{project.get('development_goal', 'No goal set')}"</div>
                     <div class="project-stats">
                         <div class="project-stat">
-                            <div class="project-stat-number">{len(project.get('progress_entries', []))}</div>
-                            <div class="project-stat-label" data-lang="progress_entries">进度条目</div>
+                            <div class="project-stat-number">{entry_count}</div>
+                            <div class="project-stat-label">{t['progress_entries']}</div>
                         </div>
                         <div class="project-stat">
                             <div class="project-stat-number">{project.get('created_date', 'Unknown')}</div>
-                            <div class="project-stat-label" data-lang="created_date">创建日期</div>
+                            <div class="project-stat-label">{t['created_date']}</div>
                         </div>
                     </div>
                     {f'''
@@ -993,162 +768,134 @@ class PagesGenerator:
                         <div class="progress-date">{latest_progress.get('date', '')} {latest_progress.get('time', '')}</div>
                         <div class="progress-description">{latest_progress.get('description', '')}</div>
                     </div>
-                    ''' if latest_progress else '<div class="latest-progress" data-lang="no_progress">暂无进度记录</div>'}
+                    ''' if latest_progress else f'<div class="latest-progress">{t["no_progress"]}</div>'}
                 </div>
             </div>
 """
         else:
-            html_content += """
+            html_content += f"""
             <div class="empty-state">
-                <h2 data-lang="no_projects">📭 暂无项目</h2>
-                <p data-lang="no_projects_desc">还没有创建任何项目，请先初始化一个项目。</p>
+                <h2>{t['no_projects']}</h2>
+                <p>{t['no_projects_desc']}</p>
             </div>
 """
         
         html_content += """
         </div>
     </div>
-    
-    """ + self._get_language_script() + """
 </body>
 </html>"""
         
-        # 保存项目列表页面
-        with open(os.path.join(self.pages_dir, "projects.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print("✅ 项目列表页面生成完成")
+        return html_content
     
+    def _project_entry_stream(self, project):
+        """按从新到旧的顺序产出单个项目的 (时间戳, 条目)"""
+        entries = project.progress_entries
+        timestamps = [entry.timestamp for entry in entries]
+        
+        # 条目通常按时间顺序追加，只有发现乱序时才对该项目单独排序
+        order = range(len(entries) - 1, -1, -1)
+        if any(timestamps[i] > timestamps[i + 1] for i in range(len(timestamps) - 1)):
+            order = sorted(order, key=lambda i: timestamps[i], reverse=True)
+        
+        # 条目通过所属项目提供 project_name/parent_project，无需复制
+        for i in order:
+            yield timestamps[i], entries[i]
+
+    def _iter_timeline_entries(self, projects_data):
+        """对各项目的条目流做堆多路归并，按 (日期, 时间) 从新到旧产出条目"""
+        if self.streaming:
+            yield from self.stream_index.iter_timeline()
+            return
+        streams = [self._project_entry_stream(project) for project in projects_data]
+        for _, entry in heapq.merge(*streams, key=lambda item: item[0], reverse=True):
+            yield entry
+
     def _generate_timeline_page(self, projects_data):
-        """生成时间线页面"""
-        # 收集所有进度条目
-        all_entries = []
-        for project in projects_data:
-            for entry in project.get('progress_entries', []):
-                entry['project_name'] = project.get('project_name', 'Unknown')
-                entry['parent_project'] = project.get('parent_project', 'Unknown')
-                all_entries.append(entry)
+        """生成分页的时间线页面"""
+        # 分页编号从最早的条目开始，旧页面的URL和内容保持稳定；
+        # 归并流从最新条目开始，最新一页只装余下不满一页的条目
+        total = len(self.entry_store)
+        page_size = self.timeline_page_size
+        page_count = max(1, (total + page_size - 1) // page_size)
+        
+        entry_stream = self._iter_timeline_entries(projects_data)
+        written = 0
+        page_ranges = []
+        for page_no in range(page_count, 0, -1):
+            # 页面内按从新到旧展示
+            page_len = total - (page_count - 1) * page_size if page_no == page_count else page_size
+            page_entries = list(itertools.islice(entry_stream, page_len))
+            if page_entries:
+                page_ranges.append((page_no, page_entries[-1].get('date', ''), page_entries[0].get('date', ''), len(page_entries)))
+            
+            for lang in self.languages:
+                page_path = f"timeline/{page_no}.html"
+                html_content = self._render_timeline_html(lang, page_path, page_entries, page_no, page_count)
+                if self._write_page(lang, page_path, html_content):
+                    written += 1
+                
+                # 最新一页同时作为时间线入口页面
+                if page_no == page_count:
+                    html_content = self._render_timeline_html(lang, "timeline.html", page_entries, page_no, page_count)
+                    self._write_page(lang, "timeline.html", html_content)
         
-        # 按日期排序
-        all_entries.sort(key=lambda x: x.get('date', ''), reverse=True)
+        # 生成分页索引
+        for lang in self.languages:
+            self._write_page(lang, "timeline/index.html", self._render_timeline_index_html(lang, page_ranges))
         
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title data-lang="timeline_title">项目进度时间线</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        
-        .container {{
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            background: white;
-            padding: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            margin-bottom: 2rem;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            color: #333;
-            margin-bottom: 1rem;
-        }}
-        
-        .timeline {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-        }}
-        
-        .timeline-item {{
-            padding: 1.5rem;
-            border-bottom: 1px solid #eee;
-            position: relative;
-        }}
-        
-        .timeline-item:last-child {{
-            border-bottom: none;
-        }}
-        
-        .timeline-date {{
-            font-weight: bold;
-            color: #667eea;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .timeline-project {{
-            color: #666;
-            font-size: 0.9rem;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .timeline-description {{
-            margin: 1rem 0;
-            font-weight: 500;
-        }}
-        
-        .timeline-notes {{
-            background: #f8f9fa;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-            color: #666;
-        }}
-        
-        .back-link {{
-            display: inline-block;
-            margin-bottom: 1rem;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-        }}
-        
-        .back-link:hover {{
-            text-decoration: underline;
-        }}
-        
-        {self._get_language_switcher_css()}
-    </style>
-</head>
-<body>
-    <!-- 语言切换器 -->
-    <div class="language-switcher">
-        <button onclick="switchLanguage('zh')" class="active">中文</button>
-        <button onclick="switchLanguage('en')">English</button>
-    </div>
+        print(f"✅ 时间线页面生成完成 ({page_count} 页，更新 {written} 个页面文件)")
     
-    <div class="container">
-        <a href="index.html" class="back-link" data-lang="back_to_home">← 返回主页</a>
+    def _timeline_nav(self, lang, page_no, page_count, root):
+        """生成时间线分页导航，不包含总页数，旧页面不会因新增条目而变化"""
+        t = self.languages[lang]
+        links = [f'<a href="{root}timeline.html">{t["latest_page"]}</a>']
+        if page_no < page_count:
+            links.append(f'<a href="{root}timeline/{page_no + 1}.html">{t["newer_page"]}</a>')
+        links.append(f'<span class="current-page">{t["page_label"].format(page=page_no)}</span>')
+        if page_no > 1:
+            links.append(f'<a href="{root}timeline/{page_no - 1}.html">{t["older_page"]}</a>')
+        links.append(f'<a href="{root}timeline/index.html">{t["all_pages"]}</a>')
+        return '<div class="pagination">\n            ' + '\n            '.join(links) + '\n        </div>'
+    
+    def _render_timeline_index_html(self, lang, page_ranges):
+        """渲染时间线分页索引页面"""
+        t = self.languages[lang]
+        page_path = "timeline/index.html"
+        root = self._page_root(page_path)
+        items = ""
+        for page_no, first_date, last_date, count in page_ranges:
+            items += f"""
+            <div class="timeline-item">
+                <div class="timeline-date"><a href="{root}timeline/{page_no}.html">{t['page_label'].format(page=page_no)}</a></div>
+                <div class="timeline-project">{t['page_range'].format(first=first_date, last=last_date, count=count)}</div>
+            </div>
+"""
+        return self._render_timeline_html(lang, page_path, [], items_html=items)
+    
+    def _render_timeline_html(self, lang, page_path, all_entries, page_no=None, page_count=None, items_html=None):
+        """渲染时间线页面HTML"""
+        t = self.languages[lang]
+        root = self._page_root(page_path)
+        nav_html = self._timeline_nav(lang, page_no, page_count, root) if page_no else ""
+        html_content = self._render_page_start(lang, page_path, t['timeline_title'], "page-timeline")
+        html_content += f"""    <div class="container">
+        <a href="{root}index.html" class="back-link">{t['back_to_home']}</a>
         
         <div class="header">
-            <h1 data-lang="timeline_title">📅 项目进度时间线</h1>
-            <p data-lang="timeline_subtitle">按时间顺序查看所有项目进度</p>
+            <h1>{t['timeline_title']}</h1>
+            <p>{t['timeline_subtitle']}</p>
         </div>
         
+        {nav_html}
+        
         <div class="timeline">
 """
         
         # 添加时间线条目
-        if all_entries:
+        if items_html is not None:
+            html_content += items_html
+        elif all_entries:
             for entry in all_entries:
                 html_content += f"""
             <div class="timeline-item">
@@ -1159,211 +906,157 @@ class PagesGenerator:
             </div>
 """
         else:
-            html_content += """
+            html_content += f"""
             <div class="timeline-item">
-                <p>暂无进度记录</p>
+                <p>{t['no_progress']}</p>
             </div>
 """
         
         html_content += """
         </div>
+        
+        """ + nav_html + """
     </div>
-    
-    """ + self._get_language_script() + """
 </body>
 </html>"""
         
-        # 保存时间线页面
-        with open(os.path.join(self.pages_dir, "timeline.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print("✅ 时间线页面生成完成")
+        return html_content
 
-    def _generate_daily_view_page(self, projects_data):
-        """生成日视图页面"""
-        # 获取所有进度条目的日期
-        all_dates = set()
+    def _build_date_index(self, projects_data):
+        """一次遍历建立 日期 -> 进度条目 的索引，供日/周/月视图共用"""
+        date_index = {}
+        skipped = 0
         for project in projects_data:
-            for entry in project.get('progress_entries', []):
-                if entry.get('date'):
-                    all_dates.add(entry.get('date'))
-        
+            for entry in project.progress_entries:
+                entry_date = entry.get('date')
+                if not valid_date(entry_date):
+                    # 格式无效的日期不能用作归档页面和数据分片的键
+                    skipped += 1
+                    continue
+                date_index.setdefault(entry_date, []).append(entry)
+        self._warn_invalid_dates(skipped)
+
+        # 每天的条目按时间排序
+        for entries in date_index.values():
+            entries.sort(key=lambda x: x.get('time', ''))
+
+        return date_index
+
+    def _build_entry_store(self, projects_data):
+        """建立列式条目存储；流式模式下扫描时已经建好"""
+        if self.streaming:
+            store = self.stream_index.store
+        else:
+            store = EntryStore.from_projects(projects_data)
+        print(f"✅ 条目统计: {len(store)} 条进度，{store.parent_count} 个大项目，"
+              f"{len(store.count_by_day())} 个活跃日期，{len(store.count_by_month())} 个活跃月份")
+        return store
+
+    def _period_nav_hrefs(self, keys, current, subdir, root):
+        """计算上一个/下一个有记录周期的链接（跳过空周期）"""
+        position = bisect.bisect_left(keys, current)
+        prev_key = keys[position - 1] if position > 0 else None
+        if position < len(keys) and keys[position] == current:
+            position += 1
+        next_key = keys[position] if position < len(keys) else None
+
+        prev_href = f"{root}{subdir}/{prev_key}.html" if prev_key else None
+        next_href = f"{root}{subdir}/{next_key}.html" if next_key else None
+        return prev_href, next_href
+
+    def _nav_button(self, css_class, href, label, step):
+        """生成周期导航按钮，没有目标时显示为禁用状态"""
+        if href:
+            return f'<a class="{css_class}" href="{href}" data-step="{step}">{label}</a>'
+        return f'<span class="{css_class} disabled" data-step="{step}">{label}</span>'
+
+    def _generate_data_shards(self, date_index):
+        """按月生成进度条目数据分片及活跃月份清单，供日/周/月视图按需加载"""
+        # 各月条目数取自列式存储；日期无法解析的条目不计入统计，也不会显示在日历中，只有这类条目的月份不生成分片
+        store_counts = self.entry_store.count_by_month()
+        # 日期已排序，按月份分组后逐个写出，内存中只保留一个月的分片
+        month_counts = {}
+        for month_key, month_dates in itertools.groupby(sorted(date_index), key=lambda entry_date: entry_date[:7]):
+            if month_key not in store_counts:
+                continue
+            shard = []
+            for entry_date in month_dates:
+                for entry in date_index[entry_date]:
+                    shard.append({
+                        'date': entry_date,
+                        'time': entry.get('time', ''),
+                        'project_name': entry.get('project_name', ''),
+                        'parent_project': entry.get('parent_project', ''),
+                        'description': entry.get('description', ''),
+                        'notes': entry.get('notes', '')
+                    })
+            self.output.write(f"data/{month_key}.json", json_codec.dumps(shard, compact=True))
+            month_counts[month_key] = store_counts[month_key]
+
+        # 清单只记录有记录的月份及条目数，前端据此避免请求不存在的分片，
+        # 原地切换周期后从相邻月份的分片中找出上一个/下一个有记录的日期
+        manifest = {'months': month_counts}
+        self.output.write("data/manifest.json", json_codec.dumps(manifest, compact=True))
+
+        print(f"✅ 数据分片生成完成 ({len(month_counts)} 个月份)")
+
+    def _get_calendar_script(self, lang, view, current_key, root):
+        """获取日/周/月视图按需加载数据分片的脚本引用标签"""
+        t = self.languages[lang]
+        labels = {key: t[key] for key in ('weekdays', 'week_range', 'month_label', 'no_progress_short',
+                                          'no_daily_progress', 'no_daily_progress_desc')}
+        labels_attr = html.escape(json_codec.dumps(labels, compact=True))
+        return (f'<script src="{root}../{self.assets["calendar"]}" data-view="{view}" '
+                f'data-current="{current_key}" data-root="{root}../" data-pages="{root}" data-labels="{labels_attr}"></script>')
+
+    def _generate_daily_view_page(self, projects_data, date_index):
+        """生成日视图页面及每个有记录日期的归档页面"""
+        all_dates = sorted(date_index)
+
         # 如果有数据，使用最新的日期；否则使用今天的日期
         if all_dates:
-            default_date = max(all_dates)
+            default_date = all_dates[-1]
         else:
             default_date = datetime.now().strftime('%Y-%m-%d')
-        
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title data-lang="daily_view_title">日视图 - 个人项目进度管理系统</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            background: white;
-            padding: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            margin-bottom: 2rem;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            color: #333;
-            margin-bottom: 1rem;
-        }}
-        
-        .date-navigation {{
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }}
-        
-        .date-nav-btn {{
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 5px;
-            cursor: pointer;
-            font-weight: 500;
-            transition: background 0.3s ease;
-        }}
-        
-        .date-nav-btn:hover {{
-            background: #5a6fd8;
-        }}
-        
-        .current-date {{
-            font-size: 1.2rem;
-            font-weight: bold;
-            color: #333;
-            min-width: 150px;
-            text-align: center;
-        }}
-        
-        .daily-progress {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-        }}
-        
-        .progress-item {{
-            padding: 1.5rem;
-            border-bottom: 1px solid #eee;
-            position: relative;
-        }}
-        
-        .progress-item:last-child {{
-            border-bottom: none;
-        }}
-        
-        .progress-time {{
-            font-weight: bold;
-            color: #667eea;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .progress-project {{
-            color: #666;
-            font-size: 0.9rem;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .progress-description {{
-            margin: 1rem 0;
-            font-weight: 500;
-        }}
-        
-        .progress-notes {{
-            background: #f8f9fa;
-            padding: 1rem;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-            color: #666;
-        }}
-        
-        .back-link {{
-            display: inline-block;
-            margin-bottom: 1rem;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-        }}
-        
-        .back-link:hover {{
-            text-decoration: underline;
-        }}
-        
-        .empty-state {{
-            text-align: center;
-            padding: 3rem;
-            color: #666;
-        }}
-        
-        {self._get_language_switcher_css()}
-    </style>
-</head>
-<body>
-    <!-- 语言切换器 -->
-    <div class="language-switcher">
-        <button onclick="switchLanguage('zh')" class="active">中文</button>
-        <button onclick="switchLanguage('en')">English</button>
-    </div>
-    
-    <div class="container">
-        <a href="index.html" class="back-link" data-lang="back_to_home">← 返回主页</a>
+
+        # 每个有记录的日期生成一个静态页面，同一日期的各语言版本连续生成以复用取出的条目
+        for target_date in all_dates:
+            page_path = f"daily/{target_date}.html"
+            for lang in self.languages:
+                html_content = self._render_daily_html(lang, page_path, target_date, date_index[target_date], all_dates)
+                self._write_page(lang, page_path, html_content)
+
+        for lang in self.languages:
+            html_content = self._render_daily_html(lang, "daily.html", default_date, date_index.get(default_date, []), all_dates)
+
+            # 保存日视图页面
+            self._write_page(lang, "daily.html", html_content)
+
+        print(f"✅ 日视图页面生成完成 ({len(all_dates)} 个日期归档)")
+
+    def _render_daily_html(self, lang, page_path, default_date, daily_entries, all_dates):
+        """渲染指定日期的日视图HTML"""
+        t = self.languages[lang]
+        root = self._page_root(page_path)
+        prev_href, next_href = self._period_nav_hrefs(all_dates, default_date, "daily", root)
+        html_content = self._render_page_start(lang, page_path, f"{t['daily_view_title']} - {t['title']}", "page-daily")
+        html_content += f"""    <div class="container">
+        <a href="{root}index.html" class="back-link">{t['back_to_home']}</a>
         
         <div class="header">
-            <h1 data-lang="daily_view_title">📅 日视图</h1>
-            <p data-lang="daily_view_subtitle">查看指定日期的项目进度</p>
+            <h1>{t['daily_view_title']}</h1>
+            <p>{t['daily_view_subtitle']}</p>
         </div>
         
         <div class="date-navigation">
-            <button class="date-nav-btn" onclick="changeDate(-1)">← 前一天</button>
+            {self._nav_button('date-nav-btn', prev_href, t['prev_day'], -1)}
             <div class="current-date" id="currentDate">{default_date}</div>
-            <button class="date-nav-btn" onclick="changeDate(1)">后一天 →</button>
+            {self._nav_button('date-nav-btn', next_href, t['next_day'], 1)}
         </div>
         
         <div class="daily-progress" id="dailyProgress">
 """
         
-        # 获取指定日期的进度条目
-        daily_entries = []
-        for project in projects_data:
-            for entry in project.get('progress_entries', []):
-                if entry.get('date') == default_date:
-                    entry['project_name'] = project.get('project_name', 'Unknown')
-                    entry['parent_project'] = project.get('parent_project', 'Unknown')
-                    daily_entries.append(entry)
-        
-        # 按时间排序
-        daily_entries.sort(key=lambda x: x.get('time', ''))
-        
         if daily_entries:
             for entry in daily_entries:
                 html_content += f"""
@@ -1375,10 +1068,10 @@ class PagesGenerator:
             </div>
 """
         else:
-            html_content += """
+            html_content += f"""
             <div class="empty-state">
-                <h2>📭 暂无进度记录</h2>
-                <p>这一天还没有任何项目进度记录。</p>
+                <h2>{t['no_daily_progress']}</h2>
+                <p>{t['no_daily_progress_desc']}</p>
             </div>
 """
         
@@ -1386,256 +1079,71 @@ class PagesGenerator:
         </div>
     </div>
     
-    <script>
-        // 获取所有可用的日期
-        const availableDates = """ + str(sorted(all_dates)) + """;
-        let currentDate = new Date('""" + default_date + """');
-        
-        function changeDate(days) {
-            currentDate.setDate(currentDate.getDate() + days);
-            updateDateDisplay();
-            loadDailyProgress();
-        }
-        
-        function updateDateDisplay() {
-            const dateStr = currentDate.toISOString().split('T')[0];
-            document.getElementById('currentDate').textContent = dateStr;
-        }
-        
-        function loadDailyProgress() {
-            const dateStr = currentDate.toISOString().split('T')[0];
-            window.history.pushState({}, '', `?date=${dateStr}`);
-            
-            // 这里可以添加AJAX请求来动态加载指定日期的进度
-            // 目前只是更新URL参数
-            location.reload();
-        }
-        
-        window.addEventListener('load', function() {
-            const urlParams = new URLSearchParams(window.location.search);
-            const dateParam = urlParams.get('date');
-            if (dateParam) {
-                currentDate = new Date(dateParam);
-                updateDateDisplay();
-            }
-        });
-    </script>
-    
-    """ + self._get_language_script() + """
+    """ + self._get_calendar_script(lang, 'daily', default_date, root) + """
 </body>
 </html>"""
         
-        # 保存日视图页面
-        with open(os.path.join(self.pages_dir, "daily.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print("✅ 日视图页面生成完成")
+        return html_content
+
+    def _generate_weekly_view_page(self, projects_data, date_index):
+        """生成周视图页面及每个有记录周的归档页面"""
+        # 按周一的日期对有记录的日期分组
+        weeks = set()
+        for entry_date in date_index:
+            try:
+                date_obj = datetime.strptime(entry_date, '%Y-%m-%d')
+            except ValueError:
+                continue
+            weeks.add((date_obj - timedelta(days=date_obj.weekday())).strftime('%Y-%m-%d'))
+        all_weeks = sorted(weeks)
 
-    def _generate_weekly_view_page(self, projects_data):
-        """生成周视图页面"""
         # 获取当前周的日期范围
         today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
+        current_week = today - timedelta(days=today.weekday())
+
+        for week_key in all_weeks:
+            start_of_week = datetime.strptime(week_key, '%Y-%m-%d')
+            page_path = f"weekly/{week_key}.html"
+            for lang in self.languages:
+                html_content = self._render_weekly_html(lang, page_path, start_of_week, date_index, all_weeks)
+                self._write_page(lang, page_path, html_content)
+
+        for lang in self.languages:
+            html_content = self._render_weekly_html(lang, "weekly.html", current_week, date_index, all_weeks)
+
+            # 保存周视图页面
+            self._write_page(lang, "weekly.html", html_content)
+
+        print(f"✅ 周视图页面生成完成 ({len(all_weeks)} 个周归档)")
+
+    def _render_weekly_html(self, lang, page_path, start_of_week, date_index, all_weeks):
+        """渲染从指定周一开始的周视图HTML"""
+        t = self.languages[lang]
+        root = self._page_root(page_path)
         end_of_week = start_of_week + timedelta(days=6)
+        week_key = start_of_week.strftime('%Y-%m-%d')
+        prev_href, next_href = self._period_nav_hrefs(all_weeks, week_key, "weekly", root)
+        week_range = t['week_range'].format(start=week_key, end=end_of_week.strftime('%Y-%m-%d'))
+        weekday_headers = '\n                '.join(f'<div class="week-day-header">{name}</div>' for name in t['weekdays'])
         
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title data-lang="weekly_view_title">周视图 - 个人项目进度管理系统</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            background: white;
-            padding: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            margin-bottom: 2rem;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            color: #333;
-            margin-bottom: 1rem;
-        }}
-        
-        .week-navigation {{
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }}
-        
-        .week-nav-btn {{
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 5px;
-            cursor: pointer;
-            font-weight: 500;
-            transition: background 0.3s ease;
-        }}
-        
-        .week-nav-btn:hover {{
-            background: #5a6fd8;
-        }}
-        
-        .current-week {{
-            font-size: 1.2rem;
-            font-weight: bold;
-            color: #333;
-            min-width: 200px;
-            text-align: center;
-        }}
-        
-        .week-calendar {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-        }}
-        
-        .week-header {{
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-            background: #667eea;
-            color: white;
-            font-weight: bold;
-        }}
-        
-        .week-day-header {{
-            padding: 1rem;
-            text-align: center;
-            border-right: 1px solid rgba(255, 255, 255, 0.2);
-        }}
-        
-        .week-day-header:last-child {{
-            border-right: none;
-        }}
-        
-        .week-days {{
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-        }}
-        
-        .week-day {{
-            min-height: 200px;
-            border-right: 1px solid #eee;
-            border-bottom: 1px solid #eee;
-            padding: 1rem;
-        }}
-        
-        .week-day:last-child {{
-            border-right: none;
-        }}
-        
-        .week-day:nth-child(7n) {{
-            border-bottom: none;
-        }}
-        
-        .day-date {{
-            font-weight: bold;
-            color: #667eea;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .day-progress {{
-            font-size: 0.9rem;
-        }}
-        
-        .progress-entry {{
-            background: #f8f9fa;
-            padding: 0.5rem;
-            margin-bottom: 0.5rem;
-            border-radius: 3px;
-            border-left: 3px solid #667eea;
-        }}
-        
-        .progress-entry:last-child {{
-            margin-bottom: 0;
-        }}
-        
-        .progress-time {{
-            font-size: 0.8rem;
-            color: #666;
-        }}
-        
-        .progress-project {{
-            font-weight: 500;
-            margin: 0.25rem 0;
-        }}
-        
-        .progress-description {{
-            font-size: 0.8rem;
-            color: #666;
-        }}
-        
-        .back-link {{
-            display: inline-block;
-            margin-bottom: 1rem;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-        }}
-        
-        .back-link:hover {{
-            text-decoration: underline;
-        }}
-        
-        {self._get_language_switcher_css()}
-    </style>
-</head>
-<body>
-    <!-- 语言切换器 -->
-    <div class="language-switcher">
-        <button onclick="switchLanguage('zh')" class="active">中文</button>
-        <button onclick="switchLanguage('en')">English</button>
-    </div>
-    
-    <div class="container">
-        <a href="index.html" class="back-link" data-lang="back_to_home">← 返回主页</a>
+        html_content = self._render_page_start(lang, page_path, f"{t['weekly_view_title']} - {t['title']}", "page-weekly")
+        html_content += f"""    <div class="container">
+        <a href="{root}index.html" class="back-link">{t['back_to_home']}</a>
         
         <div class="header">
-            <h1 data-lang="weekly_view_title">📅 周视图</h1>
-            <p data-lang="weekly_view_subtitle">查看指定周的项目进度</p>
+            <h1>{t['weekly_view_title']}</h1>
+            <p>{t['weekly_view_subtitle']}</p>
         </div>
         
         <div class="week-navigation">
-            <button class="week-nav-btn" onclick="changeWeek(-1)">← 上一周</button>
-            <div class="current-week" id="currentWeek">{start_of_week.strftime('%Y-%m-%d')} 至 {end_of_week.strftime('%Y-%m-%d')}</div>
-            <button class="week-nav-btn" onclick="changeWeek(1)">下一周 →</button>
+            {self._nav_button('week-nav-btn', prev_href, t['prev_week'], -1)}
+            <div class="current-week" id="currentWeek">{week_range}</div>
+            {self._nav_button('week-nav-btn', next_href, t['next_week'], 1)}
         </div>
         
         <div class="week-calendar">
             <div class="week-header">
-                <div class="week-day-header">周一</div>
-                <div class="week-day-header">周二</div>
-                <div class="week-day-header">周三</div>
-                <div class="week-day-header">周四</div>
-                <div class="week-day-header">周五</div>
-                <div class="week-day-header">周六</div>
-                <div class="week-day-header">周日</div>
+                {weekday_headers}
             </div>
             <div class="week-days" id="weekDays">
 """
@@ -1646,22 +1154,12 @@ class PagesGenerator:
             date = start_of_week + timedelta(days=i)
             week_dates.append(date.strftime('%Y-%m-%d'))
         
-        # 获取一周内的进度条目
-        week_entries = {}
-        for project in projects_data:
-            for entry in project.get('progress_entries', []):
-                entry_date = entry.get('date')
-                if entry_date in week_dates:
-                    if entry_date not in week_entries:
-                        week_entries[entry_date] = []
-                    entry_copy = entry.copy()
-                    entry_copy['project_name'] = project.get('project_name', 'Unknown')
-                    entry_copy['parent_project'] = project.get('parent_project', 'Unknown')
-                    week_entries[entry_date].append(entry_copy)
+        # 从日期索引中取出一周内的进度条目
+        week_entries = {date: date_index[date] for date in week_dates if date in date_index}
         
         # 生成周视图内容
         for i, date in enumerate(week_dates):
-            day_name = ['周一', '周二', '周三', '周四', '周五', '周六', '周日'][i]
+            day_name = t['weekdays'][i]
             date_obj = datetime.strptime(date, '%Y-%m-%d')
             display_date = date_obj.strftime('%m-%d')
             
@@ -1681,9 +1179,9 @@ class PagesGenerator:
                         </div>
 """
             else:
-                html_content += """
+                html_content += f"""
                         <div class="progress-entry">
-                            <div class="progress-description">暂无进度</div>
+                            <div class="progress-description">{t['no_progress_short']}</div>
                         </div>
 """
             
@@ -1697,266 +1195,72 @@ class PagesGenerator:
         </div>
     </div>
     
-    <script>
-        let currentWeekStart = new Date('""" + start_of_week.strftime('%Y-%m-%d') + """');
-        
-        function changeWeek(weeks) {
-            currentWeekStart.setDate(currentWeekStart.getDate() + (weeks * 7));
-            updateWeekDisplay();
-            loadWeekProgress();
-        }
-        
-        function updateWeekDisplay() {
-            const endOfWeek = new Date(currentWeekStart);
-            endOfWeek.setDate(endOfWeek.getDate() + 6);
-            
-            const startStr = currentWeekStart.toISOString().split('T')[0];
-            const endStr = endOfWeek.toISOString().split('T')[0];
-            
-            document.getElementById('currentWeek').textContent = `${startStr} 至 ${endStr}`;
-        }
-        
-        function loadWeekProgress() {
-            const startStr = currentWeekStart.toISOString().split('T')[0];
-            window.history.pushState({}, '', `?week=${startStr}`);
-        }
-        
-        window.addEventListener('load', function() {
-            const urlParams = new URLSearchParams(window.location.search);
-            const weekParam = urlParams.get('week');
-            if (weekParam) {
-                currentWeekStart = new Date(weekParam);
-                updateWeekDisplay();
-            }
-        });
-    </script>
-    
-    """ + self._get_language_script() + """
+    """ + self._get_calendar_script(lang, 'weekly', week_key, root) + """
 </body>
 </html>"""
         
-        # 保存周视图页面
-        with open(os.path.join(self.pages_dir, "weekly.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print("✅ 周视图页面生成完成")
+        return html_content
+
+    def _generate_monthly_view_page(self, projects_data, date_index):
+        """生成月视图页面及每个有记录月份的归档页面"""
+        all_months = sorted({entry_date[:7] for entry_date in date_index if len(entry_date) >= 7})
 
-    def _generate_monthly_view_page(self, projects_data):
-        """生成月视图页面"""
         # 获取当前月份
         today = datetime.now()
-        current_month = today.strftime('%Y-%m')
+
+        for month_key in all_months:
+            try:
+                year, month = int(month_key[:4]), int(month_key[5:7])
+            except ValueError:
+                continue
+            page_path = f"monthly/{month_key}.html"
+            for lang in self.languages:
+                html_content = self._render_monthly_html(lang, page_path, year, month, date_index, all_months)
+                self._write_page(lang, page_path, html_content)
+
+        for lang in self.languages:
+            html_content = self._render_monthly_html(lang, "monthly.html", today.year, today.month, date_index, all_months)
+
+            # 保存月视图页面
+            self._write_page(lang, "monthly.html", html_content)
+
+        print(f"✅ 月视图页面生成完成 ({len(all_months)} 个月份归档)")
+
+    def _render_monthly_html(self, lang, page_path, year, month, date_index, all_months):
+        """渲染指定月份的月视图HTML"""
+        t = self.languages[lang]
+        root = self._page_root(page_path)
+        today = datetime.now()
+        month_key = f"{year:04d}-{month:02d}"
+        prev_href, next_href = self._period_nav_hrefs(all_months, month_key, "monthly", root)
+        month_label = t['month_label'].format(year=f"{year:04d}", month=f"{month:02d}")
+        weekday_headers = '\n                '.join(f'<div class="month-day-header">{name}</div>' for name in t['weekdays'])
         
-        html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title data-lang="monthly_view_title">月视图 - 个人项目进度管理系统</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }}
-        
-        .header {{
-            background: white;
-            padding: 2rem;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            margin-bottom: 2rem;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            color: #333;
-            margin-bottom: 1rem;
-        }}
-        
-        .month-navigation {{
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }}
-        
-        .month-nav-btn {{
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 5px;
-            cursor: pointer;
-            font-weight: 500;
-            transition: background 0.3s ease;
-        }}
-        
-        .month-nav-btn:hover {{
-            background: #5a6fd8;
-        }}
-        
-        .current-month {{
-            font-size: 1.2rem;
-            font-weight: bold;
-            color: #333;
-            min-width: 150px;
-            text-align: center;
-        }}
-        
-        .month-calendar {{
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            overflow: hidden;
-        }}
-        
-        .month-header {{
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-            background: #667eea;
-            color: white;
-            font-weight: bold;
-        }}
-        
-        .month-day-header {{
-            padding: 1rem;
-            text-align: center;
-            border-right: 1px solid rgba(255, 255, 255, 0.2);
-        }}
-        
-        .month-day-header:last-child {{
-            border-right: none;
-        }}
-        
-        .month-days {{
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-        }}
-        
-        .month-day {{
-            min-height: 120px;
-            border-right: 1px solid #eee;
-            border-bottom: 1px solid #eee;
-            padding: 0.5rem;
-            position: relative;
-        }}
-        
-        .month-day:last-child {{
-            border-right: none;
-        }}
-        
-        .month-day:nth-child(7n) {{
-            border-bottom: none;
-        }}
-        
-        .month-day.other-month {{
-            background: #f8f9fa;
-            color: #999;
-        }}
-        
-        .month-day.today {{
-            background: #e3f2fd;
-        }}
-        
-        .day-number {{
-            font-weight: bold;
-            color: #333;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .day-progress {{
-            font-size: 0.8rem;
-        }}
-        
-        .progress-indicator {{
-            background: #667eea;
-            color: white;
-            padding: 0.2rem 0.4rem;
-            border-radius: 3px;
-            margin-bottom: 0.2rem;
-            font-size: 0.7rem;
-        }}
-        
-        .back-link {{
-            display: inline-block;
-            margin-bottom: 1rem;
-            color: #667eea;
-            text-decoration: none;
-            font-weight: 500;
-        }}
-        
-        .back-link:hover {{
-            text-decoration: underline;
-        }}
-        
-        {self._get_language_switcher_css()}
-    </style>
-</head>
-<body>
-    <!-- 语言切换器 -->
-    <div class="language-switcher">
-        <button onclick="switchLanguage('zh')" class="active">中文</button>
-        <button onclick="switchLanguage('en')">English</button>
-    </div>
-    
-    <div class="container">
-        <a href="index.html" class="back-link" data-lang="back_to_home">← 返回主页</a>
+        html_content = self._render_page_start(lang, page_path, f"{t['monthly_view_title']} - {t['title']}", "page-monthly")
+        html_content += f"""    <div class="container">
+        <a href="{root}index.html" class="back-link">{t['back_to_home']}</a>
         
         <div class="header">
-            <h1 data-lang="monthly_view_title">📅 月视图</h1>
-            <p data-lang="monthly_view_subtitle">查看指定月的项目进度</p>
+            <h1>{t['monthly_view_title']}</h1>
+            <p>{t['monthly_view_subtitle']}</p>
         </div>
         
         <div class="month-navigation">
-            <button class="month-nav-btn" onclick="changeMonth(-1)">← 上个月</button>
-            <div class="current-month" id="currentMonth">{today.strftime('%Y年%m月')}</div>
-            <button class="month-nav-btn" onclick="changeMonth(1)">下个月 →</button>
+            {self._nav_button('month-nav-btn', prev_href, t['prev_month'], -1)}
+            <div class="current-month" id="currentMonth">{month_label}</div>
+            {self._nav_button('month-nav-btn', next_href, t['next_month'], 1)}
         </div>
         
         <div class="month-calendar">
             <div class="month-header">
-                <div class="month-day-header">周一</div>
-                <div class="month-day-header">周二</div>
-                <div class="month-day-header">周三</div>
-                <div class="month-day-header">周四</div>
-                <div class="month-day-header">周五</div>
-                <div class="month-day-header">周六</div>
-                <div class="month-day-header">周日</div>
+                {weekday_headers}
             </div>
             <div class="month-days" id="monthDays">
 """
         
         # 生成月历
-        year, month = today.year, today.month
         cal = calendar.monthcalendar(year, month)
         
-        # 获取当月的进度条目
-        month_entries = {}
-        for project in projects_data:
-            for entry in project.get('progress_entries', []):
-                entry_date = entry.get('date')
-                if entry_date and entry_date.startswith(f"{year:04d}-{month:02d}"):
-                    if entry_date not in month_entries:
-                        month_entries[entry_date] = []
-                    entry_copy = entry.copy()
-                    entry_copy['project_name'] = project.get('project_name', 'Unknown')
-                    month_entries[entry_date].append(entry_copy)
-        
         # 生成月历内容
         for week in cal:
             for day in week:
@@ -1977,8 +1281,9 @@ class PagesGenerator:
                     <div class="day-progress">
 """
                     
-                    if date_str in month_entries:
-                        for entry in month_entries[date_str]:
+                    # 从日期索引中取出当天的进度条目
+                    if date_str in date_index:
+                        for entry in date_index[date_str]:
                             html_content += f"""
                         <div class="progress-indicator" title="{entry.get('project_name', '')}: {entry.get('description', '')}">
                             {entry.get('project_name', '')[:8]}...
@@ -1995,51 +1300,36 @@ class PagesGenerator:
         </div>
     </div>
     
-    <script>
-        let currentMonth = new Date('""" + today.strftime('%Y-%m-01') + """');
-        
-        function changeMonth(months) {
-            currentMonth.setMonth(currentMonth.getMonth() + months);
-            updateMonthDisplay();
-            loadMonthProgress();
-        }
-        
-        function updateMonthDisplay() {
-            const year = currentMonth.getFullYear();
-            const month = currentMonth.getMonth() + 1;
-            document.getElementById('currentMonth').textContent = `${year}年${month.toString().padStart(2, '0')}月`;
-        }
-        
-        function loadMonthProgress() {
-            const year = currentMonth.getFullYear();
-            const month = currentMonth.getMonth() + 1;
-            const monthStr = `${year}-${month.toString().padStart(2, '0')}`;
-            window.history.pushState({}, '', `?month=${monthStr}`);
-        }
-        
-        window.addEventListener('load', function() {
-            const urlParams = new URLSearchParams(window.location.search);
-            const monthParam = urlParams.get('month');
-            if (monthParam) {
-                currentMonth = new Date(monthParam + '-01');
-                updateMonthDisplay();
-            }
-        });
-    </script>
-    
-    """ + self._get_language_script() + """
+    """ + self._get_calendar_script(lang, 'monthly', month_key, root) + """
 </body>
 </html>"""
         
-        # 保存月视图页面
-        with open(os.path.join(self.pages_dir, "monthly.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print("✅ 月视图页面生成完成")
+        return html_content
 
 def main():
+    parser = argparse.ArgumentParser(description="生成GitHub Pages进度展示页面")
+    parser.add_argument('--profile', action='store_true', help='记录每个阶段的耗时、CPU时间、写入字节数和内存峰值')
+    parser.add_argument('--profile-dir', help='为每个阶段保存 cProfile 数据到该目录（需配合 --profile）')
+    parser.add_argument('--profile-report', default='build-profile.json', help='构建报告JSON文件路径')
+    parser.add_argument('--workers', type=int, help='并行解析进度文件的进程数（默认CPU核数）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用进度文件解析缓存')
+    parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_FILE, metavar='PATH',
+                        help=f'从增量更新的 SQLite 索引读取项目（默认 {DEFAULT_INDEX_FILE}）')
+    parser.add_argument('--streaming', action='store_true', help='流式生成：内存只保留摘要和索引，适合非常大的数据集')
+    
+    args = parser.parse_args()
+    
     generator = PagesGenerator()
-    generator.generate_pages()
+    generator.profile = args.profile or bool(args.profile_dir)
+    generator.profile_dir = args.profile_dir
+    generator.profile_report = args.profile_report
+    generator.streaming = args.streaming
+    generator.load_workers = args.workers
+    generator.index_file = args.index
+    if args.no_cache:
+        generator.parse_cache_file = None
+    if not generator.generate_pages():
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -11,6 +11,66 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
+# 本脚本可通过 curl 单独下载运行，不能导入仓库中的模块
+PROJECT_FIELDS = ('project_name', 'parent_project', 'development_goal', 'created_date', 'last_updated')
+ENTRY_FIELDS = ('date', 'time', 'description', 'notes', 'tags')
+
+def _dumps_progress(data):
+    """进度文件的规范格式（与 scripts/progress_json.py 相同）：字段顺序固定，项目字段每行一个，每个条目占一行"""
+    def fields(item, order):
+        keys = [key for key in order if key in item] + sorted(key for key in item if key not in order)
+        return ["%s: %s" % (json.dumps(key, ensure_ascii=False), json.dumps(item[key], ensure_ascii=False)) for key in keys]
+    lines = ["  " + field for field in fields({k: v for k, v in data.items() if k != 'progress_entries'}, PROJECT_FIELDS)]
+    if 'progress_entries' in data:
+        entries = ["    {" + ", ".join(fields(entry, ENTRY_FIELDS)) + "}" for entry in data['progress_entries']]
+        lines.append('  "progress_entries": ' + ("[\n" + ",\n".join(entries) + "\n  ]" if entries else "[]"))
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+def _atomic_write(path, content):
+    """原子写入：临时文件 + fsync + rename + 目录 fsync，中途中断时保留原有内容（与 scripts/atomic_write.py 相同）"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(temp_file, os.stat(path).st_mode & 0o7777)
+        os.replace(temp_file, path)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+# 写入项目 .gitignore 的规则：锁文件和预写日志只在本地使用，不应提交（与 scripts/progress_manager.py 相同）
+GITIGNORE_PATTERNS = ('*_progress.json.lock', '*_progress.json.wal', '.progress_repo.lock', '.sync_queue.json.lock')
+
+def _update_gitignore(project_id):
+    """在项目的 .gitignore 中忽略锁文件和预写日志，已有的规则保持不变"""
+    patterns = list(GITIGNORE_PATTERNS) + [f"{project_id}.lock"]
+    content = ""
+    if os.path.exists(".gitignore"):
+        with open(".gitignore", 'r', encoding='utf-8') as f:
+            content = f.read()
+    existing = {line.strip() for line in content.splitlines()}
+    missing = [pattern for pattern in patterns if pattern not in existing]
+    if not missing:
+        return
+    if content and not content.endswith("\n"):
+        content += "\n"
+    content += "# 进度管理的锁文件和预写日志\n" + "\n".join(missing) + "\n"
+    _atomic_write(".gitignore", content)
+
 def init_project(project_name, parent_project, development_goal):
     """初始化项目进度管理"""
     try:
@@ -31,8 +91,8 @@ def init_project(project_name, parent_project, development_goal):
         
         # 保存配置文件
         config_file = ".progress_config.json"
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        _atomic_write(config_file, json.dumps(config, indent=2, ensure_ascii=False))
+        _update_gitignore(project_id)
         
         # 创建进度文件
         progress_file = f"{project_id}_progress.json"
@@ -45,8 +105,7 @@ def init_project(project_name, parent_project, development_goal):
             "progress_entries": []
         }
         
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, indent=2, ensure_ascii=False)
+        _atomic_write(progress_file, _dumps_progress(progress_data))
         
         # 创建本地更新脚本
         create_local_script()
@@ -78,8 +137,109 @@ def create_local_script():
 import sys
 import os
 import json
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+def _atomic_write(path, content):
+    """原子写入：临时文件 + fsync + rename + 目录 fsync，中途中断时保留原有内容（与 scripts/atomic_write.py 相同）"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(temp_file, os.stat(path).st_mode & 0o7777)
+        os.replace(temp_file, path)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+PROJECT_FIELDS = ('project_name', 'parent_project', 'development_goal', 'created_date', 'last_updated')
+ENTRY_FIELDS = ('date', 'time', 'description', 'notes', 'tags')
+
+def _dumps_progress(data):
+    """进度文件的规范格式（与 scripts/progress_json.py 相同）：字段顺序固定，项目字段每行一个，每个条目占一行"""
+    def fields(item, order):
+        keys = [key for key in order if key in item] + sorted(key for key in item if key not in order)
+        return ["%s: %s" % (json.dumps(key, ensure_ascii=False), json.dumps(item[key], ensure_ascii=False)) for key in keys]
+    lines = ["  " + field for field in fields({k: v for k, v in data.items() if k != 'progress_entries'}, PROJECT_FIELDS)]
+    if 'progress_entries' in data:
+        entries = ["    {" + ", ".join(fields(entry, ENTRY_FIELDS)) + "}" for entry in data['progress_entries']]
+        lines.append('  "progress_entries": ' + ("[\\n" + ",\\n".join(entries) + "\\n  ]" if entries else "[]"))
+    return "{\\n" + ",\\n".join(lines) + "\\n}\\n"
+
+# 等待锁的最长时间（秒），与 scripts/file_lock.py 的 LOCK_TIMEOUT 相同
+LOCK_TIMEOUT = 10.0
+
+@contextmanager
+def _locked(path, timeout=LOCK_TIMEOUT):
+    """持有 <path>.lock 的排他锁，保护读取-追加-写回；等待超过 timeout 秒时抛出 TimeoutError（与 scripts/file_lock.py 相同）"""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"等待文件锁超时: {path}.lock")
+                time.sleep(0.005)
+        yield
+    finally:
+        os.close(fd)
+
+# progress_manager.py 添加进度时写入的预写日志后缀（与 scripts/progress_wal.py 相同）
+WAL_SUFFIX = ".wal"
+
+def _load_progress(progress_file):
+    """读取进度文件并合并预写日志 <进度文件>.wal，返回进度字典；进度文件不存在时返回 None。
+    进度文件第 base 个之后已有的条目按内容跳过，与 scripts/progress_wal.py 的 load_progress 相同"""
+    if not os.path.exists(progress_file):
+        return None
+    with open(progress_file, 'r', encoding='utf-8') as f:
+        progress_data = json.load(f)
+    try:
+        with open(progress_file + WAL_SUFFIX, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        base = json.loads(lines[0])['base']
+    except (FileNotFoundError, IndexError, ValueError, KeyError, TypeError):
+        return progress_data
+    entries = progress_data.setdefault("progress_entries", [])
+    written = entries[base:]
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record['entry'] in written:
+            written.remove(record['entry'])
+            continue
+        entries.append(record['entry'])
+        progress_data["last_updated"] = record['last_updated']
+    return progress_data
+
 def add_progress(description, notes=""):
     """添加进度条目"""
     try:
@@ -101,28 +261,29 @@ def add_progress(description, notes=""):
             "tags": []
         }
         
-        # 读取进度文件
+        # 读取、追加和保存期间持锁，多个终端或 git hook 同时添加时不会丢失条目
         progress_file = f"{config['project_id']}_progress.json"
-        if os.path.exists(progress_file):
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                progress_data = json.load(f)
-        else:
-            progress_data = {
-                "project_name": config["project_name"],
-                "parent_project": config["parent_project"],
-                "development_goal": config["development_goal"],
-                "created_date": datetime.now().strftime("%Y-%m-%d"),
-                "last_updated": datetime.now().isoformat(),
-                "progress_entries": []
-            }
-        
-        # 添加新条目
-        progress_data["progress_entries"].append(progress_entry)
-        progress_data["last_updated"] = datetime.now().isoformat()
-        
-        # 保存进度文件
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, indent=2, ensure_ascii=False)
+        with _locked(progress_file):
+            # 先合并 progress_manager.py 的预写日志，重写进度文件后日志随之作废
+            progress_data = _load_progress(progress_file)
+            if progress_data is None:
+                progress_data = {
+                    "project_name": config["project_name"],
+                    "parent_project": config["parent_project"],
+                    "development_goal": config["development_goal"],
+                    "created_date": datetime.now().strftime("%Y-%m-%d"),
+                    "last_updated": datetime.now().isoformat(),
+                    "progress_entries": []
+                }
+            
+            # 添加新条目
+            progress_data["progress_entries"].append(progress_entry)
+            progress_data["last_updated"] = datetime.now().isoformat()
+            
+            # 保存进度文件（原子写入，中途中断不会截断历史记录）
+            _atomic_write(progress_file, _dumps_progress(progress_data))
+            if os.path.exists(progress_file + WAL_SUFFIX):
+                os.remove(progress_file + WAL_SUFFIX)
         
         print(f"✅ 进度添加成功！")
         print(f"📅 日期: {progress_entry['date']}")
@@ -151,13 +312,11 @@ def show_progress():
         
         # 读取进度文件
         progress_file = f"{config['project_id']}_progress.json"
-        if not os.path.exists(progress_file):
+        progress_data = _load_progress(progress_file)
+        if progress_data is None:
             print("📭 暂无进度记录")
             return True
         
-        with open(progress_file, 'r', encoding='utf-8') as f:
-            progress_data = json.load(f)
-        
         print(f"\\n📊 项目进度: {progress_data['project_name']}")
         print(f"🏷️ 隶属大项目: {progress_data['parent_project']}")
         print(f"🎯 开发目标: {progress_data['development_goal']}")
@@ -180,16 +339,15 @@ def show_progress():
         return False
 
 def sync_to_github():
-    """同步到GitHub"""
+    """同步到GitHub：在当前进程中加载独立同步脚本并运行，不再启动第二个 Python 解释器"""
     try:
         # 检查是否有独立同步脚本
         if os.path.exists("standalone_sync.py"):
-            import subprocess
-            result = subprocess.run([sys.executable, "standalone_sync.py", "sync"], capture_output=True, text=True)
-            print(result.stdout)
-            if result.stderr:
-                print(result.stderr)
-            return result.returncode == 0
+            import importlib.util
+            spec = importlib.util.spec_from_file_location("standalone_sync", "standalone_sync.py")
+            standalone_sync = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(standalone_sync)
+            return standalone_sync.StandaloneProgressSync().sync_to_central()
         else:
             print("⚠️ 独立同步脚本不存在，正在下载...")
             download_standalone_sync()
@@ -228,8 +386,7 @@ if __name__ == "__main__":
         add_progress(description, notes)
 '''
     
-    with open("progress_update.py", 'w', encoding='utf-8') as f:
-        f.write(script_content)
+    _atomic_write("progress_update.py", script_content)
     
     # 设置执行权限
     os.chmod("progress_update.py", 0o755)
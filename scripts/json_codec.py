@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码 - 安装了 orjson 时用它加速读写，否则回退到标准库 json。结果与标准库逐字节相同：
+编码等同于 json.dumps(ensure_ascii=False)，orjson 只用于它能原样复现的格式（紧凑分隔符、indent=2），
+遇到它不支持或写法不同的值时改用标准库；解码失败（NaN、Infinity 等标准库接受的非标准写法）
+或可能超出 64 位的整数也交给标准库
+"""
+
+import json
+
+# orjson 模块，用标准库累计处理的数据达到 FAST_THRESHOLD 字节后才导入，之后的调用都使用它；
+# 导入 orjson 约需 8 ms，add、show 这类只读写几个小文件的命令省下的解析时间抵不上。设为 False 时只用标准库
+orjson = None
+FAST_THRESHOLD = 1024 * 1024
+_processed = 0
+
+JSONDecodeError = json.JSONDecodeError
+
+# 数字映射为 "0"，保留 "e" 和 "."，其余字节映射为空格；之后用子串查找代替正则，检查只比 orjson 本身多一次扫描。
+# 字符串里出现这些写法时只是多走一次标准库
+_NUMBER_MASK = bytes(0x30 if 0x30 <= byte <= 0x39 else byte if byte in b'.e' else 0x20 for byte in range(256))
+
+# orjson 与标准库写法不同的浮点数: 1e16 / 1e+16、1e-7 / 1e-07、0.00001 / 1e-05
+_FLOAT_MISMATCH = (b'0e', b'0.0000')
+
+# 可能超出 64 位的整数，orjson 会把它们读成浮点数
+_LONG_NUMBER = b'0' * 19
+
+# 标准库编码器按参数缓存，省去每次调用 json.dumps 时构造编码器的开销
+_encoders = {}
+
+
+def load_fast_backend():
+    """导入 orjson，返回模块；未安装或已禁用时返回 False"""
+    global orjson
+    if orjson is None:
+        try:
+            import orjson as module
+        except ImportError:
+            module = False
+        orjson = module
+    return orjson
+
+
+def _count(size):
+    """累计标准库处理的字节数，达到阈值时导入 orjson"""
+    global _processed
+    _processed += size
+    if _processed >= FAST_THRESHOLD:
+        load_fast_backend()
+
+
+def backend():
+    """可用的 JSON 库"""
+    return 'orjson' if load_fast_backend() else 'json'
+
+
+def _encoder(indent, compact, sort_keys):
+    key = (indent, compact, sort_keys)
+    encoder = _encoders.get(key)
+    if encoder is None:
+        encoder = _encoders[key] = json.JSONEncoder(ensure_ascii=False, indent=indent, sort_keys=sort_keys,
+                                                    separators=(',', ':') if compact else None)
+    return encoder
+
+
+def _fast_dumps(obj, indent, compact, sort_keys):
+    """用 orjson 编码，结果可能与标准库不同时返回 None"""
+    if indent == 2:
+        option = orjson.OPT_INDENT_2
+    elif indent is None and compact:
+        option = 0
+    else:
+        # 默认分隔符带空格，orjson 不支持；单个标量由缓存的标准库编码器处理同样快
+        return None
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    # 标准库不能编码 datetime 和 dataclass，orjson 也不自动转换，交给下面的异常处理
+    option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    try:
+        content = orjson.dumps(obj, option=option)
+    except TypeError:
+        # 超过 64 位的整数、非字符串键、孤立代理字符等
+        return None
+    masked = content.translate(_NUMBER_MASK)
+    if any(pattern in masked for pattern in _FLOAT_MISMATCH):
+        return None
+    return content.decode('utf-8')
+
+
+def dumps(obj, indent=None, compact=False, sort_keys=False):
+    """编码为字符串，与 json.dumps(obj, ensure_ascii=False, indent=indent, sort_keys=sort_keys) 相同；
+    compact=True 时使用紧凑分隔符 (',', ':')。NaN 和 Infinity 在 orjson 下写为 null"""
+    if orjson:
+        content = _fast_dumps(obj, indent, compact, sort_keys)
+        if content is not None:
+            return content
+    content = _encoder(indent, compact, sort_keys).encode(obj)
+    if orjson is None:
+        _count(len(content))
+    return content
+
+
+def dump(obj, f, **kwargs):
+    """编码后写入文本文件"""
+    f.write(dumps(obj, **kwargs))
+
+
+def loads(data):
+    """解码 str 或 UTF-8 bytes"""
+    if orjson is None:
+        _count(len(data))
+    if orjson:
+        # orjson 解析 bytes 比 str 快；含孤立代理字符的 str 编码后不是合法 UTF-8，会交给标准库
+        content = data if isinstance(data, bytes) else data.encode('utf-8', 'surrogatepass')
+        if _LONG_NUMBER not in content.translate(_NUMBER_MASK):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def load(f):
+    """读取并解码文本或二进制文件"""
+    return loads(f.read())
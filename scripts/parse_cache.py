@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度文件解析缓存 - 按 (路径, mtime_ns, 大小) 缓存解析得到的 Project 对象，未变化的文件不再重复解析；
+mtime 变化而大小相同时（如 git 重新检出）重新计算文件内容的哈希，与缓存的哈希相同才沿用解析结果
+"""
+
+import os
+import pickle
+
+from atomic_write import atomic_write
+
+# 缓存格式或解析结果（如时间戳的计算方式）变化时递增，旧缓存自动失效
+CACHE_VERSION = 4
+
+
+class ParseCache:
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """读取缓存文件，不存在、损坏或版本不符时从空缓存开始"""
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.cache_file, 'rb') as f:
+                # 缓存只由本机构建写入，与进度文件位于同一信任范围
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ 解析缓存无效，将重新生成: {e}")
+            return
+        if isinstance(cache, dict) and cache.get('version') == CACHE_VERSION:
+            self.entries = cache.get('entries', {})
+
+    def get(self, path, stat, content_digest=None):
+        """返回文件的缓存解析结果，文件变化或未缓存时返回 None；
+        mtime 变化时用 content_digest(path) 计算当前内容的哈希，与缓存的哈希相同才算命中，并记下新的 mtime"""
+        cached = self.entries.get(path)
+        if cached is not None and cached[1] == stat.st_size:
+            if cached[0] == stat.st_mtime_ns:
+                self.hits += 1
+                return cached[3]
+            if content_digest is not None and cached[2] is not None and content_digest(path) == cached[2]:
+                self.put(path, stat, cached[3], cached[2])
+                self.hits += 1
+                return cached[3]
+        self.misses += 1
+        return None
+
+    def digest(self, path):
+        """缓存中记录的内容哈希"""
+        cached = self.entries.get(path)
+        return cached[2] if cached is not None else None
+
+    def put(self, path, stat, data, digest=None):
+        """记录文件的解析结果及其内容哈希"""
+        self.entries[path] = (stat.st_mtime_ns, stat.st_size, digest, data)
+        self.dirty = True
+
+    def save(self, live_paths):
+        """淘汰已删除文件的条目，有变化时原子地写回缓存文件"""
+        live_paths = set(live_paths)
+        for path in [path for path in self.entries if path not in live_paths]:
+            del self.entries[path]
+            self.dirty = True
+        if not self.dirty:
+            return
+
+        cache = {
+            'version': CACHE_VERSION,
+            'entries': self.entries
+        }
+        cache_dir = os.path.dirname(self.cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        atomic_write(self.cache_file, pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL))
+        self.dirty = False
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度文件的规范 JSON 格式 - 字段按固定顺序输出（已知字段按定义顺序，其余字段按名称排序），
+项目字段每行一个，每个进度条目占一行且条目内部不缩进。追加条目在 git 中只改动新条目、上一条目末尾的逗号和 last_updated 三行，
+文件也比 indent=2 格式小约 15%。读取仍使用普通的 JSON 解析，旧格式的文件无需转换
+"""
+
+import json_codec
+from progress_model import ENTRY_FIELDS, PROJECT_FIELDS
+
+
+def _ordered(data, fields):
+    """已知字段按 fields 的顺序在前，其余字段按名称排序在后"""
+    keys = [key for key in fields if key in data]
+    keys.extend(sorted(key for key in data if key not in fields))
+    return [(key, data[key]) for key in keys]
+
+
+def dumps_entry(entry):
+    """一个进度条目的单行 JSON"""
+    return '{' + ', '.join(f"{json_codec.dumps(key)}: {json_codec.dumps(value)}" for key, value in _ordered(entry, ENTRY_FIELDS)) + '}'
+
+
+def dumps_entries(entries, indent=""):
+    """条目列表，每个条目占一行"""
+    if not entries:
+        return "[]"
+    return "[\n" + ",\n".join(f"{indent}  {dumps_entry(entry)}" for entry in entries) + f"\n{indent}]"
+
+
+def dumps_progress(data):
+    """进度文件（或分段存储的 project.json）的规范格式，以换行结尾"""
+    fields = {key: value for key, value in data.items() if key != 'progress_entries'}
+    lines = [f"  {json_codec.dumps(key)}: {json_codec.dumps(value)}" for key, value in _ordered(fields, PROJECT_FIELDS)]
+    if 'progress_entries' in data:
+        lines.append(f'  "progress_entries": {dumps_entries(data["progress_entries"], "  ")}')
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+
+def dumps_segment(entries):
+    """分段文件（一个月的条目列表）的规范格式，以换行结尾"""
+    return dumps_entries(entries) + "\n"
@@ -6,25 +6,38 @@
 """
 
 import os
-import json
 import sys
-import time
-import uuid
-import subprocess
-import requests
 from datetime import datetime
-from pathlib import Path
 import argparse
 
+# add/show 常在 git hook 中调用，只导入它们用到的模块；uuid、SQLite 索引、分段存储（gzip）等在用到的命令和分支中导入
+import json_codec
+from progress_model import Project, ProgressEntry
+from atomic_write import atomic_write, atomic_write_json, bulk_writes
+from file_lock import locked
+from progress_json import dumps_progress
+import progress_wal
+
+# 进度存储格式: file 为单个 <id>_progress.json，segmented 为按月分段的 <id>/ 目录
+STORAGE_FORMATS = ('file', 'segmented')
+
+# 初始化时写入项目 .gitignore 的规则：锁文件和预写日志只在本地使用，不应提交
+# （分段存储的锁文件 <项目ID>.lock 按项目ID单独添加，不使用 *.lock 以免忽略项目自己的锁文件）
+GITIGNORE_PATTERNS = ('*_progress.json.lock', '*_progress.json.wal', '.progress_repo.lock', '.sync_queue.json.lock')
+
 class ProgressManager:
     def __init__(self):
         self.config_file = ".progress_config.json"
         self.central_repo_url = "https://github.com/ariusewy/ProgressReport"
         self.projects_dir = "projects"
+        # None 表示使用 project_index.DEFAULT_INDEX_FILE
+        self.index_file = None
         
-    def init_project(self, project_name, parent_project, development_goal):
+    def init_project(self, project_name, parent_project, development_goal, storage='file'):
         """初始化项目进度管理"""
         try:
+            import uuid
+            
             # 生成项目ID
             project_id = str(uuid.uuid4())[:8]
             
@@ -34,15 +47,16 @@ class ProgressManager:
                 "project_name": project_name,
                 "parent_project": parent_project,
                 "development_goal": development_goal,
-                "project_path": str(Path.cwd()),
+                "project_path": os.getcwd(),
                 "central_repo_url": self.central_repo_url,
                 "last_sync": datetime.now().isoformat(),
-                "sync_mode": "realtime"
+                "sync_mode": "realtime",
+                "storage": storage
             }
             
             # 保存配置文件
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self._save_config(config)
+            self._update_gitignore(project_id)
             
             # 创建本地更新脚本
             self._create_local_script()
@@ -52,6 +66,8 @@ class ProgressManager:
             print(f"🆔 项目ID: {project_id}")
             print(f"📊 隶属大项目: {parent_project}")
             print(f"🎯 开发目标: {development_goal}")
+            if storage == 'segmented':
+                print(f"🗂️ 存储格式: 按月分段 ({project_id}/)")
             
             return True
             
@@ -68,44 +84,30 @@ class ProgressManager:
                 return False
             
             # 创建进度条目
-            progress_entry = {
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "time": datetime.now().strftime("%H:%M"),
-                "description": description,
-                "notes": notes,
-                "tags": []
-            }
+            progress_entry = ProgressEntry(
+                datetime.now().strftime("%Y-%m-%d"),
+                datetime.now().strftime("%H:%M"),
+                description,
+                notes
+            )
             
-            # 读取或创建进度文件
-            progress_file = f"{config['project_id']}_progress.json"
-            progress_data = self._load_progress(progress_file)
-            
-            if not progress_data:
-                progress_data = {
-                    "project_name": config["project_name"],
-                    "parent_project": config["parent_project"],
-                    "development_goal": config["development_goal"],
-                    "created_date": datetime.now().strftime("%Y-%m-%d"),
-                    "last_updated": datetime.now().isoformat(),
-                    "progress_entries": []
-                }
-            
-            # 添加新条目
-            progress_data["progress_entries"].append(progress_entry)
-            progress_data["last_updated"] = datetime.now().isoformat()
-            
-            # 保存进度文件
-            self._save_progress(progress_file, progress_data)
+            # 只在读取、追加和写回期间持锁，输出和同步在锁外进行
+            progress_file = self._progress_path(config)
+            with locked(progress_file):
+                if config.get('storage') == 'segmented':
+                    entry_count = self._append_segmented(progress_file, config, progress_entry)
+                else:
+                    entry_count = self._append_file(progress_file, config, progress_entry)
             
             print(f"✅ 进度添加成功！")
-            print(f"📅 日期: {progress_entry['date']}")
-            print(f"⏰ 时间: {progress_entry['time']}")
+            print(f"📅 日期: {progress_entry.date}")
+            print(f"⏰ 时间: {progress_entry.time}")
             print(f"📝 描述: {description}")
             if notes:
                 print(f"📌 附注: {notes}")
             
             # 尝试同步到中央仓库
-            self._sync_to_central(progress_file, progress_data)
+            self._sync_to_central(progress_file, entry_count)
             
             return True
             
@@ -113,6 +115,43 @@ class ProgressManager:
             print(f"❌ 添加进度失败: {e}")
             return False
     
+    def _new_project(self, config):
+        return Project(
+            config["project_name"],
+            config["parent_project"],
+            config["development_goal"],
+            datetime.now().strftime("%Y-%m-%d"),
+            datetime.now().isoformat()
+        )
+    
+    def _append_file(self, progress_file, config, progress_entry):
+        """单文件存储：条目追加到预写日志，日志超过阈值时才合并重写进度文件，返回条目总数"""
+        last_updated = datetime.now().isoformat()
+        if os.path.exists(progress_file):
+            entry_count = progress_wal.append_entry(progress_file, progress_entry.to_dict(), last_updated)
+            if progress_wal.needs_checkpoint(progress_file):
+                progress_wal.checkpoint(progress_file)
+            return entry_count
+        
+        # 首次添加时创建进度文件
+        progress_data = self._new_project(config)
+        progress_data.add_entry(progress_entry)
+        progress_data.last_updated = last_updated
+        self._save_progress(progress_file, progress_data)
+        return len(progress_data.progress_entries)
+    
+    def _append_segmented(self, project_dir, config, progress_entry):
+        """分段存储：只读写项目信息和当月分段，不读取历史条目，返回条目总数"""
+        from progress_segments import is_segmented, load_meta, append_entry
+        
+        if is_segmented(project_dir):
+            fields = load_meta(project_dir)[0]
+        else:
+            fields = self._new_project(config).to_dict()
+            del fields['progress_entries']
+        fields['last_updated'] = datetime.now().isoformat()
+        return append_entry(project_dir, fields, progress_entry.to_dict(), datetime.now().strftime("%Y-%m"))
+    
     def show_progress(self):
         """显示项目进度"""
         try:
@@ -120,27 +159,25 @@ class ProgressManager:
             if not config:
                 return False
             
-            progress_file = f"{config['project_id']}_progress.json"
+            progress_file = self._progress_path(config)
+            if config.get('storage') == 'segmented':
+                return self._show_segmented(progress_file)
             progress_data = self._load_progress(progress_file)
             
             if not progress_data:
                 print("📭 暂无进度记录")
                 return True
             
-            print(f"\n📊 项目进度: {progress_data['project_name']}")
-            print(f"🏷️ 隶属大项目: {progress_data['parent_project']}")
-            print(f"🎯 开发目标: {progress_data['development_goal']}")
-            print(f"📅 创建日期: {progress_data['created_date']}")
-            print(f"🔄 最后更新: {progress_data['last_updated']}")
-            print(f"\n📝 进度记录 ({len(progress_data['progress_entries'])} 条):")
+            print(f"\n📊 项目进度: {progress_data.get('project_name')}")
+            print(f"🏷️ 隶属大项目: {progress_data.get('parent_project')}")
+            print(f"🎯 开发目标: {progress_data.get('development_goal')}")
+            print(f"📅 创建日期: {progress_data.get('created_date')}")
+            print(f"🔄 最后更新: {progress_data.get('last_updated')}")
+            print(f"\n📝 进度记录 ({len(progress_data.progress_entries)} 条):")
             print("-" * 80)
             
-            for entry in reversed(progress_data['progress_entries']):
-                print(f"📅 {entry['date']} {entry['time']}")
-                print(f"   📝 {entry['description']}")
-                if entry['notes']:
-                    print(f"   📌 {entry['notes']}")
-                print()
+            for entry in reversed(progress_data.progress_entries):
+                self._print_entry(entry)
             
             return True
             
@@ -148,6 +185,156 @@ class ProgressManager:
             print(f"❌ 显示进度失败: {e}")
             return False
     
+    def _show_segmented(self, project_dir):
+        """显示分段存储的进度：条目数取自项目信息，分段从新到旧逐个读取"""
+        from progress_segments import is_segmented, load_meta, iter_segments
+        
+        if not is_segmented(project_dir):
+            print("📭 暂无进度记录")
+            return True
+        
+        fields, segments = load_meta(project_dir)
+        print(f"\n📊 项目进度: {fields.get('project_name')}")
+        print(f"🏷️ 隶属大项目: {fields.get('parent_project')}")
+        print(f"🎯 开发目标: {fields.get('development_goal')}")
+        print(f"📅 创建日期: {fields.get('created_date')}")
+        print(f"🔄 最后更新: {fields.get('last_updated')}")
+        print(f"\n📝 进度记录 ({sum(segments.values())} 条):")
+        print("-" * 80)
+        
+        for _, entries in iter_segments(project_dir, reverse=True):
+            for entry in reversed(entries):
+                self._print_entry(entry)
+        return True
+    
+    def _print_entry(self, entry):
+        print(f"📅 {entry.get('date')} {entry.get('time')}")
+        print(f"   📝 {entry.get('description')}")
+        if entry.get('notes'):
+            print(f"   📌 {entry.get('notes')}")
+        print()
+    
+    def convert_storage(self, storage):
+        """在单文件和按月分段两种存储格式之间转换当前项目的进度"""
+        try:
+            config = self._load_config()
+            if not config:
+                return False
+            
+            current = config.get('storage', 'file')
+            if current == storage:
+                print(f"📭 当前已是 {storage} 存储格式")
+                return True
+            
+            from progress_segments import write_segmented, read_segmented
+            
+            source = self._progress_path(config)
+            config['storage'] = storage
+            target = self._progress_path(config)
+            # 新格式的数据和配置一起落盘后才切换，中途中断时配置仍指向旧数据
+            with locked(source), bulk_writes():
+                if os.path.exists(source):
+                    # 单文件存储的数据包括尚未合并的预写日志
+                    data = progress_wal.load_progress(source).to_dict() if current == 'file' else read_segmented(source)[0]
+                    if storage == 'segmented':
+                        write_segmented(target, data, datetime.now().strftime("%Y-%m"))
+                    else:
+                        self._save_progress(target, Project.from_dict(data))
+            self._save_config(config)
+            
+            print(f"✅ 存储格式已转换为 {storage}: {target}")
+            if os.path.exists(source):
+                print(f"💡 确认无误后可删除旧的进度数据: {source}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 转换存储格式失败: {e}")
+            return False
+    
+    def checkpoint_progress(self):
+        """把预写日志合并进进度文件"""
+        try:
+            config = self._load_config()
+            if not config:
+                return False
+            
+            if config.get('storage') == 'segmented':
+                print("📭 分段存储不使用预写日志")
+                return True
+            
+            progress_file = self._progress_path(config)
+            with locked(progress_file):
+                merged = progress_wal.checkpoint(progress_file)
+            print(f"✅ 已合并 {merged} 条预写日志记录到 {progress_file}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 合并预写日志失败: {e}")
+            return False
+    
+    def show_all_progress(self, limit=20, since=None, until=None, project=None, tag=None):
+        """通过 SQLite 索引显示 projects/ 中所有项目的最新进度"""
+        try:
+            index = self._open_index()
+            if not index:
+                return False
+            with index:
+                total = index.count_entries(since, until, project, tag)
+                results = index.latest_entries(limit, since, until, project, tag)
+            
+            print(f"\n📝 最新进度 (共 {total} 条，显示 {len(results)} 条):")
+            print("-" * 80)
+            self._print_index_results(results)
+            return True
+            
+        except Exception as e:
+            print(f"❌ 显示进度失败: {e}")
+            return False
+    
+    def search_progress(self, query, limit=20, since=None, until=None, project=None, tag=None):
+        """通过 SQLite 索引在所有项目的进度描述和附注中检索"""
+        try:
+            index = self._open_index()
+            if not index:
+                return False
+            with index:
+                results = index.search(query, limit, since, until, project, tag)
+            
+            if not results:
+                print(f"📭 没有找到匹配 '{query}' 的进度记录")
+                return True
+            
+            print(f"\n🔍 检索 '{query}' ({len(results)} 条):")
+            print("-" * 80)
+            self._print_index_results(results)
+            return True
+            
+        except Exception as e:
+            print(f"❌ 检索失败: {e}")
+            return False
+    
+    def _open_index(self):
+        """打开并增量更新 projects/ 的索引，进度文件仍是唯一的数据来源"""
+        if not os.path.isdir(self.projects_dir):
+            print(f"❌ 项目目录 {self.projects_dir} 不存在")
+            return None
+        
+        from project_index import ProjectIndex, DEFAULT_INDEX_FILE
+        
+        index = ProjectIndex(self.index_file or DEFAULT_INDEX_FILE).open()
+        for progress_file, error in index.refresh(self.projects_dir):
+            print(f"⚠️ 读取进度文件失败 {progress_file}: {error}")
+        return index
+    
+    def _print_index_results(self, results):
+        """打印索引查询得到的 (项目ID, 条目)"""
+        for project_id, entry in results:
+            print(f"📅 {entry.get('date')} {entry.get('time')}  📁 {entry.project_name} ({entry.parent_project}) [{project_id}]")
+            print(f"   📝 {entry.get('description')}")
+            if entry.get('notes'):
+                print(f"   📌 {entry.get('notes')}")
+            print()
+    
     def _load_config(self):
         """加载项目配置"""
         if not os.path.exists(self.config_file):
@@ -157,26 +344,51 @@ class ProgressManager:
         
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return json_codec.load(f)
         except Exception as e:
             print(f"❌ 读取配置文件失败: {e}")
             return None
     
+    def _progress_path(self, config):
+        """当前项目的进度文件（单文件存储）或进度目录（分段存储）"""
+        if config.get('storage') == 'segmented':
+            return config['project_id']
+        return f"{config['project_id']}_progress.json"
+    
+    def _update_gitignore(self, project_id):
+        """在项目的 .gitignore 中忽略锁文件和预写日志，已有的规则保持不变"""
+        patterns = list(GITIGNORE_PATTERNS) + [f"{project_id}.lock"]
+        content = ""
+        if os.path.exists(".gitignore"):
+            with open(".gitignore", 'r', encoding='utf-8') as f:
+                content = f.read()
+        existing = {line.strip() for line in content.splitlines()}
+        missing = [pattern for pattern in patterns if pattern not in existing]
+        if not missing:
+            return
+        if content and not content.endswith("\n"):
+            content += "\n"
+        content += "# 进度管理的锁文件和预写日志\n" + "\n".join(missing) + "\n"
+        atomic_write(".gitignore", content)
+    
+    def _save_config(self, config):
+        """保存项目配置（原子写入）"""
+        atomic_write_json(self.config_file, config)
+    
     def _load_progress(self, progress_file):
-        """加载进度文件"""
+        """加载进度文件并合并预写日志，返回 Project 对象"""
         if os.path.exists(progress_file):
             try:
-                with open(progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return progress_wal.load_progress(progress_file)
             except Exception as e:
                 print(f"⚠️ 读取进度文件失败: {e}")
         return None
     
     def _save_progress(self, progress_file, progress_data):
-        """保存进度文件"""
+        """保存完整的进度文件（原子写入，中途中断时保留原有内容），旧的预写日志随之作废"""
         try:
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress_data, f, indent=2, ensure_ascii=False)
+            atomic_write(progress_file, dumps_progress(progress_data.to_dict()))
+            progress_wal.discard(progress_file)
         except Exception as e:
             print(f"❌ 保存进度文件失败: {e}")
             raise
@@ -206,20 +418,19 @@ if __name__ == "__main__":
     manager.add_progress(description, notes)
 '''
         
-        with open("progress_update.py", 'w', encoding='utf-8') as f:
-            f.write(script_content)
+        atomic_write("progress_update.py", script_content)
         
         # 设置执行权限
         os.chmod("progress_update.py", 0o755)
     
-    def _sync_to_central(self, progress_file, progress_data):
+    def _sync_to_central(self, progress_file, entry_count):
         """同步到中央仓库"""
         try:
             # 这里应该实现与GitHub的同步逻辑
             # 暂时只是打印信息
             print(f"🔄 尝试同步到中央仓库...")
             print(f"📁 进度文件: {progress_file}")
-            print(f"📊 条目数量: {len(progress_data['progress_entries'])}")
+            print(f"📊 条目数量: {entry_count}")
             
             # TODO: 实现实际的GitHub同步
             # 1. 克隆中央仓库
@@ -238,6 +449,8 @@ def main():
     init_parser.add_argument('project_name', help='项目名称')
     init_parser.add_argument('parent_project', help='隶属大项目')
     init_parser.add_argument('development_goal', help='开发目标')
+    init_parser.add_argument('--storage', choices=STORAGE_FORMATS, default='file',
+                             help='file: 单个进度文件; segmented: 按月分段存储，添加进度只重写当月分段')
     
     # 添加进度命令
     add_parser = subparsers.add_parser('add', help='添加进度')
@@ -246,17 +459,51 @@ def main():
     
     # 显示进度命令
     show_parser = subparsers.add_parser('show', help='显示进度')
+    show_parser.add_argument('--all', action='store_true', help='通过索引显示 projects/ 中所有项目的最新进度')
+    
+    # 检索进度命令
+    search_parser = subparsers.add_parser('search', help='检索 projects/ 中所有项目的进度')
+    search_parser.add_argument('query', help='检索词，多个词之间为"且"的关系')
+    
+    # 合并预写日志命令
+    subparsers.add_parser('checkpoint', help='把预写日志合并进进度文件')
+    
+    # 转换存储格式命令
+    storage_parser = subparsers.add_parser('storage', help='转换进度存储格式')
+    storage_parser.add_argument('format', choices=STORAGE_FORMATS, help='目标存储格式')
+    
+    # 索引查询的公共参数
+    for index_parser in (show_parser, search_parser):
+        index_parser.add_argument('--limit', type=int, default=20, help='最多显示的条目数')
+        index_parser.add_argument('--since', help='起始日期 YYYY-MM-DD（包含）')
+        index_parser.add_argument('--until', help='结束日期 YYYY-MM-DD（包含）')
+        index_parser.add_argument('--project', help='只查询指定项目（项目ID或名称）')
+        index_parser.add_argument('--tag', help='只查询带指定标签的条目')
+        index_parser.add_argument('--projects-dir', default='projects', help='进度文件目录')
+        index_parser.add_argument('--index', help='SQLite 索引文件路径（默认 .cache/index.sqlite3）')
     
     args = parser.parse_args()
     
     manager = ProgressManager()
+    if args.command in ('show', 'search'):
+        manager.projects_dir = args.projects_dir
+        manager.index_file = args.index
     
     if args.command == 'init':
-        manager.init_project(args.project_name, args.parent_project, args.development_goal)
+        manager.init_project(args.project_name, args.parent_project, args.development_goal, args.storage)
     elif args.command == 'add':
         manager.add_progress(args.description, args.notes)
     elif args.command == 'show':
-        manager.show_progress()
+        if args.all:
+            manager.show_all_progress(args.limit, args.since, args.until, args.project, args.tag)
+        else:
+            manager.show_progress()
+    elif args.command == 'checkpoint':
+        manager.checkpoint_progress()
+    elif args.command == 'storage':
+        manager.convert_storage(args.format)
+    elif args.command == 'search':
+        manager.search_progress(args.query, args.limit, args.since, args.until, args.project, args.tag)
     else:
         parser.print_help()
 
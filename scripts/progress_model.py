@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度数据模型 - 各脚本共用的紧凑项目/进度条目对象
+使用 __slots__ 减少每个条目的内存开销，时间戳预先解析为整数，项目名称和日期驻留以共享字符串
+"""
+
+import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+
+ENTRY_FIELDS = ('date', 'time', 'description', 'notes', 'tags')
+PROJECT_FIELDS = ('project_name', 'parent_project', 'development_goal', 'created_date', 'last_updated')
+
+
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+TIME_PATTERN = re.compile(r'([01]\d|2[0-3]):[0-5]\d(:[0-5]\d)?')
+
+
+def valid_date(date):
+    """日期是否为补零的 YYYY-MM-DD 且是真实存在的日期；只有这样的日期才用作归档页面和数据分片的键，
+    字符串顺序与日期顺序一致"""
+    return isinstance(date, str) and _valid_date(date)
+
+
+@lru_cache(maxsize=None)
+def _valid_date(date):
+    # 不同日期的数量有限，结果缓存
+    if not DATE_PATTERN.fullmatch(date):
+        return False
+    try:
+        datetime.strptime(date, '%Y-%m-%d')
+    except ValueError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=4096)
+def _time_value(time):
+    """补零的 HH:MM（可带 :SS）转换为 HHMM，其他形式返回 0"""
+    if not TIME_PATTERN.fullmatch(time):
+        return 0
+    return int(time[:2] + time[3:5])
+
+
+def parse_timestamp(date, time):
+    """把日期和时间解析为可比较的整数时间戳 (YYYYMMDDHHMM)。
+    只接受补零的 YYYY-MM-DD（否则返回 0）和 HH:MM（否则按 00:00 计），
+    时间戳的顺序因此与日期字符串、月份键 date[:7] 的顺序一致"""
+    if not valid_date(date):
+        return 0
+    time_part = _time_value(time) if isinstance(time, str) else 0
+    return int(date.replace('-', '')) * 10000 + time_part
+
+
+def _intern(value):
+    """驻留字符串，非字符串原样返回"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProgressEntry:
+    """单条进度记录；文件中缺少的字段保持未设置，get() 的行为与字典一致"""
+
+    __slots__ = ENTRY_FIELDS + ('timestamp', 'project', 'extra')
+
+    def __init__(self, date, time, description, notes="", tags=None):
+        self.date = _intern(date)
+        self.time = time
+        self.description = description
+        self.notes = notes
+        self.tags = tags if tags is not None else []
+        self.timestamp = parse_timestamp(date, time)
+        self.project = None
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, data, project=None):
+        """从进度文件中的字典创建条目，保留未知字段"""
+        entry = cls.__new__(cls)
+        for key in ENTRY_FIELDS:
+            if key in data:
+                setattr(entry, key, data[key])
+        if 'date' in data:
+            entry.date = _intern(entry.date)
+        entry.timestamp = parse_timestamp(data.get('date'), data.get('time'))
+        entry.project = project
+        extra = {key: value for key, value in data.items() if key not in ENTRY_FIELDS}
+        entry.extra = extra or None
+        return entry
+
+    def to_dict(self):
+        """转换为写入进度文件的字典"""
+        data = {key: getattr(self, key) for key in ENTRY_FIELDS if hasattr(self, key)}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def project_name(self):
+        return self.project.get('project_name', 'Unknown')
+
+    @property
+    def parent_project(self):
+        return self.project.get('parent_project', 'Unknown')
+
+    def get(self, key, default=None):
+        """按字段名取值，字段不存在时返回默认值；project_name/parent_project 来自所属项目"""
+        if key in ENTRY_FIELDS or key in ('project_name', 'parent_project'):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                return default
+        return self.extra.get(key, default) if self.extra else default
+
+
+class Project:
+    """一个项目及其全部进度条目"""
+
+    __slots__ = PROJECT_FIELDS + ('progress_entries', 'extra')
+
+    def __init__(self, project_name, parent_project, development_goal, created_date, last_updated):
+        self.project_name = _intern(project_name)
+        self.parent_project = _intern(parent_project)
+        self.development_goal = development_goal
+        self.created_date = created_date
+        self.last_updated = last_updated
+        self.progress_entries = []
+        self.extra = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """从进度文件中的字典创建项目，保留未知字段"""
+        project = cls.__new__(cls)
+        for key in PROJECT_FIELDS:
+            if key in data:
+                setattr(project, key, data[key])
+        for key in ('project_name', 'parent_project'):
+            if key in data:
+                setattr(project, key, _intern(data[key]))
+        project.progress_entries = [ProgressEntry.from_dict(entry, project) for entry in data.get('progress_entries', [])]
+        extra = {key: value for key, value in data.items() if key not in PROJECT_FIELDS and key != 'progress_entries'}
+        project.extra = extra or None
+        return project
+
+    def to_dict(self):
+        """转换为写入进度文件的字典"""
+        data = {key: getattr(self, key) for key in PROJECT_FIELDS if hasattr(self, key)}
+        data['progress_entries'] = [entry.to_dict() for entry in self.progress_entries]
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def add_entry(self, entry):
+        """追加一条进度记录"""
+        entry.project = self
+        self.progress_entries.append(entry)
+
+    def get(self, key, default=None):
+        """按字段名取值，字段不存在时返回默认值"""
+        if key in PROJECT_FIELDS or key == 'progress_entries':
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                return default
+        return self.extra.get(key, default) if self.extra else default
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+_MISSING = object()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按月分段的进度存储 - <id>/project.json 保存项目信息和各月条目数，<id>/YYYY-MM.json 保存当月条目；
+添加进度只重写项目信息和当月分段，已结束月份的分段压缩为 YYYY-MM.json.gz，读取时按需逐段解压
+"""
+
+import os
+import re
+import gzip
+from types import SimpleNamespace
+
+import json_codec
+from atomic_write import atomic_write, bulk_writes
+from progress_json import dumps_progress, dumps_segment
+
+META_FILE = "project.json"
+SEGMENT_SUFFIX = ".json"
+COLD_SUFFIX = ".json.gz"
+
+# 日期无效的条目单独放在一个分段中
+UNDATED = "undated"
+
+_MONTH_PATTERN = re.compile(r'^\d{4}-\d{2}$')
+
+
+def is_segmented(path):
+    """路径是否为分段存储的项目目录"""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def segment_key(entry_date):
+    """条目所在分段的月份"""
+    month = entry_date[:7] if isinstance(entry_date, str) else ''
+    return month if _MONTH_PATTERN.match(month) else UNDATED
+
+
+def list_segments(project_dir):
+    """按月份排序返回 [(月份, 分段文件路径)]，同一月份同时存在压缩和未压缩文件时取未压缩的"""
+    segments = {}
+    for name in os.listdir(project_dir):
+        path = os.path.join(project_dir, name)
+        if name.endswith(COLD_SUFFIX):
+            segments.setdefault(name[:-len(COLD_SUFFIX)], path)
+        elif name.endswith(SEGMENT_SUFFIX) and name != META_FILE:
+            segments[name[:-len(SEGMENT_SUFFIX)]] = path
+    return sorted(segments.items())
+
+
+def _read_file(path):
+    """读取分段文件的原始字节和解压后的内容"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return raw, gzip.decompress(raw) if path.endswith(COLD_SUFFIX) else raw
+
+
+def load_meta(project_dir):
+    """读取项目信息，返回 (项目字段, {月份: 条目数})"""
+    with open(os.path.join(project_dir, META_FILE), 'rb') as f:
+        meta = json_codec.loads(f.read())
+    segments = meta.pop('segments', {})
+    return meta, segments
+
+
+def load_segment(path):
+    """读取一个分段的条目列表"""
+    return json_codec.loads(_read_file(path)[1])
+
+
+def load_month(project_dir, month):
+    """只读取一个月份的分段，返回 (项目字段, 条目列表)；该月没有分段时条目列表为空"""
+    fields, _ = load_meta(project_dir)
+    for suffix in (SEGMENT_SUFFIX, COLD_SUFFIX):
+        path = os.path.join(project_dir, month + suffix)
+        if os.path.exists(path):
+            return fields, load_segment(path)
+    return fields, []
+
+
+def iter_segments(project_dir, reverse=False):
+    """逐个读取分段，产出 (月份, 条目列表)；只在迭代到时才读取和解压"""
+    segments = list_segments(project_dir)
+    if reverse:
+        segments.reverse()
+    for month, path in segments:
+        yield month, load_segment(path)
+
+
+def read_segmented(project_dir):
+    """读取完整项目，返回 (项目字典, 磁盘上的原始字节)；原始字节用于内容哈希"""
+    with open(os.path.join(project_dir, META_FILE), 'rb') as f:
+        meta_raw = f.read()
+    data = json_codec.loads(meta_raw)
+    data.pop('segments', None)
+    chunks = [meta_raw]
+    entries = []
+    for _, path in list_segments(project_dir):
+        raw, content = _read_file(path)
+        chunks.append(raw)
+        entries.extend(json_codec.loads(content))
+    data['progress_entries'] = entries
+    return data, b''.join(chunks)
+
+
+def segmented_content(project_dir):
+    """只读取磁盘上的原始字节（与 read_segmented 返回的相同），不解压也不解析"""
+    with open(os.path.join(project_dir, META_FILE), 'rb') as f:
+        chunks = [f.read()]
+    for _, path in list_segments(project_dir):
+        with open(path, 'rb') as f:
+            chunks.append(f.read())
+    return b''.join(chunks)
+
+
+def segmented_stat(project_dir):
+    """项目目录的变化标记: 各文件最大的 mtime_ns 和大小之和，与单个文件的 stat 用法相同"""
+    mtime_ns = os.stat(project_dir).st_mtime_ns
+    size = 0
+    with os.scandir(project_dir) as it:
+        for entry in it:
+            if entry.name == META_FILE or entry.name.endswith(SEGMENT_SUFFIX) or entry.name.endswith(COLD_SUFFIX):
+                stat = entry.stat()
+                mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+                size += stat.st_size
+    return SimpleNamespace(st_mtime_ns=mtime_ns, st_size=size)
+
+
+def _segment_path(project_dir, month):
+    return os.path.join(project_dir, month + SEGMENT_SUFFIX)
+
+
+def compress_cold_segments(project_dir, current_month):
+    """把当前月份之前未压缩的分段压缩为 .json.gz，返回压缩的分段数"""
+    compressed = 0
+    for month, path in list_segments(project_dir):
+        if month >= current_month or month == UNDATED or not path.endswith(SEGMENT_SUFFIX):
+            continue
+        with open(path, 'rb') as f:
+            content = f.read()
+        # mtime=0 使相同内容总是得到相同的压缩文件
+        atomic_write(os.path.join(project_dir, month + COLD_SUFFIX), gzip.compress(content, mtime=0))
+        os.remove(path)
+        compressed += 1
+    return compressed
+
+
+def _write_meta(project_dir, fields, segments):
+    meta = dict(fields)
+    meta['segments'] = dict(sorted(segments.items()))
+    atomic_write(os.path.join(project_dir, META_FILE), dumps_progress(meta))
+
+
+def append_entry(project_dir, fields, entry, current_month):
+    """追加一条进度：只读写项目信息和条目所在月份的分段，并压缩已结束月份的分段；返回条目总数"""
+    os.makedirs(project_dir, exist_ok=True)
+    month = segment_key(entry.get('date'))
+    _, segments = load_meta(project_dir) if is_segmented(project_dir) else ({}, {})
+
+    segment_file = _segment_path(project_dir, month)
+    cold_file = os.path.join(project_dir, month + COLD_SUFFIX)
+    if os.path.exists(segment_file):
+        entries = load_segment(segment_file)
+    elif os.path.exists(cold_file):
+        # 补记到已压缩的月份时，该月份重新变为未压缩
+        entries = load_segment(cold_file)
+    else:
+        entries = []
+    entries.append(entry)
+    atomic_write(segment_file, dumps_segment(entries))
+    if os.path.exists(cold_file):
+        os.remove(cold_file)
+
+    segments[month] = len(entries)
+    _write_meta(project_dir, fields, segments)
+    compress_cold_segments(project_dir, current_month)
+    return sum(segments.values())
+
+
+def write_segmented(project_dir, data, current_month):
+    """把完整的项目字典写为分段格式（迁移用，所有分段写完后统一 fsync）"""
+    with bulk_writes():
+        _write_segmented(project_dir, data, current_month)
+
+
+def _write_segmented(project_dir, data, current_month):
+    os.makedirs(project_dir, exist_ok=True)
+    by_month = {}
+    for entry in data.get('progress_entries', []):
+        by_month.setdefault(segment_key(entry.get('date')), []).append(entry)
+
+    # 删除不再需要的旧分段
+    for month, path in list_segments(project_dir):
+        if month not in by_month:
+            os.remove(path)
+    for month, entries in by_month.items():
+        atomic_write(_segment_path(project_dir, month), dumps_segment(entries))
+        cold_file = os.path.join(project_dir, month + COLD_SUFFIX)
+        if os.path.exists(cold_file):
+            os.remove(cold_file)
+
+    fields = {key: value for key, value in data.items() if key != 'progress_entries'}
+    _write_meta(project_dir, fields, {month: len(entries) for month, entries in by_month.items()})
+    compress_cold_segments(project_dir, current_month)
+
+
+def copy_segmented(source_dir, target_dir):
+    """把分段项目目录同步到目标目录：只复制内容变化的文件，删除源目录中已不存在的分段；返回复制的文件数"""
+    with bulk_writes():
+        return _copy_segmented(source_dir, target_dir)
+
+
+def _copy_segmented(source_dir, target_dir):
+    os.makedirs(target_dir, exist_ok=True)
+    names = {META_FILE} | {os.path.basename(path) for _, path in list_segments(source_dir)}
+    copied = 0
+    for name in sorted(names):
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            content = f.read()
+        target_file = os.path.join(target_dir, name)
+        try:
+            with open(target_file, 'rb') as f:
+                if f.read() == content:
+                    continue
+        except FileNotFoundError:
+            pass
+        atomic_write(target_file, content)
+        copied += 1
+    # 已压缩的月份在目标目录中会留下旧的未压缩分段
+    for name in os.listdir(target_dir):
+        if name not in names and (name.endswith(SEGMENT_SUFFIX) or name.endswith(COLD_SUFFIX)):
+            os.remove(os.path.join(target_dir, name))
+    return copied
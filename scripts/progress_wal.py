@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度文件的预写日志 - 添加进度时只向 <进度文件>.wal 追加一行，日志超过大小或时间阈值、或同步之前
+才合并（检查点）重写完整的进度文件；读取时把进度文件和日志合并，结果与每次都重写进度文件相同
+"""
+
+import os
+import time
+
+import json_codec
+from atomic_write import atomic_write
+from progress_json import dumps_entry, dumps_progress
+from progress_model import Project, ProgressEntry
+
+WAL_SUFFIX = ".wal"
+
+# 检查点阈值: 日志大小（字节）和距上次检查点（进度文件的修改时间）的秒数
+WAL_MAX_BYTES = 64 * 1024
+WAL_MAX_AGE = 24 * 3600
+
+
+def wal_path(progress_file):
+    return progress_file + WAL_SUFFIX
+
+
+def _read_wal(progress_file):
+    """读取日志，返回 (基准条目数, 记录列表)；日志不存在时返回 (None, [])。
+    第一行为 {"base": N}，表示写日志头时进度文件已有 N 个条目；之后每行一条记录，末尾写了一半的行被忽略"""
+    try:
+        with open(wal_path(progress_file), 'rb') as f:
+            lines = f.read().decode('utf-8').splitlines()
+    except FileNotFoundError:
+        return None, []
+    records = []
+    for line in lines[1:]:
+        try:
+            records.append(json_codec.loads(line))
+        except ValueError:
+            continue
+    try:
+        base = json_codec.loads(lines[0])['base']
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None, []
+    return base, records
+
+
+def _apply(project, base, records):
+    """把日志记录追加到项目上，进度文件中已有的记录跳过（检查点中断后重放不会重复）。
+    进度文件第 base 个之后的条目既可能是已合并的记录，也可能是不认识日志的写入方（旧版 progress_update.py）
+    直接追加的条目，因此按条目内容而不是位置判断记录是否已在进度文件中"""
+    written = [entry.to_dict() for entry in project.progress_entries[base:]]
+    for record in records:
+        if record['entry'] in written:
+            written.remove(record['entry'])
+            continue
+        project.add_entry(ProgressEntry.from_dict(record['entry'], project))
+        project.last_updated = record['last_updated']
+    return project
+
+
+def load_progress(progress_file):
+    """读取进度文件并合并日志，返回 Project；进度文件不存在时返回 None"""
+    if not os.path.exists(progress_file):
+        return None
+    with open(progress_file, 'r', encoding='utf-8') as f:
+        project = Project.from_dict(json_codec.load(f))
+    base, records = _read_wal(progress_file)
+    if base is None:
+        return project
+    return _apply(project, base, records)
+
+
+def _write_header(progress_file, base):
+    atomic_write(wal_path(progress_file), json_codec.dumps({'base': base}) + "\n")
+
+
+def append_entry(progress_file, entry, last_updated):
+    """追加一条进度到日志（一次追加写入和 fsync），返回条目总数；调用方需持有进度文件的锁。
+    日志不存在时读取一次进度文件以确定基准条目数"""
+    base, records = _read_wal(progress_file)
+    if base is None:
+        with open(progress_file, 'r', encoding='utf-8') as f:
+            base = len(json_codec.load(f).get('progress_entries', []))
+        _write_header(progress_file, base)
+
+    line = '{"entry": %s, "last_updated": %s}\n' % (dumps_entry(entry), json_codec.dumps(last_updated))
+    fd = os.open(wal_path(progress_file), os.O_RDWR | os.O_APPEND)
+    try:
+        # 上次追加写了一半时先补上换行，不与新记录连在一起
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            line = "\n" + line
+        os.write(fd, line.encode('utf-8'))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return base + len(records) + 1
+
+
+def needs_checkpoint(progress_file):
+    """日志超过大小阈值，或距上次检查点超过时间阈值时需要合并"""
+    try:
+        size = os.path.getsize(wal_path(progress_file))
+        age = time.time() - os.path.getmtime(progress_file)
+    except FileNotFoundError:
+        return False
+    return size > WAL_MAX_BYTES or age > WAL_MAX_AGE
+
+
+def checkpoint(progress_file):
+    """把日志合并进进度文件并清空日志，返回合并的记录数；调用方需持有进度文件的锁，且不能在 bulk_writes 中调用。
+    先原子写入进度文件再重置日志，两步之间中断时重放会跳过已合并的记录"""
+    base, records = _read_wal(progress_file)
+    if base is None or not records:
+        return 0
+    project = load_progress(progress_file)
+    atomic_write(progress_file, dumps_progress(project.to_dict()))
+    _write_header(progress_file, len(project.progress_entries))
+    return len(records)
+
+
+def discard(progress_file):
+    """进度文件被整体替换（首次创建、转换格式、从中央仓库拉取）后删除旧日志"""
+    try:
+        os.remove(wal_path(progress_file))
+    except FileNotFoundError:
+        pass
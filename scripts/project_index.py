@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 SQLite 索引 - 把 projects/ 中的进度文件索引为项目、条目、标签和全文检索表，
+按 (mtime_ns, 文件大小) 增量更新。JSON 文件始终是唯一的数据来源，索引可以随时删除重建
+"""
+
+import os
+import sqlite3
+
+import json_codec
+from progress_model import Project, ProgressEntry, valid_date
+from project_loader import PROGRESS_SUFFIX, PARALLEL_THRESHOLD, scan_progress_files, decode_files, project_id_of
+
+# 表结构或条目时间戳的计算方式变化时递增，旧索引自动重建
+INDEX_VERSION = 3
+
+DEFAULT_INDEX_FILE = os.path.join(".cache", "index.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    project_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    file_id TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    project_name TEXT,
+    parent_project TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    date TEXT,
+    time TEXT,
+    timestamp INTEGER NOT NULL,
+    description TEXT,
+    notes TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    entry_id INTEGER NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_time ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_by_project ON entries (project_id, seq);
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+CREATE INDEX IF NOT EXISTS tags_by_entry ON tags (entry_id);
+"""
+
+# trigram 分词支持中文子串匹配，但检索词至少需要 3 个字符
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(description, notes, tokenize='trigram')"
+FTS_MIN_TERM = 3
+
+
+class ProjectIndex:
+    """进度文件的 SQLite 索引，支持按时间范围计数、取最新N条和全文检索"""
+
+    def __init__(self, index_file=DEFAULT_INDEX_FILE):
+        self.index_file = index_file
+        self.conn = None
+        self.fts = False
+        self.updated = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def open(self):
+        """打开索引，版本不符或文件损坏时重建"""
+        if self.conn is not None:
+            return self
+        index_dir = os.path.dirname(self.index_file)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        try:
+            self._connect()
+        except sqlite3.DatabaseError as e:
+            print(f"⚠️ 索引文件无效，将重新建立: {e}")
+            self.close()
+            os.remove(self.index_file)
+            self._connect()
+        return self
+
+    def _connect(self):
+        self.conn = sqlite3.connect(self.index_file)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            for table in ('files', 'projects', 'entries', 'tags', 'entries_fts'):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.execute(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite 未编译 FTS5 或版本过旧，检索回退为 LIKE
+            self.fts = False
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def refresh(self, projects_dir, workers=None, threshold=PARALLEL_THRESHOLD):
+        """按 mtime/大小增量更新索引，返回解析失败的 [(路径, 错误信息)]"""
+        progress_files = scan_progress_files(projects_dir)
+        known = {path: (mtime_ns, size, project_id)
+                 for path, mtime_ns, size, project_id in self.conn.execute("SELECT path, mtime_ns, size, project_id FROM files")}
+
+        pending = []
+        for path, stat in progress_files:
+            cached = known.pop(path, None)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                continue
+            pending.append(path)
+        self.unchanged = len(progress_files) - len(pending)
+        self.removed = len(known)
+
+        stats = dict(progress_files)
+        errors = []
+        with self.conn:
+            # 已删除的文件
+            for path, (_, _, project_id) in known.items():
+                self._delete_project(project_id)
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+            for path, project, _, error in decode_files(pending, workers, threshold):
+                old = self.conn.execute("SELECT project_id FROM files WHERE path = ?", (path,)).fetchone()
+                if old is not None:
+                    self._delete_project(old[0])
+                    self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                if error is not None:
+                    errors.append((path, error))
+                    continue
+                project_id = self._insert_project(path, project)
+                stat = stats[path]
+                self.conn.execute("INSERT INTO files (path, mtime_ns, size, project_id) VALUES (?, ?, ?, ?)",
+                                  (path, stat.st_mtime_ns, stat.st_size, project_id))
+        self.updated = len(pending) - len(errors)
+        return errors
+
+    def _delete_project(self, project_id):
+        entry_ids = "SELECT id FROM entries WHERE project_id = ?"
+        self.conn.execute(f"DELETE FROM tags WHERE entry_id IN ({entry_ids})", (project_id,))
+        if self.fts:
+            self.conn.execute(f"DELETE FROM entries_fts WHERE rowid IN ({entry_ids})", (project_id,))
+        self.conn.execute("DELETE FROM entries WHERE project_id = ?", (project_id,))
+        self.conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    def _insert_project(self, path, project):
+        entries = project.progress_entries
+        data = project.to_dict()
+        del data['progress_entries']
+        # 分段项目目录按与单文件相同的名称排序，与 scan_progress_files 的顺序一致
+        file_id = project_id_of(path)
+        cursor = self.conn.execute(
+            "INSERT INTO projects (file_id, file_name, project_name, parent_project, data) VALUES (?, ?, ?, ?, ?)",
+            (file_id, file_id + PROGRESS_SUFFIX, project.get('project_name'), project.get('parent_project'),
+             json_codec.dumps(data, compact=True)))
+        project_id = cursor.lastrowid
+
+        for seq, entry in enumerate(entries):
+            description = entry.get('description')
+            notes = entry.get('notes')
+            cursor = self.conn.execute(
+                "INSERT INTO entries (project_id, seq, date, time, timestamp, description, notes, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (project_id, seq, entry.get('date'), entry.get('time'), entry.timestamp,
+                 description if isinstance(description, str) else None,
+                 notes if isinstance(notes, str) else None,
+                 json_codec.dumps(entry.to_dict(), compact=True)))
+            entry_id = cursor.lastrowid
+            tags = entry.get('tags') or []
+            if isinstance(tags, list):
+                self.conn.executemany("INSERT INTO tags (entry_id, tag) VALUES (?, ?)",
+                                      [(entry_id, str(tag)) for tag in tags])
+            if self.fts:
+                self.conn.execute("INSERT INTO entries_fts (rowid, description, notes) VALUES (?, ?, ?)",
+                                  (entry_id, description if isinstance(description, str) else '',
+                                   notes if isinstance(notes, str) else ''))
+        return project_id
+
+    def load_projects(self):
+        """按文件名顺序返回 [(项目ID, Project)]，内容与直接解析进度文件相同"""
+        projects = []
+        by_id = {}
+        for row_id, file_id, data in self.conn.execute("SELECT id, file_id, data FROM projects ORDER BY file_name"):
+            project = Project.from_dict(json_codec.loads(data))
+            by_id[row_id] = project
+            projects.append((file_id, project))
+        for project_id, data in self.conn.execute("SELECT project_id, data FROM entries ORDER BY project_id, seq"):
+            project = by_id[project_id]
+            project.progress_entries.append(ProgressEntry.from_dict(json_codec.loads(data), project))
+        return projects
+
+    def _where(self, since=None, until=None, project=None, tag=None):
+        """组合按日期范围、项目ID或名称、标签过滤的条件"""
+        clauses = []
+        params = []
+        for date in (since, until):
+            if date and not valid_date(date):
+                raise ValueError(f"日期格式应为 YYYY-MM-DD: {date}")
+        if since:
+            clauses.append("e.timestamp >= ?")
+            params.append(int(since.replace('-', '')) * 10000)
+        if until:
+            clauses.append("e.timestamp < ?")
+            params.append((int(until.replace('-', '')) + 1) * 10000)
+        if project:
+            clauses.append("(p.file_id = ? OR p.project_name = ?)")
+            params.extend([project, project])
+        if tag:
+            clauses.append("e.id IN (SELECT entry_id FROM tags WHERE tag = ?)")
+            params.append(tag)
+        return clauses, params
+
+    def count_entries(self, since=None, until=None, project=None, tag=None):
+        """符合条件的条目数，日期为包含两端的 YYYY-MM-DD"""
+        clauses, params = self._where(since, until, project, tag)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT COUNT(*) FROM entries e JOIN projects p ON p.id = e.project_id {where}"
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def latest_entries(self, limit=20, since=None, until=None, project=None, tag=None):
+        """按时间从新到旧返回最多 limit 条 [(项目ID, ProgressEntry)]"""
+        clauses, params = self._where(since, until, project, tag)
+        return self._query_entries(clauses, params, limit)
+
+    def search(self, query, limit=20, since=None, until=None, project=None, tag=None):
+        """在描述和附注中检索所有关键词，按时间从新到旧返回 [(项目ID, ProgressEntry)]"""
+        clauses, params = self._where(since, until, project, tag)
+        long_terms = []
+        for term in query.split():
+            if self.fts and len(term) >= FTS_MIN_TERM:
+                long_terms.append('"' + term.replace('"', '""') + '"')
+            else:
+                # 过短的检索词（如两个汉字）无法用 trigram 匹配，改用 LIKE
+                pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                clauses.append("(e.description LIKE ? ESCAPE '\\' OR e.notes LIKE ? ESCAPE '\\')")
+                params.extend([pattern, pattern])
+        if long_terms:
+            clauses.append("e.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+            params.append(' AND '.join(long_terms))
+        return self._query_entries(clauses, params, limit)
+
+    def _query_entries(self, clauses, params, limit):
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT p.id, p.file_id, p.data, e.data FROM entries e JOIN projects p ON p.id = e.project_id {where} "
+               f"ORDER BY e.timestamp DESC, e.project_id, e.seq DESC LIMIT ?")
+        results = []
+        projects = {}
+        for project_id, file_id, project_data, entry_data in self.conn.execute(sql, params + [limit]):
+            project = projects.get(project_id)
+            if project is None:
+                project = projects[project_id] = Project.from_dict(json_codec.loads(project_data))
+            results.append((file_id, ProgressEntry.from_dict(json_codec.loads(entry_data), project)))
+        return results
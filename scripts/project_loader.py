@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度文件加载 - 用 os.scandir 枚举目录，文件较多时分块交给进程池并行解析
+同时支持平铺布局 projects/<id>_progress.json 和按ID前缀分片的布局 projects/<id前两位>/<id>_progress.json，
+两种布局下的项目都可以是单个进度文件或按月分段的项目目录 <id>/
+"""
+
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import json_codec
+from progress_model import Project
+from progress_segments import is_segmented, read_segmented, segmented_content, segmented_stat
+
+PROGRESS_SUFFIX = "_progress.json"
+
+# 待解析文件少于该数量时串行解析，避免进程池启动和结果传输的开销
+PARALLEL_THRESHOLD = 2000
+
+# 每个任务解析的文件数
+CHUNK_SIZE = 256
+
+# 分片布局中子目录名取项目ID的前几位
+SHARD_PREFIX_LENGTH = 2
+
+
+def _scan_dir(directory, files, descend):
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(PROGRESS_SUFFIX) and entry.is_file():
+                files.append((entry.name, entry.path, entry.stat()))
+            elif entry.is_dir():
+                if is_segmented(entry.path):
+                    # 分段项目按与单文件相同的名称排序，两种格式混合时顺序不变
+                    files.append((entry.name + PROGRESS_SUFFIX, entry.path, segmented_stat(entry.path)))
+                elif descend and len(entry.name) == SHARD_PREFIX_LENGTH:
+                    _scan_dir(entry.path, files, False)
+
+
+def project_id_of(path):
+    """进度文件或分段项目目录对应的项目ID"""
+    name = os.path.basename(path)
+    return name[:-len(PROGRESS_SUFFIX)] if name.endswith(PROGRESS_SUFFIX) else name
+
+
+def scan_progress_files(projects_dir):
+    """列出目录中的所有进度文件和分段项目目录（两种布局），按项目ID排序返回 (路径, stat)"""
+    files = []
+    if not os.path.isdir(projects_dir):
+        return files
+    _scan_dir(projects_dir, files, True)
+    files.sort()
+    return [(path, stat) for _, path, stat in files]
+
+
+def shard_name(project_id):
+    """项目所在的分片目录名"""
+    return project_id[:SHARD_PREFIX_LENGTH]
+
+
+def is_sharded(projects_dir):
+    """目录中已有分片子目录时视为分片布局"""
+    if not os.path.isdir(projects_dir):
+        return False
+    with os.scandir(projects_dir) as it:
+        return any(len(entry.name) == SHARD_PREFIX_LENGTH and entry.is_dir() and not is_segmented(entry.path)
+                   for entry in it)
+
+
+def progress_file_path(projects_dir, project_id, sharded=None, segmented=None):
+    """项目进度文件（或分段项目目录）的路径：已存在时返回现有路径，否则按目录当前的布局返回新路径"""
+    if segmented is None:
+        for shard in (shard_name(project_id), ''):
+            path = os.path.join(projects_dir, shard, project_id)
+            if is_segmented(path):
+                return progress_file_path(projects_dir, project_id, sharded, True) if sharded is not None else path
+        segmented = False
+    file_name = project_id if segmented else f"{project_id}{PROGRESS_SUFFIX}"
+    flat_path = os.path.join(projects_dir, file_name)
+    shard_path = os.path.join(projects_dir, shard_name(project_id), file_name)
+    if sharded is None:
+        if os.path.exists(shard_path) or os.path.exists(flat_path):
+            return shard_path if os.path.exists(shard_path) else flat_path
+        sharded = is_sharded(projects_dir)
+    return shard_path if sharded else flat_path
+
+
+def migrate_layout(projects_dir, sharded=True):
+    """在平铺布局和分片布局之间迁移进度文件，返回移动的文件数"""
+    moved = 0
+    for path, _ in scan_progress_files(projects_dir):
+        project_id = project_id_of(path)
+        target = progress_file_path(projects_dir, project_id, sharded, os.path.isdir(path))
+        if os.path.abspath(path) == os.path.abspath(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        moved += 1
+    if not sharded:
+        # 删除迁移后留下的空分片目录
+        with os.scandir(projects_dir) as it:
+            for entry in it:
+                if len(entry.name) == SHARD_PREFIX_LENGTH and entry.is_dir() and not is_segmented(entry.path) \
+                        and not os.listdir(entry.path):
+                    os.rmdir(entry.path)
+    return moved
+
+
+def read_progress(path):
+    """读取进度文件或分段项目目录，返回 (项目字典, 原始字节)"""
+    if os.path.isdir(path):
+        return read_segmented(path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    return json_codec.loads(content), content
+
+
+def content_digest(path):
+    """进度文件或分段项目目录原始字节的内容哈希，与 decode_files 返回的相同，只读取不解析"""
+    if os.path.isdir(path):
+        content = segmented_content(path)
+    else:
+        with open(path, 'rb') as f:
+            content = f.read()
+    return hashlib.sha256(content).hexdigest()
+
+
+def load_project(path):
+    """读取进度文件或分段项目目录为 Project"""
+    return Project.from_dict(read_progress(path)[0])
+
+
+def _decode_chunk(paths):
+    """解析一批进度文件，返回 [(路径, Project, 内容哈希, 错误信息)]，单个文件出错不影响其他文件"""
+    results = []
+    for path in paths:
+        try:
+            data, content = read_progress(path)
+            results.append((path, Project.from_dict(data), hashlib.sha256(content).hexdigest(), None))
+        except Exception as e:
+            results.append((path, None, None, str(e)))
+    return results
+
+
+def decode_files(paths, workers=None, threshold=PARALLEL_THRESHOLD, chunk_size=CHUNK_SIZE):
+    """解析进度文件，返回与 paths 顺序一致的 [(路径, Project, 内容哈希, 错误信息)]"""
+    workers = workers or os.cpu_count() or 1
+    if len(paths) < threshold or workers < 2:
+        return _decode_chunk(paths)
+
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map 按提交顺序返回结果，输出顺序与进程调度无关
+        for chunk_results in executor.map(_decode_chunk, chunks):
+            results.extend(chunk_results)
+    return results
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目清单 - projects/manifest.json 记录每个进度文件的项目信息和内容哈希，
+同步时与进度文件在同一次提交中更新，读取方无需打开每个进度文件即可列出项目
+"""
+
+import os
+import hashlib
+
+import json_codec
+from atomic_write import atomic_write
+from project_loader import scan_progress_files, progress_file_path, project_id_of, read_progress
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(content):
+    """进度文件内容（字节）的哈希"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def manifest_record(data, content):
+    """根据进度文件的内容和原始字节（分段项目为各分段文件依次拼接）生成清单记录"""
+    entries = data.get('progress_entries', [])
+    # 最后一条记录取 "日期 时间" 最大的条目，与追加顺序无关
+    stamps = [f"{entry.get('date', '')} {entry.get('time', '')}".strip() for entry in entries if entry.get('date')]
+    return {
+        'name': data.get('project_name'),
+        'parent': data.get('parent_project'),
+        'entries': len(entries),
+        'last_entry': max(stamps) if stamps else None,
+        'size': len(content),
+        'sha256': content_hash(content)
+    }
+
+
+def manifest_path(projects_dir):
+    return os.path.join(projects_dir, MANIFEST_NAME)
+
+
+def load_manifest(projects_dir):
+    """读取清单，返回 {项目ID: 记录}；不存在、损坏或版本不符时返回 None"""
+    try:
+        with open(manifest_path(projects_dir), 'r', encoding='utf-8') as f:
+            manifest = json_codec.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ 读取项目清单失败: {e}")
+        return None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest.get('projects', {})
+
+
+def save_manifest(projects_dir, projects):
+    """写出清单：按项目ID排序，每个项目占一行，不同项目的更新落在不同的行上"""
+    lines = [json_codec.dumps(project_id) + ": " +
+             json_codec.dumps(projects[project_id], sort_keys=True)
+             for project_id in sorted(projects)]
+    body = '{\n' + ',\n'.join(lines) + '\n}' if lines else '{}'
+    content = '{\n"version": %d,\n"projects": %s\n}\n' % (MANIFEST_VERSION, body)
+    atomic_write(manifest_path(projects_dir), content)
+
+
+def update_manifest(projects_dir, project_ids):
+    """重新读取指定项目的进度文件并更新清单中对应的记录，文件不存在时删除记录"""
+    projects = load_manifest(projects_dir)
+    if projects is None:
+        return rebuild_manifest(projects_dir)
+    for project_id in project_ids:
+        progress_file = progress_file_path(projects_dir, project_id)
+        try:
+            projects[project_id] = manifest_record(*read_progress(progress_file))
+        except FileNotFoundError:
+            projects.pop(project_id, None)
+    save_manifest(projects_dir, projects)
+    return projects
+
+
+def rebuild_manifest(projects_dir):
+    """读取目录中的全部进度文件重新生成清单（合并冲突后使用）"""
+    projects = {}
+    for progress_file, _ in scan_progress_files(projects_dir):
+        project_id = project_id_of(progress_file)
+        try:
+            projects[project_id] = manifest_record(*read_progress(progress_file))
+        except Exception as e:
+            print(f"⚠️ 读取进度文件失败 {progress_file}: {e}")
+    save_manifest(projects_dir, projects)
+    return projects
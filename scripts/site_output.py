@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面输出管理 - 先渲染到暂存目录，只更新内容变化的文件，最后用两次 rename 替换输出目录
+"""
+
+import os
+import re
+import gzip
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+import json_codec
+
+MANIFEST_NAME = ".build-manifest.json"
+
+# 需要预压缩的文本文件类型
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.json')
+
+# 小于该大小的文件压缩收益很小，不生成压缩副本
+MIN_COMPRESS_SIZE = 256
+
+# 内容需要原样保留的HTML元素
+_HTML_RAW_BLOCK = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2>)', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+
+def minify_html(text):
+    """压缩HTML中的空白和注释，pre/textarea/script/style 内容只去掉行首缩进"""
+    parts = _HTML_RAW_BLOCK.split(text)
+    result = []
+    # split 结果依次为: 普通文本, 原样块, 标签名, 普通文本, ...
+    for i in range(0, len(parts), 3):
+        chunk = _HTML_COMMENT.sub('', parts[i])
+        result.append(re.sub(r'\s+', ' ', chunk))
+        if i + 1 < len(parts):
+            raw, tag = parts[i + 1], parts[i + 2].lower()
+            result.append(minify_js(raw) if tag == 'script' else raw)
+    return ''.join(result).strip()
+
+
+def minify_css(text):
+    """去掉CSS注释和多余空白"""
+    text = _CSS_COMMENT.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """保守地压缩JS：只去掉行首缩进、整行注释和空行，保留换行以免改变自动分号插入"""
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+MINIFIERS = {
+    '.html': minify_html,
+    '.css': minify_css,
+    '.js': minify_js
+}
+
+
+def compressed_variants(data):
+    """生成文件的预压缩副本，返回 {扩展名: 压缩后内容}"""
+    # mtime=0 保证相同内容得到相同的 .gz 文件
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def compressed_extensions():
+    """当前环境能生成的压缩副本扩展名"""
+    return ('.gz', '.br') if brotli is not None else ('.gz',)
+
+
+class SiteOutput:
+    def __init__(self, output_dir, minify=True, precompress=True, workers=None):
+        self.output_dir = os.path.normpath(output_dir)
+        self.staging_dir = self.output_dir + ".staging"
+        self.backup_dir = self.output_dir + ".old"
+        self.minify = minify
+        self.precompress = precompress
+        self.workers = workers or os.cpu_count() or 1
+        self.files = {}
+        self.changed = []
+        self.added = []
+        self.bytes_written = 0
+        self.sizes = {}
+        self.pending_compress = []
+
+    def begin(self):
+        """创建干净的暂存目录"""
+        # 上次在两次 rename 之间中断时输出目录不存在，备份目录中是完整的旧站点，先恢复
+        if not os.path.exists(self.output_dir) and os.path.exists(self.backup_dir):
+            os.rename(self.backup_dir, self.output_dir)
+        # 清理上次中断留下的目录
+        for leftover in (self.staging_dir, self.backup_dir):
+            if os.path.exists(leftover):
+                shutil.rmtree(leftover)
+        os.makedirs(self.staging_dir)
+        self.files = {}
+        self.changed = []
+        self.added = []
+        self.bytes_written = 0
+        self.sizes = {}
+        self.pending_compress = []
+
+    def write(self, rel_path, content):
+        """写入一个输出文件，返回内容是否相对上次输出发生变化"""
+        rel_path = rel_path.replace(os.sep, '/')
+        ext = os.path.splitext(rel_path)[1].lower()
+        source_size = len(content.encode('utf-8')) if isinstance(content, str) else len(content)
+        if self.minify and ext in MINIFIERS:
+            if not isinstance(content, str):
+                content = content.decode('utf-8')
+            content = MINIFIERS[ext](content)
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        self.files[rel_path] = hashlib.sha256(data).hexdigest()
+        self.sizes[rel_path] = {'source': source_size, 'output': len(data)}
+        compress = self.precompress and ext in COMPRESSIBLE_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE
+
+        staged_file = os.path.join(self.staging_dir, rel_path)
+        previous_file = os.path.join(self.output_dir, rel_path)
+        os.makedirs(os.path.dirname(staged_file), exist_ok=True)
+
+        if os.path.isfile(previous_file):
+            with open(previous_file, 'rb') as f:
+                unchanged = f.read() == data
+            if unchanged:
+                # 内容未变：硬链接旧文件，保留 mtime，不产生任何写入
+                self._link_or_copy(previous_file, staged_file)
+                # 旧的压缩副本齐全时一并沿用，否则重新压缩
+                if compress and not self._link_compressed(rel_path):
+                    self.pending_compress.append(rel_path)
+                return False
+            self.changed.append(rel_path)
+        else:
+            self.added.append(rel_path)
+
+        with open(staged_file, 'wb') as f:
+            f.write(data)
+        self.bytes_written += len(data)
+        if compress:
+            self.pending_compress.append(rel_path)
+        return True
+
+    def commit(self):
+        """写入构建清单并用暂存目录替换输出目录，返回清单内容"""
+        self._compress_pending()
+        self._collect_compressed_sizes()
+
+        expected = set(self.files) | {MANIFEST_NAME}
+        for rel_path, sizes in self.sizes.items():
+            expected.update(rel_path + ext for ext in compressed_extensions() if ext in sizes)
+        removed = sorted(set(self._list_previous_files()) - expected)
+        manifest = {
+            'files': dict(sorted(self.files.items())),
+            'changed': sorted(self.changed),
+            'added': sorted(self.added),
+            'removed': removed,
+            'sizes': dict(sorted(self.sizes.items()))
+        }
+        with open(os.path.join(self.staging_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json_codec.dump(manifest, f, indent=2)
+
+        # 两次同目录 rename 完成替换，每个文件不会出现写了一半的状态，但整体并不是原子的：
+        # 两次 rename 之间输出目录短暂不存在，此时读取会找不到文件；
+        # 在这期间中断时完整的旧站点留在备份目录中，下次 begin() 会先恢复它
+        if os.path.exists(self.output_dir):
+            os.rename(self.output_dir, self.backup_dir)
+            try:
+                os.rename(self.staging_dir, self.output_dir)
+            except OSError:
+                os.rename(self.backup_dir, self.output_dir)
+                raise
+            shutil.rmtree(self.backup_dir)
+        else:
+            os.rename(self.staging_dir, self.output_dir)
+
+        return manifest
+
+    def size_report(self, top=5):
+        """汇总本次输出的体积：原始、压缩空白后以及各预压缩格式，并列出最大的几个文件"""
+        totals = {}
+        for sizes in self.sizes.values():
+            for key, size in sizes.items():
+                totals[key] = totals.get(key, 0) + size
+        largest = sorted(self.sizes.items(), key=lambda item: item[1]['output'], reverse=True)[:top]
+        return {'totals': totals, 'largest': largest}
+
+    def _compress_pending(self):
+        """并行生成新增或修改文件的压缩副本（zlib/brotli 压缩时会释放GIL）"""
+        if not self.pending_compress:
+            return
+
+        def compress_one(rel_path):
+            # 从暂存目录读回内容，避免整个构建期间在内存中保留所有输出
+            staged_file = os.path.join(self.staging_dir, rel_path)
+            with open(staged_file, 'rb') as f:
+                data = f.read()
+            variants = compressed_variants(data)
+            for ext, payload in variants.items():
+                with open(os.path.join(self.staging_dir, rel_path + ext), 'wb') as f:
+                    f.write(payload)
+            return sum(len(payload) for payload in variants.values())
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self.bytes_written += sum(executor.map(compress_one, self.pending_compress))
+        self.pending_compress = []
+
+    def _link_compressed(self, rel_path):
+        """沿用上次输出中未变文件的压缩副本，缺少任一副本时返回 False"""
+        previous = [os.path.join(self.output_dir, rel_path + ext) for ext in compressed_extensions()]
+        if not all(os.path.isfile(path) for path in previous):
+            return False
+        for path, ext in zip(previous, compressed_extensions()):
+            self._link_or_copy(path, os.path.join(self.staging_dir, rel_path + ext))
+        return True
+
+    def _collect_compressed_sizes(self):
+        """记录暂存目录中各压缩副本的大小"""
+        for rel_path, sizes in self.sizes.items():
+            for ext in compressed_extensions():
+                compressed_file = os.path.join(self.staging_dir, rel_path + ext)
+                if os.path.isfile(compressed_file):
+                    sizes[ext] = os.path.getsize(compressed_file)
+
+    def abort(self):
+        """放弃本次构建，保留原输出目录不变"""
+        if os.path.exists(self.staging_dir):
+            shutil.rmtree(self.staging_dir)
+
+    def _list_previous_files(self):
+        """列出上次输出目录中的所有文件（相对路径）"""
+        previous = []
+        if not os.path.isdir(self.output_dir):
+            return previous
+        for root, _, filenames in os.walk(self.output_dir):
+            for filename in filenames:
+                path = os.path.relpath(os.path.join(root, filename), self.output_dir)
+                previous.append(path.replace(os.sep, '/'))
+        return previous
+
+    def _link_or_copy(self, source, target):
+        """硬链接文件，不支持时退回保留元数据的复制"""
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
@@ -6,14 +6,243 @@
 
 import os
 import json
+import gzip
+import hashlib
+import time
+# 本脚本只在同步时加载（progress_update.py --sync），各处都要调用 git，subprocess 在顶层导入
 import subprocess
-import requests
 import tempfile
 import shutil
+from contextlib import contextmanager
 from datetime import datetime
-from pathlib import Path
 import argparse
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 项目清单格式与 scripts/projects_manifest.py 相同（本脚本需要单独下载运行，不能导入仓库中的模块）
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+PROGRESS_SUFFIX = "_progress.json"
+SHARD_PREFIX_LENGTH = 2
+# 按月分段的项目目录，格式与 scripts/progress_segments.py 相同
+SEGMENT_META_FILE = "project.json"
+# 提交到中央仓库时暂存的路径：排除锁文件和预写日志（与 scripts/sync_progress.py 相同）
+STAGE_PATHSPEC = [".", ":(exclude)*.lock", ":(exclude)*.wal"]
+
+
+def _atomic_write(path, content):
+    """原子写入：临时文件 + fsync + rename + 目录 fsync，中途中断时保留原有内容（与 scripts/atomic_write.py 相同）"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(temp_file, os.stat(path).st_mode & 0o7777)
+        os.replace(temp_file, path)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+# 等待锁的最长时间（秒），与 scripts/file_lock.py 的 LOCK_TIMEOUT 相同
+LOCK_TIMEOUT = 10.0
+
+
+@contextmanager
+def _locked(path, timeout=LOCK_TIMEOUT):
+    """持有 <path>.lock 的排他锁，保护读取-追加-写回；等待超过 timeout 秒时抛出 TimeoutError（与 scripts/file_lock.py 相同）"""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"等待文件锁超时: {path}.lock")
+                time.sleep(0.005)
+        yield
+    finally:
+        os.close(fd)
+
+
+PROJECT_FIELDS = ('project_name', 'parent_project', 'development_goal', 'created_date', 'last_updated')
+ENTRY_FIELDS = ('date', 'time', 'description', 'notes', 'tags')
+
+
+def _dumps_progress(data):
+    """进度文件的规范格式（与 scripts/progress_json.py 相同）：字段顺序固定，项目字段每行一个，每个条目占一行"""
+    def fields(item, order):
+        keys = [key for key in order if key in item] + sorted(key for key in item if key not in order)
+        return ["%s: %s" % (json.dumps(key, ensure_ascii=False), json.dumps(item[key], ensure_ascii=False)) for key in keys]
+    lines = ["  " + field for field in fields({k: v for k, v in data.items() if k != 'progress_entries'}, PROJECT_FIELDS)]
+    if 'progress_entries' in data:
+        entries = ["    {" + ", ".join(fields(entry, ENTRY_FIELDS)) + "}" for entry in data['progress_entries']]
+        lines.append('  "progress_entries": ' + ("[\n" + ",\n".join(entries) + "\n  ]" if entries else "[]"))
+    return "{\n" + ",\n".join(lines) + "\n}\n"
+
+
+def _read_with_wal(progress_file):
+    """读取进度文件内容，并合并 progress_manager.py 写入的预写日志 <进度文件>.wal（格式与 scripts/progress_wal.py 相同）"""
+    with open(progress_file, 'rb') as f:
+        content = f.read()
+    try:
+        with open(progress_file + ".wal", 'rb') as f:
+            lines = f.read().decode('utf-8').splitlines()
+        base = json.loads(lines[0])['base']
+    except (FileNotFoundError, IndexError, ValueError, KeyError, TypeError):
+        return content
+    records = []
+    for line in lines[1:]:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    if not records:
+        return content
+    data = json.loads(content.decode('utf-8'))
+    entries = data.setdefault('progress_entries', [])
+    # 按条目内容判断记录是否已在进度文件中（与 scripts/progress_wal.py 的 _apply 相同）
+    written = entries[base:]
+    for record in records:
+        if record['entry'] in written:
+            written.remove(record['entry'])
+            continue
+        entries.append(record['entry'])
+        data['last_updated'] = record['last_updated']
+    return _dumps_progress(data).encode('utf-8')
+
+
+def _is_segmented(path):
+    return os.path.isfile(os.path.join(path, SEGMENT_META_FILE))
+
+
+def _read_progress(path):
+    """读取进度文件或分段项目目录，返回 (项目字典, 原始字节)"""
+    if not os.path.isdir(path):
+        with open(path, 'rb') as f:
+            content = f.read()
+        return json.loads(content.decode('utf-8')), content
+    with open(os.path.join(path, SEGMENT_META_FILE), 'rb') as f:
+        chunks = [f.read()]
+    data = json.loads(chunks[0].decode('utf-8'))
+    data.pop('segments', None)
+    segments = {}
+    for name in os.listdir(path):
+        if name.endswith(".json.gz"):
+            segments.setdefault(name[:-len(".json.gz")], name)
+        elif name.endswith(".json") and name != SEGMENT_META_FILE:
+            segments[name[:-len(".json")]] = name
+    entries = []
+    for _, name in sorted(segments.items()):
+        with open(os.path.join(path, name), 'rb') as f:
+            raw = f.read()
+        chunks.append(raw)
+        entries.extend(json.loads((gzip.decompress(raw) if name.endswith(".gz") else raw).decode('utf-8')))
+    data['progress_entries'] = entries
+    return data, b''.join(chunks)
+
+
+def _manifest_record(data, content):
+    """根据进度文件的内容和原始字节生成清单记录"""
+    entries = data.get('progress_entries', [])
+    stamps = [f"{entry.get('date', '')} {entry.get('time', '')}".strip() for entry in entries if entry.get('date')]
+    return {
+        'name': data.get('project_name'),
+        'parent': data.get('parent_project'),
+        'entries': len(entries),
+        'last_entry': max(stamps) if stamps else None,
+        'size': len(content),
+        'sha256': hashlib.sha256(content).hexdigest()
+    }
+
+
+def _save_manifest(projects_dir, projects):
+    """写出清单：按项目ID排序，每个项目占一行"""
+    lines = [json.dumps(project_id, ensure_ascii=False) + ": " +
+             json.dumps(projects[project_id], ensure_ascii=False, sort_keys=True)
+             for project_id in sorted(projects)]
+    body = '{\n' + ',\n'.join(lines) + '\n}' if lines else '{}'
+    manifest_file = os.path.join(projects_dir, MANIFEST_NAME)
+    _atomic_write(manifest_file, '{\n"version": %d,\n"projects": %s\n}\n' % (MANIFEST_VERSION, body))
+
+
+def _progress_file_path(projects_dir, project_id):
+    """项目进度文件在中央仓库中的路径，支持平铺和按ID前缀分片两种布局"""
+    for shard in (project_id[:SHARD_PREFIX_LENGTH], ''):
+        if _is_segmented(os.path.join(projects_dir, shard, project_id)):
+            return os.path.join(projects_dir, shard, project_id)
+    file_name = f"{project_id}{PROGRESS_SUFFIX}"
+    flat_path = os.path.join(projects_dir, file_name)
+    shard_path = os.path.join(projects_dir, project_id[:SHARD_PREFIX_LENGTH], file_name)
+    if os.path.exists(shard_path):
+        return shard_path
+    if os.path.exists(flat_path):
+        return flat_path
+    # 新项目按目录当前的布局放置
+    sharded = any(len(name) == SHARD_PREFIX_LENGTH and os.path.isdir(os.path.join(projects_dir, name))
+                  and not _is_segmented(os.path.join(projects_dir, name))
+                  for name in os.listdir(projects_dir))
+    return shard_path if sharded else flat_path
+
+
+def _rebuild_manifest(projects_dir):
+    """读取目录中的全部进度文件和分段项目目录（两种布局）重新生成清单"""
+    def scan(directory, descend):
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(PROGRESS_SUFFIX) and os.path.isfile(path):
+                paths.append((name, path))
+            elif _is_segmented(path):
+                paths.append((name + PROGRESS_SUFFIX, path))
+            elif descend and len(name) == SHARD_PREFIX_LENGTH and os.path.isdir(path):
+                scan(path, False)
+
+    paths = []
+    scan(projects_dir, True)
+    projects = {}
+    for name, path in sorted(paths):
+        try:
+            projects[name[:-len(PROGRESS_SUFFIX)]] = _manifest_record(*_read_progress(path))
+        except Exception as e:
+            print(f"⚠️ 读取进度文件失败 {name}: {e}")
+    _save_manifest(projects_dir, projects)
+
+
+def _update_manifest(projects_dir, project_id):
+    """更新清单中一个项目的记录，清单不存在或无效时重新生成"""
+    try:
+        with open(os.path.join(projects_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception:
+        manifest = None
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        _rebuild_manifest(projects_dir)
+        return
+    projects = manifest.get('projects', {})
+    projects[project_id] = _manifest_record(*_read_progress(_progress_file_path(projects_dir, project_id)))
+    _save_manifest(projects_dir, projects)
+
 class StandaloneProgressSync:
     def __init__(self):
         self.config_file = ".progress_config.json"
@@ -44,7 +273,9 @@ class StandaloneProgressSync:
                 # 复制进度文件
                 progress_file = f"{config['project_id']}_progress.json"
                 if os.path.exists(progress_file):
-                    self._copy_progress_file(progress_file)
+                    if self._copy_progress_file(progress_file):
+                        # 项目清单与进度文件在同一次提交中更新
+                        _update_manifest(os.path.join(self.temp_dir, "ProgressReport", "projects"), config['project_id'])
                 
                 # 提交并推送
                 if self._commit_and_push(config):
@@ -82,13 +313,14 @@ class StandaloneProgressSync:
     def _save_config(self, config):
         """保存项目配置"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            _atomic_write(self.config_file, json.dumps(config, indent=2, ensure_ascii=False))
         except Exception as e:
             print(f"⚠️ 保存配置文件失败: {e}")
     
     def _check_network(self):
-        """检查网络连接"""
+        """检查网络连接（requests 导入较慢，只在同步时导入）"""
+        import requests
+        
         try:
             response = requests.get("https://github.com", timeout=5)
             return response.status_code == 200
@@ -118,14 +350,22 @@ class StandaloneProgressSync:
         """复制进度文件到中央仓库"""
         try:
             source_file = progress_file
-            target_dir = os.path.join(self.temp_dir, "ProgressReport", "projects")
-            target_file = os.path.join(target_dir, progress_file)
+            projects_dir = os.path.join(self.temp_dir, "ProgressReport", "projects")
+            os.makedirs(projects_dir, exist_ok=True)
             
-            # 确保目标目录存在
-            os.makedirs(target_dir, exist_ok=True)
+            # 中央仓库可能是平铺或分片布局，确保目标目录存在
+            target_file = _progress_file_path(projects_dir, os.path.basename(progress_file)[:-len(PROGRESS_SUFFIX)])
+            if os.path.isdir(target_file):
+                # 中央仓库中是分段存储的项目目录，以本地的单文件为准替换
+                shutil.rmtree(target_file)
+                target_file += PROGRESS_SUFFIX
+            os.makedirs(os.path.dirname(target_file), exist_ok=True)
             
-            # 复制文件
-            shutil.copy2(source_file, target_file)
+            # 复制文件（原子写入，保留修改时间）；读取时持锁，不会读到添加到一半的进度
+            with _locked(source_file):
+                content = _read_with_wal(source_file)
+            _atomic_write(target_file, content)
+            shutil.copystat(source_file, target_file)
             print(f"📁 复制进度文件: {progress_file}")
             return True
         except Exception as e:
@@ -137,11 +377,11 @@ class StandaloneProgressSync:
         try:
             repo_dir = os.path.join(self.temp_dir, "ProgressReport")
             
-            # 添加文件
-            subprocess.run(["git", "add", "."], cwd=repo_dir, check=True, capture_output=True)
+            # 添加文件（锁文件和预写日志只在本地使用，不提交）
+            subprocess.run(["git", "add", "-A", "--"] + STAGE_PATHSPEC, cwd=repo_dir, check=True, capture_output=True)
             
-            # 检查是否有更改
-            result = subprocess.run(["git", "status", "--porcelain"], cwd=repo_dir, capture_output=True, text=True)
+            # 检查是否有暂存的更改
+            result = subprocess.run(["git", "diff", "--cached", "--name-only"], cwd=repo_dir, capture_output=True, text=True)
             if not result.stdout.strip():
                 print("📭 没有更改需要提交")
                 return True
@@ -150,14 +390,40 @@ class StandaloneProgressSync:
             commit_message = f"Update progress for {config['project_name']} ({config['project_id']})"
             subprocess.run(["git", "commit", "-m", commit_message], cwd=repo_dir, check=True, capture_output=True)
             
-            # 推送到远程仓库
-            subprocess.run(["git", "push"], cwd=repo_dir, check=True, capture_output=True)
-            
-            return True
+            # 推送到远程仓库，远端有新提交时变基后重试
+            return self._push_with_rebase(repo_dir)
         except subprocess.CalledProcessError as e:
             print(f"❌ 提交推送失败: {e}")
             return False
 
+    def _push_with_rebase(self, repo_dir, attempts=3):
+        """推送到中央仓库；被拒绝时变基重试，项目清单冲突时从合并后的进度文件重新生成。
+        最多推送 attempts 次，每次变基之后都会再推送，最后一次仍被拒绝时返回 False"""
+        manifest_file = f"projects/{MANIFEST_NAME}"
+        for attempt in range(attempts):
+            if subprocess.run(["git", "push"], cwd=repo_dir, capture_output=True).returncode == 0:
+                return True
+            if attempt == attempts - 1:
+                break
+            
+            print(f"🔄 推送被拒绝，变基到远端最新提交后重试 ({attempt + 1}/{attempts - 1})...")
+            result = subprocess.run(["git", "pull", "--rebase"], cwd=repo_dir, capture_output=True, text=True)
+            while result.returncode != 0:
+                conflicts = subprocess.run(["git", "diff", "--name-only", "--diff-filter=U"], cwd=repo_dir,
+                                           capture_output=True, text=True).stdout.split()
+                if conflicts != [manifest_file]:
+                    subprocess.run(["git", "rebase", "--abort"], cwd=repo_dir, capture_output=True)
+                    print(f"❌ 变基失败: {result.stderr}")
+                    return False
+                print("🔀 项目清单冲突，重新生成清单")
+                _rebuild_manifest(os.path.join(repo_dir, "projects"))
+                subprocess.run(["git", "add", manifest_file], cwd=repo_dir, capture_output=True)
+                result = subprocess.run(["git", "-c", "core.editor=true", "rebase", "--continue"], cwd=repo_dir,
+                                        capture_output=True, text=True)
+        
+        print("❌ 推送失败: 多次重试后仍被拒绝")
+        return False
+
 def main():
     parser = argparse.ArgumentParser(description='独立进度同步脚本')
     parser.add_argument('action', choices=['sync'], help='同步操作')
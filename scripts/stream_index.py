@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式生成索引 - 只保存项目摘要和紧凑的日期/时间线索引，页面渲染时按需重新读取进度文件；
+按月分段存储的项目在日期视图中只读取所需月份的分段
+"""
+
+import os
+import bisect
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from entry_store import EntryStore
+from progress_model import Project, ProgressEntry, valid_date
+from project_loader import load_project
+from progress_segments import load_month, segment_key, UNDATED
+
+# 时间线排序键: 高位为倒序的时间，低位为全局条目序号
+_ORDINAL_BITS = 30
+_MAX_CLOCK = (1 << 33) - 1
+
+# 时间线每批解析的条目数，同一批内每个项目文件只读取一次
+TIMELINE_CHUNK = 2048
+
+# 按月缓存日期条目的月份数（周视图可能跨两个月）
+MONTH_CACHE_SIZE = 3
+
+# 项目摘要保留的字段，进度条目只保留数量和最新一条
+SUMMARY_KEYS = ('project_name', 'parent_project', 'development_goal', 'created_date', 'last_updated')
+
+
+def _clock(timestamp):
+    """把 YYYYMMDDHHMM 时间戳压缩为保持顺序的分钟数"""
+    if not timestamp:
+        return 0
+    year, rest = divmod(timestamp, 100000000)
+    month, rest = divmod(rest, 1000000)
+    day, rest = divmod(rest, 10000)
+    hour, minute = divmod(rest, 100)
+    return (((year * 12 + month - 1) * 31 + day - 1) * 24 + hour) * 60 + minute
+
+
+class ProjectFileCache:
+    """最近使用的进度文件解析结果，容量固定，内存不随项目总数增长"""
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.projects = OrderedDict()
+        self.reads = 0
+
+    def load(self, progress_file):
+        project = self.projects.get(progress_file)
+        if project is not None:
+            self.projects.move_to_end(progress_file)
+            return project
+        project = load_project(progress_file)
+        self.reads += 1
+        self.projects[progress_file] = project
+        if len(self.projects) > self.capacity:
+            self.projects.popitem(last=False)
+        return project
+
+
+class StreamingIndex(Mapping):
+    """日期 -> 进度条目 的惰性索引，接口与普通的日期索引字典相同"""
+
+    def __init__(self, cache_size=64):
+        self.cache = ProjectFileCache(cache_size)
+        self.files = []
+        self.summaries = []
+        # 每个项目第一个条目的全局序号
+        self.offsets = array('q')
+        self.dates = {}
+        self.months = {}
+        self.timeline_keys = array('q')
+        self.store = EntryStore()
+        self._month_cache = OrderedDict()
+        # 日期不是 YYYY-MM-DD 的条目数，这些条目不进入日期索引
+        self.invalid_dates = 0
+
+    def scan(self, progress_file):
+        """读取一个进度文件，只保留摘要和索引，返回项目摘要"""
+        project = load_project(progress_file)
+        entries = project.progress_entries
+        project_index = len(self.summaries)
+        offset = self.offsets[-1] + self.summaries[-1]['entry_count'] if self.summaries else 0
+        count = len(entries)
+
+        seen_dates = set()
+        for entry_index, entry in enumerate(entries):
+            entry_date = entry.get('date')
+            if entry_date not in seen_dates:
+                if valid_date(entry_date):
+                    seen_dates.add(entry_date)
+                    self.dates.setdefault(entry_date, []).append(project_index)
+                else:
+                    self.invalid_dates += 1
+            # 同一时间的条目: 项目按读取顺序，项目内后追加的在前，与逐项目归并的顺序一致
+            ordinal = offset + count - 1 - entry_index
+            clock = _clock(entry.timestamp)
+            self.timeline_keys.append(((_MAX_CLOCK - clock) << _ORDINAL_BITS) | ordinal)
+
+        self.store.add_project(project)
+        summary = {key: project.get(key) for key in SUMMARY_KEYS if key in project}
+        summary['entry_count'] = count
+        # 存为字典: ProgressEntry 通过 .project 引用整个项目，会让全部条目一直留在内存中
+        summary['latest_entry'] = entries[-1].to_dict() if entries else None
+        self.files.append(progress_file)
+        self.summaries.append(summary)
+        self.offsets.append(offset)
+        return summary
+
+    def finish(self):
+        """扫描结束后排序时间线索引"""
+        self.timeline_keys = array('q', sorted(self.timeline_keys))
+        for entry_date in self.dates:
+            self.months.setdefault(entry_date[:7], []).append(entry_date)
+
+    def load_project(self, project_index):
+        """重新读取一个项目的完整数据（经过容量固定的缓存）"""
+        return self.cache.load(self.files[project_index])
+
+    def iter_timeline(self):
+        """按 (日期, 时间) 从新到旧产出条目，分批读取条目所在的项目文件"""
+        mask = (1 << _ORDINAL_BITS) - 1
+        for start in range(0, len(self.timeline_keys), TIMELINE_CHUNK):
+            locations = []
+            for key in self.timeline_keys[start:start + TIMELINE_CHUNK]:
+                ordinal = key & mask
+                project_index = bisect.bisect_right(self.offsets, ordinal) - 1
+                entry_index = self.summaries[project_index]['entry_count'] - 1 - (ordinal - self.offsets[project_index])
+                locations.append((project_index, entry_index))
+
+            # 一批条目按时间相邻，先按项目分组读取，再按原顺序产出
+            needed = {}
+            for project_index, entry_index in locations:
+                needed.setdefault(project_index, set()).add(entry_index)
+            loaded = {}
+            for project_index, entry_indexes in needed.items():
+                entries = self.load_project(project_index).progress_entries
+                for entry_index in entry_indexes:
+                    loaded[project_index, entry_index] = entries[entry_index]
+
+            for location in locations:
+                yield loaded[location]
+
+    def __getitem__(self, entry_date):
+        if entry_date not in self.dates:
+            raise KeyError(entry_date)
+        month_key = entry_date[:7]
+        month = self._month_cache.get(month_key)
+        if month is None:
+            month = self._load_month(month_key)
+            self._month_cache[month_key] = month
+            if len(self._month_cache) > MONTH_CACHE_SIZE:
+                self._month_cache.popitem(last=False)
+        else:
+            self._month_cache.move_to_end(month_key)
+        return month[entry_date]
+
+    def _load_month(self, month_key):
+        """取出一个月内所有日期的条目，涉及的每个项目文件只读取一次"""
+        month_dates = self.months[month_key]
+        project_indexes = sorted({project_index for entry_date in month_dates for project_index in self.dates[entry_date]})
+
+        month = {entry_date: [] for entry_date in month_dates}
+        for project_index in project_indexes:
+            for entry in self._month_entries(project_index, month_key):
+                entries = month.get(entry.get('date'))
+                if entries is not None:
+                    entries.append(entry)
+
+        # 每天的条目按时间排序
+        for entries in month.values():
+            entries.sort(key=lambda x: x.get('time', ''))
+        return month
+
+    def _month_entries(self, project_index, month_key):
+        """项目在某月可能涉及的条目；分段存储的项目只读取该月的分段"""
+        progress_file = self.files[project_index]
+        if progress_file in self.cache.projects or segment_key(month_key) == UNDATED or not os.path.isdir(progress_file):
+            return self.load_project(project_index).progress_entries
+        fields, entries = load_month(progress_file, month_key)
+        project = Project.from_dict(fields)
+        return [ProgressEntry.from_dict(entry, project) for entry in entries]
+
+    def __contains__(self, entry_date):
+        return entry_date in self.dates
+
+    def __iter__(self):
+        return iter(self.dates)
+
+    def __len__(self):
+        return len(self.dates)
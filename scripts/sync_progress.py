@@ -6,14 +6,25 @@
 """
 
 import os
-import json
-import subprocess
-import requests
-import time
+import shutil
 from datetime import datetime
-from pathlib import Path
 import argparse
 
+# requests 和 subprocess 只在联网和调用 git 的方法中导入，manifest、migrate 等本地命令不需要
+
+import json_codec
+from progress_model import Project
+from projects_manifest import MANIFEST_NAME, update_manifest, rebuild_manifest
+from project_loader import progress_file_path, migrate_layout, read_progress
+from progress_segments import copy_segmented, write_segmented
+from atomic_write import atomic_write, atomic_write_json, bulk_writes
+from progress_json import dumps_progress
+from file_lock import locked
+from progress_wal import checkpoint, discard
+
+# 提交到中央仓库时暂存的路径：排除锁文件和预写日志
+STAGE_PATHSPEC = [".", ":(exclude)*.lock", ":(exclude)*.wal"]
+
 class ProgressSync:
     def __init__(self):
         self.config_file = ".progress_config.json"
@@ -33,25 +44,27 @@ class ProgressSync:
                 print("⚠️ 网络连接不可用，将使用离线模式")
                 return self._queue_sync(config)
             
-            # 克隆或更新中央仓库
-            if not self._setup_central_repo():
-                return False
-            
-            # 复制进度文件
-            progress_file = f"{config['project_id']}_progress.json"
-            if os.path.exists(progress_file):
-                self._copy_progress_file(progress_file, config)
-            
-            # 提交并推送
-            if self._commit_and_push(config):
-                print("✅ 同步成功！")
-                # 更新最后同步时间
-                config['last_sync'] = datetime.now().isoformat()
-                self._save_config(config)
-                return True
-            else:
-                print("❌ 同步失败")
-                return False
+            # 同一目录下的多个同步进程依次使用本地的中央仓库副本
+            with locked(self.local_repo_dir):
+                # 克隆或更新中央仓库
+                if not self._setup_central_repo():
+                    return False
+                
+                # 复制进度文件
+                progress_file = self._progress_path(config)
+                if os.path.exists(progress_file):
+                    self._copy_progress_file(progress_file, config)
+                
+                # 提交并推送
+                if self._commit_and_push(config):
+                    print("✅ 同步成功！")
+                    # 更新最后同步时间
+                    config['last_sync'] = datetime.now().isoformat()
+                    self._save_config(config)
+                    return True
+                else:
+                    print("❌ 同步失败")
+                    return False
                 
         except Exception as e:
             print(f"❌ 同步失败: {e}")
@@ -70,26 +83,35 @@ class ProgressSync:
                 print("⚠️ 网络连接不可用")
                 return False
             
-            # 克隆或更新中央仓库
-            if not self._setup_central_repo():
-                return False
-            
-            # 复制进度文件到本地
-            progress_file = f"{config['project_id']}_progress.json"
-            central_progress_file = os.path.join(self.local_repo_dir, "projects", progress_file)
-            
-            if os.path.exists(central_progress_file):
-                self._copy_from_central(central_progress_file, progress_file)
-                print("✅ 从中央仓库同步成功！")
-                return True
-            else:
-                print("📭 中央仓库中未找到进度文件")
-                return False
+            with locked(self.local_repo_dir):
+                # 克隆或更新中央仓库
+                if not self._setup_central_repo():
+                    return False
+                
+                # 复制进度文件到本地
+                progress_file = self._progress_path(config)
+                central_progress_file = progress_file_path(os.path.join(self.local_repo_dir, "projects"), config['project_id'])
+                
+                if os.path.exists(central_progress_file):
+                    # 覆盖本地进度时持有进度文件的锁，避免与正在进行的添加交错
+                    with locked(progress_file):
+                        self._copy_from_central(central_progress_file, progress_file)
+                    print("✅ 从中央仓库同步成功！")
+                    return True
+                else:
+                    print("📭 中央仓库中未找到进度文件")
+                    return False
                 
         except Exception as e:
             print(f"❌ 从中央仓库同步失败: {e}")
             return False
     
+    def _progress_path(self, config):
+        """本地进度文件（单文件存储）或进度目录（按月分段存储）"""
+        if config.get('storage') == 'segmented':
+            return config['project_id']
+        return f"{config['project_id']}_progress.json"
+    
     def _load_config(self):
         """加载项目配置"""
         if not os.path.exists(self.config_file):
@@ -98,7 +120,7 @@ class ProgressSync:
         
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return json_codec.load(f)
         except Exception as e:
             print(f"❌ 读取配置文件失败: {e}")
             return None
@@ -106,13 +128,14 @@ class ProgressSync:
     def _save_config(self, config):
         """保存项目配置"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            atomic_write_json(self.config_file, config)
         except Exception as e:
             print(f"❌ 保存配置文件失败: {e}")
     
     def _check_network(self):
         """检查网络连接"""
+        import requests
+        
         try:
             response = requests.get("https://api.github.com", timeout=5)
             return response.status_code == 200
@@ -121,6 +144,8 @@ class ProgressSync:
     
     def _setup_central_repo(self):
         """设置中央仓库"""
+        import subprocess
+        
         try:
             if not os.path.exists(self.local_repo_dir):
                 # 克隆仓库
@@ -157,16 +182,37 @@ class ProgressSync:
         """复制进度文件到中央仓库"""
         try:
             source_file = progress_file
-            target_file = os.path.join(self.local_repo_dir, "projects", progress_file)
+            # 中央仓库可能是平铺或分片布局
+            projects_dir = os.path.join(self.local_repo_dir, "projects")
+            segmented = os.path.isdir(source_file)
+            target_file = progress_file_path(projects_dir, config['project_id'])
+            if os.path.isdir(target_file) != segmented:
+                # 中央仓库中的存储格式与本地不同，以本地为准替换
+                self._remove_path(target_file)
+                target_file = progress_file_path(projects_dir, config['project_id'], segmented=segmented)
             
             if os.path.exists(source_file):
-                # 读取源文件
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    progress_data = json.load(f)
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
                 
-                # 写入目标文件
-                with open(target_file, 'w', encoding='utf-8') as f:
-                    json.dump(progress_data, f, indent=2, ensure_ascii=False)
+                # 读取本地进度期间持锁，得到完整的一次写入结果
+                with locked(source_file):
+                    if not segmented:
+                        # 同步前把预写日志合并进进度文件（在批量写入之外，合并结果先落盘再重置日志）
+                        checkpoint(source_file)
+                    
+                    # 进度文件和清单一起写入，最后统一 fsync
+                    with bulk_writes():
+                        if segmented:
+                            # 分段存储只复制变化的分段，提交中只包含当月分段和项目信息
+                            copy_segmented(source_file, target_file)
+                        else:
+                            # 读取源文件，经共用模型校验后写出
+                            with open(source_file, 'r', encoding='utf-8') as f:
+                                progress_data = Project.from_dict(json_codec.load(f))
+                            atomic_write(target_file, dumps_progress(progress_data.to_dict()))
+                        
+                        # 项目清单与进度文件在同一次提交中更新
+                        update_manifest(projects_dir, [config['project_id']])
                 
                 print(f"📁 复制进度文件: {progress_file}")
                 return True
@@ -182,13 +228,19 @@ class ProgressSync:
         """从中央仓库复制进度文件"""
         try:
             if os.path.exists(source_file):
-                # 读取源文件
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    progress_data = json.load(f)
-                
-                # 写入目标文件
-                with open(target_file, 'w', encoding='utf-8') as f:
-                    json.dump(progress_data, f, indent=2, ensure_ascii=False)
+                segmented = not target_file.endswith("_progress.json")
+                if segmented and os.path.isdir(source_file):
+                    # 两边都是分段存储，只复制变化的分段
+                    copy_segmented(source_file, target_file)
+                else:
+                    # 读取源文件（单文件或分段目录），经共用模型校验后按本地的存储格式写出
+                    progress_data = Project.from_dict(read_progress(source_file)[0])
+                    if segmented:
+                        write_segmented(target_file, progress_data.to_dict(), datetime.now().strftime("%Y-%m"))
+                    else:
+                        atomic_write(target_file, dumps_progress(progress_data.to_dict()))
+                        # 本地进度已被中央仓库的版本整体替换，旧的预写日志作废
+                        discard(target_file)
                 
                 print(f"📁 从中央仓库复制进度文件: {target_file}")
                 return True
@@ -200,19 +252,28 @@ class ProgressSync:
             print(f"❌ 从中央仓库复制进度文件失败: {e}")
             return False
     
+    def _remove_path(self, path):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    
     def _commit_and_push(self, config):
         """提交并推送到中央仓库"""
+        import subprocess
+        
+        cwd = os.getcwd()
         try:
             os.chdir(self.local_repo_dir)
             
-            # 添加文件
-            result = subprocess.run(["git", "add", "."], capture_output=True, text=True)
+            # 添加文件（锁文件和预写日志只在本地使用，不提交）
+            result = subprocess.run(["git", "add", "-A", "--"] + STAGE_PATHSPEC, capture_output=True, text=True)
             if result.returncode != 0:
                 print(f"❌ Git add失败: {result.stderr}")
                 return False
             
-            # 检查是否有变更
-            result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True)
+            # 检查是否有暂存的变更
+            result = subprocess.run(["git", "diff", "--cached", "--name-only"], capture_output=True, text=True)
             if not result.stdout.strip():
                 print("📭 没有变更需要提交")
                 return True
@@ -228,17 +289,76 @@ class ProgressSync:
                 return False
             
             # 推送
+            return self._push_with_rebase()
+            
+        except Exception as e:
+            print(f"❌ 提交推送失败: {e}")
+            return False
+        finally:
+            # 任何返回路径都回到原来的工作目录
+            os.chdir(cwd)
+    
+    def _push_with_rebase(self, attempts=3):
+        """推送到中央仓库；远端有其他项目的新提交时变基后重试，最多推送 attempts 次，
+        每次变基之后都会再推送，最后一次仍被拒绝时返回 False"""
+        import subprocess
+        
+        for attempt in range(attempts):
             result = subprocess.run(["git", "push"], capture_output=True, text=True)
-            if result.returncode != 0:
-                print(f"❌ Git push失败: {result.stderr}")
+            if result.returncode == 0:
+                return True
+            if attempt == attempts - 1:
+                break
+            
+            print(f"🔄 推送被拒绝，变基到远端最新提交后重试 ({attempt + 1}/{attempts - 1})...")
+            rebase = subprocess.run(["git", "pull", "--rebase"], capture_output=True, text=True)
+            if rebase.returncode != 0 and not self._resolve_manifest_conflict():
+                subprocess.run(["git", "rebase", "--abort"], capture_output=True, text=True)
+                print(f"❌ 变基失败: {rebase.stderr}")
+                return False
+        
+        print(f"❌ Git push失败: {result.stderr}")
+        return False
+    
+    def _resolve_manifest_conflict(self):
+        """并发同步只会在项目清单上冲突：从合并后的进度文件重新生成清单并继续变基"""
+        import subprocess
+        
+        manifest_file = f"projects/{MANIFEST_NAME}"
+        while True:
+            result = subprocess.run(["git", "diff", "--name-only", "--diff-filter=U"], capture_output=True, text=True)
+            conflicts = result.stdout.split()
+            if conflicts != [manifest_file]:
                 return False
             
-            os.chdir("..")
+            print("🔀 项目清单冲突，重新生成清单")
+            rebuild_manifest("projects")
+            subprocess.run(["git", "add", manifest_file], capture_output=True, text=True)
+            result = subprocess.run(["git", "-c", "core.editor=true", "rebase", "--continue"], capture_output=True, text=True)
+            if result.returncode == 0:
+                return True
+    
+    def rebuild_manifest(self, projects_dir):
+        """重新生成项目清单"""
+        try:
+            projects = rebuild_manifest(projects_dir)
+            print(f"✅ 项目清单已更新: {os.path.join(projects_dir, MANIFEST_NAME)} ({len(projects)} 个项目)")
             return True
-            
         except Exception as e:
-            print(f"❌ 提交推送失败: {e}")
-            os.chdir("..")
+            print(f"❌ 生成项目清单失败: {e}")
+            return False
+    
+    def migrate_layout(self, projects_dir, sharded=True):
+        """在平铺布局和按ID前缀分片的布局之间迁移进度文件"""
+        try:
+            moved = migrate_layout(projects_dir, sharded)
+            layout = "分片" if sharded else "平铺"
+            print(f"✅ 已迁移为{layout}布局，移动 {moved} 个进度文件")
+            if moved:
+                print("💡 请提交变更（git add -A projects && git commit），git 会识别为文件重命名")
+            return True
+        except Exception as e:
+            print(f"❌ 迁移失败: {e}")
             return False
     
     def _queue_sync(self, config):
@@ -247,23 +367,22 @@ class ProgressSync:
             queue_file = ".sync_queue.json"
             queue_data = []
             
-            if os.path.exists(queue_file):
-                with open(queue_file, 'r', encoding='utf-8') as f:
-                    queue_data = json.load(f)
-            
             # 添加同步任务
             sync_task = {
                 "project_id": config["project_id"],
                 "project_name": config["project_name"],
                 "timestamp": datetime.now().isoformat(),
-                "progress_file": f"{config['project_id']}_progress.json"
+                "progress_file": self._progress_path(config)
             }
             
-            queue_data.append(sync_task)
-            
-            # 保存队列
-            with open(queue_file, 'w', encoding='utf-8') as f:
-                json.dump(queue_data, f, indent=2, ensure_ascii=False)
+            # 读取、追加和保存队列期间持锁，并发加入的任务不会互相覆盖
+            with locked(queue_file):
+                if os.path.exists(queue_file):
+                    with open(queue_file, 'r', encoding='utf-8') as f:
+                        queue_data = json_codec.load(f)
+                
+                queue_data.append(sync_task)
+                atomic_write_json(queue_file, queue_data)
             
             print(f"📋 同步任务已加入队列，共 {len(queue_data)} 个待同步任务")
             return True
@@ -281,7 +400,7 @@ class ProgressSync:
                 return True
             
             with open(queue_file, 'r', encoding='utf-8') as f:
-                queue_data = json.load(f)
+                queue_data = json_codec.load(f)
             
             if not queue_data:
                 print("📭 没有待处理的同步任务")
@@ -294,31 +413,36 @@ class ProgressSync:
                 print("⚠️ 网络连接不可用，跳过队列处理")
                 return False
             
-            # 设置中央仓库
-            if not self._setup_central_repo():
-                return False
-            
-            # 处理每个任务
-            processed_tasks = []
-            for task in queue_data:
-                progress_file = task["progress_file"]
-                if os.path.exists(progress_file):
-                    config = self._load_config()
-                    if config and config["project_id"] == task["project_id"]:
-                        if self._copy_progress_file(progress_file, config):
-                            processed_tasks.append(task)
-                            print(f"✅ 处理同步任务: {task['project_name']}")
-                        else:
-                            print(f"❌ 处理同步任务失败: {task['project_name']}")
-                else:
-                    print(f"⚠️ 进度文件不存在: {progress_file}")
-            
-            # 提交并推送
-            if processed_tasks and self._commit_and_push(config):
-                # 移除已处理的任务
-                remaining_tasks = [task for task in queue_data if task not in processed_tasks]
-                with open(queue_file, 'w', encoding='utf-8') as f:
-                    json.dump(remaining_tasks, f, indent=2, ensure_ascii=False)
+            with locked(self.local_repo_dir):
+                # 设置中央仓库
+                if not self._setup_central_repo():
+                    return False
+                
+                # 处理每个任务
+                processed_tasks = []
+                for task in queue_data:
+                    progress_file = task["progress_file"]
+                    if os.path.exists(progress_file):
+                        config = self._load_config()
+                        if config and config["project_id"] == task["project_id"]:
+                            if self._copy_progress_file(progress_file, config):
+                                processed_tasks.append(task)
+                                print(f"✅ 处理同步任务: {task['project_name']}")
+                            else:
+                                print(f"❌ 处理同步任务失败: {task['project_name']}")
+                    else:
+                        print(f"⚠️ 进度文件不存在: {progress_file}")
+                
+                # 提交并推送
+                pushed = processed_tasks and self._commit_and_push(config)
+            
+            if pushed:
+                # 移除已处理的任务；处理期间新加入队列的任务保留
+                with locked(queue_file):
+                    with open(queue_file, 'r', encoding='utf-8') as f:
+                        queue_data = json_codec.load(f)
+                    remaining_tasks = [task for task in queue_data if task not in processed_tasks]
+                    atomic_write_json(queue_file, remaining_tasks)
                 
                 print(f"✅ 成功处理 {len(processed_tasks)} 个同步任务")
                 return True
@@ -344,6 +468,15 @@ def main():
     # 处理同步队列
     queue_parser = subparsers.add_parser('queue', help='处理同步队列')
     
+    # 重新生成项目清单
+    manifest_parser = subparsers.add_parser('manifest', help='重新生成项目清单 projects/manifest.json')
+    manifest_parser.add_argument('projects_dir', nargs='?', default='projects', help='进度文件目录')
+    
+    # 迁移目录布局
+    migrate_parser = subparsers.add_parser('migrate', help='迁移 projects/ 的目录布局')
+    migrate_parser.add_argument('layout', choices=['sharded', 'flat'], help='sharded: projects/ab/abcd1234_progress.json; flat: projects/abcd1234_progress.json')
+    migrate_parser.add_argument('projects_dir', nargs='?', default='projects', help='进度文件目录')
+    
     args = parser.parse_args()
     
     sync = ProgressSync()
@@ -354,6 +487,10 @@ def main():
         sync.sync_from_central()
     elif args.command == 'queue':
         sync.process_sync_queue()
+    elif args.command == 'manifest':
+        sync.rebuild_manifest(args.projects_dir)
+    elif args.command == 'migrate':
+        sync.migrate_layout(args.projects_dir, args.layout == 'sharded')
     else:
         parser.print_help()
 
@@ -0,0 +1,266 @@
+// 日/周/月视图：按需加载月度数据分片并原地切换周期
+(function() {
+    const script = document.currentScript;
+    const config = {
+        view: script.getAttribute('data-view'),
+        current: script.getAttribute('data-current'),
+        dataRoot: script.getAttribute('data-root') + 'data/',
+        pagesRoot: script.getAttribute('data-pages')
+    };
+    // 界面文字由服务端按页面语言写入
+    const labels = JSON.parse(script.getAttribute('data-labels') || '{}');
+    const shardCache = {};
+    let manifestPromise = null;
+    let current = config.current;
+
+    function escapeHtml(text) {
+        return String(text || '').replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[c]);
+    }
+
+    function parseDate(key) {
+        const parts = key.split('-');
+        return new Date(Date.UTC(+parts[0], +parts[1] - 1, +(parts[2] || 1)));
+    }
+
+    function formatDate(date) {
+        return date.toISOString().slice(0, 10);
+    }
+
+    function localToday() {
+        const now = new Date();
+        return formatDate(new Date(Date.UTC(now.getFullYear(), now.getMonth(), now.getDate())));
+    }
+
+    function normalizeKey(key) {
+        if (config.view === 'monthly') {
+            return key.slice(0, 7);
+        }
+        const date = parseDate(key);
+        if (config.view === 'weekly') {
+            date.setUTCDate(date.getUTCDate() - (date.getUTCDay() + 6) % 7);
+        }
+        return formatDate(date);
+    }
+
+    function shiftKey(key, step) {
+        const date = parseDate(key);
+        if (config.view === 'monthly') {
+            date.setUTCMonth(date.getUTCMonth() + step);
+            return formatDate(date).slice(0, 7);
+        }
+        date.setUTCDate(date.getUTCDate() + step * (config.view === 'weekly' ? 7 : 1));
+        return formatDate(date);
+    }
+
+    function periodDates(key) {
+        if (config.view === 'daily') {
+            return [key];
+        }
+        const dates = [];
+        const date = parseDate(key);
+        const month = date.getUTCMonth();
+        while (config.view === 'weekly' ? dates.length < 7 : date.getUTCMonth() === month) {
+            dates.push(formatDate(date));
+            date.setUTCDate(date.getUTCDate() + 1);
+        }
+        return dates;
+    }
+
+    function loadManifest() {
+        if (!manifestPromise) {
+            manifestPromise = fetch(config.dataRoot + 'manifest.json').then(response => response.json());
+        }
+        return manifestPromise;
+    }
+
+    function loadShard(month) {
+        if (!shardCache[month]) {
+            shardCache[month] = loadManifest().then(manifest => {
+                if (!manifest.months[month]) {
+                    return [];
+                }
+                return fetch(config.dataRoot + month + '.json').then(response => response.json());
+            });
+        }
+        return shardCache[month];
+    }
+
+    function loadEntries(dates) {
+        // 只请求这个周期覆盖到的月份分片
+        const months = Array.from(new Set(dates.map(date => date.slice(0, 7))));
+        return Promise.all(months.map(loadShard)).then(shards => {
+            const byDate = {};
+            dates.forEach(date => { byDate[date] = []; });
+            shards.forEach(shard => shard.forEach(entry => {
+                if (byDate[entry.date]) {
+                    byDate[entry.date].push(entry);
+                }
+            }));
+            return byDate;
+        });
+    }
+
+    function renderDaily(key, byDate) {
+        const entries = byDate[key];
+        document.getElementById('currentDate').textContent = key;
+        if (!entries.length) {
+            return `
+        <div class="empty-state">
+            <h2>${escapeHtml(labels.no_daily_progress)}</h2>
+            <p>${escapeHtml(labels.no_daily_progress_desc)}</p>
+        </div>`;
+        }
+        return entries.map(entry => `
+        <div class="progress-item">
+            <div class="progress-time">${escapeHtml(entry.time)}</div>
+            <div class="progress-project">${escapeHtml(entry.project_name)} (${escapeHtml(entry.parent_project)})</div>
+            <div class="progress-description">${escapeHtml(entry.description)}</div>
+            ${entry.notes ? `<div class="progress-notes">${escapeHtml(entry.notes)}</div>` : ''}
+        </div>`).join('');
+    }
+
+    function renderWeekly(key, byDate) {
+        const dates = periodDates(key);
+        document.getElementById('currentWeek').textContent = labels.week_range.replace('{start}', dates[0]).replace('{end}', dates[6]);
+        return dates.map((date, i) => {
+            const entries = byDate[date];
+            const items = entries.length ? entries.map(entry => `
+                    <div class="progress-entry">
+                        <div class="progress-time">${escapeHtml(entry.time)}</div>
+                        <div class="progress-project">${escapeHtml(entry.project_name)}</div>
+                        <div class="progress-description">${escapeHtml(entry.description)}</div>
+                    </div>`).join('') : `
+                    <div class="progress-entry">
+                        <div class="progress-description">${escapeHtml(labels.no_progress_short)}</div>
+                    </div>`;
+            return `
+            <div class="week-day">
+                <div class="day-date">${escapeHtml(labels.weekdays[i])} ${date.slice(5)}</div>
+                <div class="day-progress">${items}
+                </div>
+            </div>`;
+        }).join('');
+    }
+
+    function renderMonthly(key, byDate) {
+        const dates = periodDates(key + '-01');
+        const today = localToday();
+        document.getElementById('currentMonth').textContent = labels.month_label.replace('{year}', key.slice(0, 4)).replace('{month}', key.slice(5, 7));
+        const leading = (parseDate(dates[0]).getUTCDay() + 6) % 7;
+        const cells = [];
+        const emptyCell = `
+            <div class="month-day other-month">
+                <div class="day-number"></div>
+            </div>`;
+        for (let i = 0; i < leading; i++) {
+            cells.push(emptyCell);
+        }
+        dates.forEach(date => {
+            const indicators = byDate[date].map(entry => `
+                    <div class="progress-indicator" title="${escapeHtml(entry.project_name)}: ${escapeHtml(entry.description)}">
+                        ${escapeHtml(entry.project_name.slice(0, 8))}...
+                    </div>`).join('');
+            cells.push(`
+            <div class="month-day${date === today ? ' today' : ''}">
+                <div class="day-number">${+date.slice(8)}</div>
+                <div class="day-progress">${indicators}
+                </div>
+            </div>`);
+        });
+        while (cells.length % 7) {
+            cells.push(emptyCell);
+        }
+        return cells.join('');
+    }
+
+    function recordedDate(boundary, step) {
+        // step < 0: boundary 之前最近的有记录日期；step > 0: boundary 当天或之后最近的有记录日期。
+        // 清单中的月份都有记录，最多再加载一个月份的分片
+        return loadManifest().then(manifest => {
+            const month = boundary.slice(0, 7);
+            const months = Object.keys(manifest.months).sort()
+                .filter(key => step < 0 ? key <= month : key >= month);
+            if (step < 0) {
+                months.reverse();
+            }
+            const search = index => {
+                if (index >= months.length) {
+                    return null;
+                }
+                return loadShard(months[index]).then(shard => {
+                    const dates = shard.map(entry => entry.date)
+                        .filter(date => step < 0 ? date < boundary : date >= boundary).sort();
+                    return dates.length ? dates[step < 0 ? dates.length - 1 : 0] : search(index + 1);
+                });
+            };
+            return search(0);
+        });
+    }
+
+    function updateNavLinks() {
+        // 上一个/下一个有记录周期的归档页面，作为分片加载失败时的退路
+        const start = periodDates(config.view === 'monthly' ? current + '-01' : current)[0];
+        const next = shiftKey(current, 1);
+        const end = config.view === 'monthly' ? next + '-01' : next;
+        const key = date => date && normalizeKey(date);
+        return Promise.all([recordedDate(start, -1), recordedDate(end, 1)]).then(dates => {
+            const targets = dates.map(key);
+            document.querySelectorAll('[data-step]').forEach(button => {
+                const target = targets[+button.getAttribute('data-step') < 0 ? 0 : 1];
+                if (target) {
+                    button.setAttribute('href', `${config.pagesRoot}${config.view}/${target}.html`);
+                } else {
+                    button.removeAttribute('href');
+                }
+            });
+        });
+    }
+
+    const views = {
+        daily: { container: 'dailyProgress', param: 'date', render: renderDaily },
+        weekly: { container: 'weekDays', param: 'week', render: renderWeekly },
+        monthly: { container: 'monthDays', param: 'month', render: renderMonthly }
+    };
+    const view = views[config.view];
+
+    function show(key) {
+        const dates = periodDates(config.view === 'monthly' ? key + '-01' : key);
+        return loadEntries(dates).then(byDate => {
+            current = key;
+            document.getElementById(view.container).innerHTML = view.render(key, byDate);
+            return updateNavLinks();
+        });
+    }
+
+    document.querySelectorAll('[data-step]').forEach(button => {
+        // 有脚本时可以切换到任意周期，不再局限于有记录的归档页面
+        button.classList.remove('disabled');
+        button.addEventListener('click', event => {
+            event.preventDefault();
+            const key = shiftKey(current, +button.getAttribute('data-step'));
+            show(key).then(() => {
+                window.history.pushState({ key: key }, '', `?${view.param}=${key}`);
+            }).catch(() => {
+                // 分片加载失败时退回静态归档页面
+                if (button.getAttribute('href')) {
+                    window.location.href = button.getAttribute('href');
+                }
+            });
+        });
+    });
+
+    window.addEventListener('popstate', event => {
+        show(event.state && event.state.key ? event.state.key : config.current);
+    });
+
+    const urlParam = new URLSearchParams(window.location.search).get(view.param);
+    if (urlParam && /^\d{4}-\d{2}(-\d{2})?$/.test(urlParam)) {
+        const key = normalizeKey(urlParam);
+        if (key !== current) {
+            show(key);
+        }
+    }
+})();
+